@@ -0,0 +1,140 @@
+"""Measures the message throughput of :class:`WorkerAgentRuntimeHost`.
+
+A sender worker publishes events that are fanned out to agents on several receiver workers, and sends
+RPC requests to the receivers with a number of requests in flight at once. Everything runs in one process
+over a local gRPC connection, so the numbers are best compared between runs on the same machine, e.g.
+before and after a change to the host.
+
+Run with:
+
+.. code-block:: bash
+
+    python samples/benchmarks/host_throughput.py --workers 4 --events 2000 --requests 2000
+
+Add ``--batching`` to send messages in batches between the workers and the host.
+"""
+
+import argparse
+import asyncio
+import time
+from dataclasses import dataclass
+
+from autogen_core.application import MessageBatchingConfig, WorkerAgentRuntime, WorkerAgentRuntimeHost
+from autogen_core.base import AgentId, AgentType, MessageContext, TopicId, try_get_known_serializers_for_type
+from autogen_core.components import RoutedAgent, TypeSubscription, event, rpc
+
+
+@dataclass
+class BenchEvent:
+    index: int
+
+
+@dataclass
+class BenchRequest:
+    index: int
+
+
+@dataclass
+class BenchResponse:
+    index: int
+
+
+class Counter:
+    def __init__(self) -> None:
+        self.count = 0
+        self.target = 0
+        self.done = asyncio.Event()
+
+    def reset(self, target: int) -> None:
+        self.count = 0
+        self.target = target
+        self.done.clear()
+
+    def increment(self) -> None:
+        self.count += 1
+        if self.count >= self.target:
+            self.done.set()
+
+
+class ReceiverAgent(RoutedAgent):
+    def __init__(self, counter: Counter) -> None:
+        super().__init__("Counts the events it receives.")
+        self._counter = counter
+
+    @event
+    async def on_event(self, message: BenchEvent, ctx: MessageContext) -> None:
+        self._counter.increment()
+
+    @rpc
+    async def on_request(self, message: BenchRequest, ctx: MessageContext) -> BenchResponse:
+        return BenchResponse(message.index)
+
+
+def add_serializers(worker: WorkerAgentRuntime) -> None:
+    for message_type in (BenchEvent, BenchRequest, BenchResponse):
+        worker.add_message_serializer(try_get_known_serializers_for_type(message_type))
+
+
+async def main(
+    address: str, num_workers: int, num_events: int, num_requests: int, concurrency: int, batching: bool
+) -> None:
+    message_batching = MessageBatchingConfig() if batching else None
+    host = WorkerAgentRuntimeHost(address=address, message_batching=message_batching)
+    host.start()
+    counter = Counter()
+
+    receivers: list[WorkerAgentRuntime] = []
+    for i in range(num_workers):
+        receiver = WorkerAgentRuntime(host_address=address, message_batching=message_batching)
+        receiver.start()
+        add_serializers(receiver)
+        await receiver.register_factory(
+            type=AgentType(f"receiver{i}"), agent_factory=lambda: ReceiverAgent(counter), expected_class=ReceiverAgent
+        )
+        await receiver.add_subscription(TypeSubscription("bench", f"receiver{i}"))
+        receivers.append(receiver)
+
+    sender = WorkerAgentRuntime(host_address=address, message_batching=message_batching)
+    sender.start()
+    add_serializers(sender)
+
+    # Events: each event is delivered to one agent on every receiver worker.
+    counter.reset(num_events * num_workers)
+    start = time.perf_counter()
+    for i in range(num_events):
+        await sender.publish_message(BenchEvent(i), topic_id=TopicId("bench", "default"))
+    await counter.done.wait()
+    elapsed = time.perf_counter() - start
+    print(
+        f"events:   {num_events} published to {num_workers} workers in {elapsed:.2f}s, "
+        f"{num_events * num_workers / elapsed:,.0f} deliveries/s"
+    )
+
+    # RPC requests, spread over the receivers with `concurrency` requests in flight.
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def send(i: int) -> None:
+        async with semaphore:
+            await sender.send_message(BenchRequest(i), AgentId(f"receiver{i % num_workers}", "default"))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(send(i) for i in range(num_requests)))
+    elapsed = time.perf_counter() - start
+    print(f"requests: {num_requests} with {concurrency} in flight in {elapsed:.2f}s, {num_requests / elapsed:,.0f}/s")
+
+    await sender.stop()
+    for receiver in receivers:
+        await receiver.stop()
+    await host.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure the message throughput of the worker runtime host.")
+    parser.add_argument("--address", default="localhost:50071", help="Address for the host.")
+    parser.add_argument("--workers", type=int, default=4, help="Number of receiver workers.")
+    parser.add_argument("--events", type=int, default=2000, help="Number of events to publish.")
+    parser.add_argument("--requests", type=int, default=2000, help="Number of RPC requests to send.")
+    parser.add_argument("--concurrency", type=int, default=64, help="Number of RPC requests in flight.")
+    parser.add_argument("--batching", action="store_true", help="Batch messages between workers and the host.")
+    args = parser.parse_args()
+    asyncio.run(main(args.address, args.workers, args.events, args.requests, args.concurrency, args.batching))
@@ -0,0 +1,74 @@
+"""Compares the speed of the message serializers.
+
+Serializes and deserializes a flat dataclass, a Pydantic model and a dataclass with nested fields with the
+default serializers and with :class:`~autogen_core.base.OrjsonMessageSerializer`. The default dataclass
+serializer does not support nested dataclasses, so the nested case only runs with orjson.
+
+Run with:
+
+.. code-block:: bash
+
+    python samples/benchmarks/serialization.py --number 20000
+
+Requires the ``orjson`` extra of autogen-core.
+"""
+
+import argparse
+import timeit
+from dataclasses import dataclass
+from typing import Any, List
+
+from autogen_core.base import MessageSerializer, OrjsonMessageSerializer
+from autogen_core.base._serialization import DataclassJsonMessageSerializer, PydanticJsonMessageSerializer
+from pydantic import BaseModel
+
+
+@dataclass
+class ChatMessage:
+    source: str
+    content: str
+    tokens: List[int]
+    score: float
+
+
+class ChatModel(BaseModel):
+    source: str
+    content: str
+    tokens: List[int]
+    score: float
+
+
+@dataclass
+class ChatHistory:
+    session: str
+    messages: List[ChatMessage]
+
+
+def measure(name: str, serializer: MessageSerializer[Any], message: Any, number: int) -> None:
+    payload = serializer.serialize(message)
+    assert serializer.deserialize(payload) == message
+    serialize = timeit.timeit(lambda: serializer.serialize(message), number=number)
+    deserialize = timeit.timeit(lambda: serializer.deserialize(payload), number=number)
+    print(
+        f"{name:<32} {len(payload):>6} bytes  "
+        f"serialize {serialize / number * 1e6:7.2f}us  deserialize {deserialize / number * 1e6:7.2f}us"
+    )
+
+
+def main(number: int) -> None:
+    message = ChatMessage(source="assistant", content="Hello, world! " * 20, tokens=list(range(64)), score=0.5)
+    model = ChatModel(source=message.source, content=message.content, tokens=message.tokens, score=message.score)
+    history = ChatHistory(session="session", messages=[message] * 20)
+
+    measure("dataclass, json", DataclassJsonMessageSerializer(ChatMessage), message, number)
+    measure("dataclass, orjson", OrjsonMessageSerializer(ChatMessage), message, number)
+    measure("pydantic, json", PydanticJsonMessageSerializer(ChatModel), model, number)
+    measure("pydantic, orjson", OrjsonMessageSerializer(ChatModel), model, number)
+    measure("nested dataclass, orjson", OrjsonMessageSerializer(ChatHistory), history, number)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the speed of the message serializers.")
+    parser.add_argument("--number", type=int, default=20000, help="Number of times to run each operation.")
+    args = parser.parse_args()
+    main(args.number)
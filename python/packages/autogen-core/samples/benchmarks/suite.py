@@ -0,0 +1,363 @@
+"""Runs the runtime benchmarks and compares their results with a baseline.
+
+Measures, for :class:`SingleThreadedAgentRuntime` and for :class:`WorkerAgentRuntime` with a sender worker and an
+agent worker connected to a :class:`WorkerAgentRuntimeHost` over local gRPC:
+
+- ``send.latency.p50`` and ``send.latency.p99``: round-trip time of one ``send_message`` at a time.
+- ``send.throughput``: ``send_message`` calls per second with many in flight.
+- ``publish.fan_out``: deliveries per second of events published to several subscribed agents.
+- ``agent.activation``: round-trip time of the first message to an agent, which creates it.
+- ``intervention.latency``: round-trip time of one ``send_message`` at a time with a pass-through intervention
+  handler, to compare with ``send.latency.p50`` (single-threaded runtime only, the worker runtime has no
+  intervention handlers).
+- ``serialization.*``: serialize and deserialize times of the JSON dataclass serializer.
+
+Each benchmark runs ``--repeat`` times and keeps the best result. The results can be written as JSON with
+``--output`` and compared with the results of an earlier run with ``--compare``, which reports the benchmarks
+that got worse by more than ``--threshold`` and then exits with status 1. Times that changed by less than
+``--noise-floor`` microseconds are not reported as regressions. Compare results from the same machine.
+
+Run with:
+
+.. code-block:: bash
+
+    python samples/benchmarks/suite.py --output baseline.json
+    # ... change the runtime ...
+    python samples/benchmarks/suite.py --compare baseline.json
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import statistics
+import sys
+import time
+import timeit
+from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from importlib.metadata import PackageNotFoundError, version
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Tuple
+
+from autogen_core.application import SingleThreadedAgentRuntime, WorkerAgentRuntime, WorkerAgentRuntimeHost
+from autogen_core.base import (
+    AgentId,
+    AgentRuntime,
+    AgentType,
+    MessageContext,
+    TopicId,
+    try_get_known_serializers_for_type,
+)
+from autogen_core.base._serialization import DataclassJsonMessageSerializer
+from autogen_core.base.intervention import DefaultInterventionHandler
+from autogen_core.components import RoutedAgent, TypeSubscription, event, rpc
+
+RUNTIMES = ("single_threaded", "worker")
+
+
+@dataclass
+class BenchEvent:
+    index: int
+
+
+@dataclass
+class BenchRequest:
+    index: int
+
+
+@dataclass
+class BenchResponse:
+    index: int
+
+
+@dataclass
+class ChatMessage:
+    source: str
+    content: str
+    tokens: List[int]
+    score: float
+
+
+@dataclass
+class Result:
+    benchmark: str
+    runtime: str
+    value: float
+    unit: str
+    higher_is_better: bool
+
+    @property
+    def key(self) -> Tuple[str, str]:
+        return (self.benchmark, self.runtime)
+
+
+class Counter:
+    def __init__(self) -> None:
+        self.count = 0
+        self.target = 0
+        self.done = asyncio.Event()
+
+    def reset(self, target: int) -> None:
+        self.count = 0
+        self.target = target
+        self.done.clear()
+
+    def increment(self) -> None:
+        self.count += 1
+        if self.count >= self.target:
+            self.done.set()
+
+
+class BenchAgent(RoutedAgent):
+    def __init__(self, counter: Counter) -> None:
+        super().__init__("Answers requests and counts events.")
+        self._counter = counter
+
+    @event
+    async def on_event(self, message: BenchEvent, ctx: MessageContext) -> None:
+        self._counter.increment()
+
+    @rpc
+    async def on_request(self, message: BenchRequest, ctx: MessageContext) -> BenchResponse:
+        return BenchResponse(message.index)
+
+
+@asynccontextmanager
+async def runtimes(kind: str, address: str, **kwargs: Any) -> AsyncIterator[Tuple[AgentRuntime, AgentRuntime]]:
+    """Start a runtime of the given kind and yield the runtime to send messages from and the runtime to register
+    agents with. For the worker runtime they are two workers, so that every message goes through the host."""
+    if kind == "single_threaded":
+        runtime = SingleThreadedAgentRuntime(**kwargs)
+        runtime.start()
+        try:
+            yield runtime, runtime
+        finally:
+            await runtime.stop()
+        return
+
+    host = WorkerAgentRuntimeHost(address=address)
+    host.start()
+    sender = WorkerAgentRuntime(host_address=address)
+    receiver = WorkerAgentRuntime(host_address=address)
+    for worker in (sender, receiver):
+        worker.start()
+        for message_type in (BenchEvent, BenchRequest, BenchResponse):
+            worker.add_message_serializer(try_get_known_serializers_for_type(message_type))
+    try:
+        yield sender, receiver
+    finally:
+        await sender.stop()
+        await receiver.stop()
+        await host.stop()
+
+
+async def register(runtime: AgentRuntime, type: str, counter: Counter) -> None:
+    await runtime.register_factory(
+        type=AgentType(type), agent_factory=lambda: BenchAgent(counter), expected_class=BenchAgent
+    )
+
+
+async def time_sends(sender: AgentRuntime, recipients: List[AgentId]) -> List[float]:
+    """Send a request to each recipient in turn and return the round-trip times in seconds."""
+    latencies: List[float] = []
+    for i, recipient in enumerate(recipients):
+        start = time.perf_counter()
+        await sender.send_message(BenchRequest(i), recipient)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+async def bench_send(kind: str, address: str, scale: float) -> List[Result]:
+    count = max(10, int(2000 * scale))
+    async with runtimes(kind, address) as (sender, receiver):
+        await register(receiver, "bench", Counter())
+        recipient = AgentId("bench", "default")
+        await time_sends(sender, [recipient] * 50)  # Warm up.
+        latencies = sorted(await time_sends(sender, [recipient] * count))
+
+        semaphore = asyncio.Semaphore(64)
+
+        async def send(i: int) -> None:
+            async with semaphore:
+                await sender.send_message(BenchRequest(i), recipient)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(send(i) for i in range(count)))
+        elapsed = time.perf_counter() - start
+
+    return [
+        Result("send.latency.p50", kind, latencies[len(latencies) // 2] * 1e6, "us", False),
+        Result("send.latency.p99", kind, latencies[int(len(latencies) * 0.99)] * 1e6, "us", False),
+        Result("send.throughput", kind, count / elapsed, "messages/s", True),
+    ]
+
+
+async def bench_publish(kind: str, address: str, scale: float, subscribers: int = 8) -> List[Result]:
+    count = max(10, int(1000 * scale))
+    counter = Counter()
+    async with runtimes(kind, address) as (sender, receiver):
+        for i in range(subscribers):
+            await register(receiver, f"subscriber{i}", counter)
+            await receiver.add_subscription(TypeSubscription("bench", f"subscriber{i}"))
+        topic_id = TopicId("bench", "default")
+
+        counter.reset(subscribers)
+        await sender.publish_message(BenchEvent(-1), topic_id=topic_id)  # Warm up and create the agents.
+        await counter.done.wait()
+
+        counter.reset(count * subscribers)
+        start = time.perf_counter()
+        for i in range(count):
+            await sender.publish_message(BenchEvent(i), topic_id=topic_id)
+        await counter.done.wait()
+        elapsed = time.perf_counter() - start
+    return [Result(f"publish.fan_out.{subscribers}", kind, count * subscribers / elapsed, "deliveries/s", True)]
+
+
+async def bench_activation(kind: str, address: str, scale: float) -> List[Result]:
+    count = max(10, int(1000 * scale))
+    async with runtimes(kind, address) as (sender, receiver):
+        await register(receiver, "bench", Counter())
+        await time_sends(sender, [AgentId("bench", "warmup")] * 50)
+        # Every message goes to a new agent.
+        latencies = await time_sends(sender, [AgentId("bench", str(i)) for i in range(count)])
+    return [Result("agent.activation", kind, statistics.median(latencies) * 1e6, "us", False)]
+
+
+async def bench_intervention(kind: str, address: str, scale: float) -> List[Result]:
+    if kind != "single_threaded":
+        return []
+    count = max(10, int(2000 * scale))
+    async with runtimes(kind, address, intervention_handlers=[DefaultInterventionHandler()]) as (sender, receiver):
+        await register(receiver, "bench", Counter())
+        recipient = AgentId("bench", "default")
+        await time_sends(sender, [recipient] * 50)
+        latencies = await time_sends(sender, [recipient] * count)
+    return [Result("intervention.latency", kind, statistics.median(latencies) * 1e6, "us", False)]
+
+
+async def bench_serialization(kind: str, address: str, scale: float) -> List[Result]:
+    number = max(100, int(20000 * scale))
+    serializer = DataclassJsonMessageSerializer(ChatMessage)
+    message = ChatMessage(source="assistant", content="Hello, world! " * 20, tokens=list(range(64)), score=0.5)
+    payload = serializer.serialize(message)
+    serialize = min(timeit.repeat(lambda: serializer.serialize(message), number=number, repeat=3)) / number
+    deserialize = min(timeit.repeat(lambda: serializer.deserialize(payload), number=number, repeat=3)) / number
+    return [
+        Result("serialization.serialize", kind, serialize * 1e6, "us", False),
+        Result("serialization.deserialize", kind, deserialize * 1e6, "us", False),
+    ]
+
+
+RUNTIME_BENCHMARKS: List[Callable[[str, str, float], Awaitable[List[Result]]]] = [
+    bench_send,
+    bench_publish,
+    bench_activation,
+    bench_intervention,
+]
+
+
+def best(results: List[Result]) -> Result:
+    if results[0].higher_is_better:
+        return max(results, key=lambda result: result.value)
+    return min(results, key=lambda result: result.value)
+
+
+async def run(runtime_kinds: List[str], address: str, repeat: int, scale: float) -> List[Result]:
+    runs: Dict[Tuple[str, str], List[Result]] = {}
+    benchmarks = [(benchmark, kind) for kind in runtime_kinds for benchmark in RUNTIME_BENCHMARKS]
+    # Serialization does not depend on the runtime.
+    benchmarks.append((bench_serialization, "none"))
+    for _ in range(repeat):
+        for benchmark, kind in benchmarks:
+            for result in await benchmark(kind, address, scale):
+                runs.setdefault(result.key, []).append(result)
+    return [best(results) for results in runs.values()]
+
+
+def compare(results: List[Result], baseline: List[Result], threshold: float, noise_floor: float) -> List[Result]:
+    """Print how the results changed from the baseline and return the ones that got worse by more than
+    ``threshold``, a fraction of the baseline value. Times that changed by less than ``noise_floor`` microseconds
+    and results with a baseline of 0 or less are never returned."""
+    baseline_by_key = {result.key: result for result in baseline}
+    regressions: List[Result] = []
+    print(f"\n{'benchmark':<28} {'runtime':<16} {'baseline':>12} {'current':>12} {'change':>8}")
+    for result in results:
+        previous = baseline_by_key.get(result.key)
+        if previous is None:
+            print(f"{result.benchmark:<28} {result.runtime:<16} {'-':>12} {result.value:>12.2f}")
+            continue
+        if previous.value <= 0:
+            # There is nothing to compare a change with.
+            print(f"{result.benchmark:<28} {result.runtime:<16} {previous.value:>12.2f} {result.value:>12.2f}")
+            continue
+        change = (result.value - previous.value) / previous.value
+        worse = -change if result.higher_is_better else change
+        within_noise = result.unit == "us" and abs(result.value - previous.value) < noise_floor
+        flag = ""
+        if worse > threshold and not within_noise:
+            regressions.append(result)
+            flag = "  REGRESSION"
+        print(
+            f"{result.benchmark:<28} {result.runtime:<16} {previous.value:>12.2f} {result.value:>12.2f} "
+            f"{change:>+8.1%}{flag}"
+        )
+    return regressions
+
+
+def load(path: str) -> List[Result]:
+    with open(path) as f:
+        return [Result(**result) for result in json.load(f)["results"]]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Run the runtime benchmarks.")
+    parser.add_argument("--runtimes", nargs="+", choices=RUNTIMES, default=list(RUNTIMES), help="Runtimes to run.")
+    parser.add_argument("--address", default="localhost:50081", help="Address for the worker runtime host.")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs of each benchmark, the best one is kept.")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiplier of the number of messages sent.")
+    parser.add_argument("--output", help="Write the results to this JSON file.")
+    parser.add_argument("--compare", metavar="BASELINE", help="Compare the results with this JSON file.")
+    parser.add_argument(
+        "--threshold", type=float, default=0.1, help="Change from the baseline reported as a regression."
+    )
+    parser.add_argument(
+        "--noise-floor", type=float, default=1.0, help="Change in microseconds of times that is never a regression."
+    )
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.runtimes, args.address, args.repeat, args.scale))
+    for result in results:
+        print(f"{result.benchmark:<28} {result.runtime:<16} {result.value:>12.2f} {result.unit}")
+
+    if args.output:
+        try:
+            package_version = version("autogen-core")
+        except PackageNotFoundError:
+            package_version = None
+        report = {
+            "metadata": {
+                "autogen_core": package_version,
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "machine": platform.machine(),
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "repeat": args.repeat,
+                "scale": args.scale,
+            },
+            "results": [asdict(result) for result in results],
+        }
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        regressions = compare(results, load(args.compare), args.threshold, args.noise_floor)
+        if regressions:
+            print(f"\n{len(regressions)} benchmark(s) regressed by more than {args.threshold:.0%}.")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
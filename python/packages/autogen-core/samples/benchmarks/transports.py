@@ -0,0 +1,47 @@
+"""Compares the message throughput of :class:`WorkerAgentRuntimeHost` over the transports that the host
+address selects: TCP (``host:port``), a Unix domain socket (``unix://``) and in-process (``inproc://``).
+
+Each transport runs the workload of ``host_throughput.py``, so the numbers are comparable with it.
+
+Run with:
+
+.. code-block:: bash
+
+    python samples/benchmarks/transports.py --workers 4 --events 2000 --requests 2000
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from host_throughput import main as run_workload  # noqa: E402
+
+
+async def main(
+    port: int, num_workers: int, num_events: int, num_requests: int, concurrency: int, batching: bool
+) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        addresses = {
+            "tcp": f"localhost:{port}",
+            "unix": f"unix://{os.path.join(directory, 'host.sock')}",
+            "inproc": "inproc://benchmark",
+        }
+        for name, address in addresses.items():
+            print(f"{name} ({address})")
+            await run_workload(address, num_workers, num_events, num_requests, concurrency, batching)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the message throughput of the host transports.")
+    parser.add_argument("--port", type=int, default=50071, help="Port for the TCP transport.")
+    parser.add_argument("--workers", type=int, default=4, help="Number of receiver workers.")
+    parser.add_argument("--events", type=int, default=2000, help="Number of events to publish.")
+    parser.add_argument("--requests", type=int, default=2000, help="Number of RPC requests to send.")
+    parser.add_argument("--concurrency", type=int, default=64, help="Number of RPC requests in flight.")
+    parser.add_argument("--batching", action="store_true", help="Batch messages between workers and the host.")
+    args = parser.parse_args()
+    asyncio.run(main(args.port, args.workers, args.events, args.requests, args.concurrency, args.batching))
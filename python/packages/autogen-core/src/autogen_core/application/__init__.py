@@ -2,8 +2,36 @@
 The :mod:`autogen_core.application` module provides implementations of core components that are used to compose an application
 """
 
+from ._agent_state_store import AgentStateStore, InMemoryAgentStateStore, SqliteAgentStateStore
+from ._host_agent_state_store import HostAgentStateStore
+from ._message_batching import MessageBatchingConfig
+from ._payload_compression import PayloadCompressionConfig
+from ._reconnect import ReconnectConfig
 from ._single_threaded_agent_runtime import SingleThreadedAgentRuntime
+from ._versioned_state_store import (
+    InMemoryVersionedStateStore,
+    SqliteVersionedStateStore,
+    StateWrite,
+    VersionedState,
+    VersionedStateStore,
+)
 from ._worker_runtime import WorkerAgentRuntime
 from ._worker_runtime_host import WorkerAgentRuntimeHost
 
-__all__ = ["SingleThreadedAgentRuntime", "WorkerAgentRuntime", "WorkerAgentRuntimeHost"]
+__all__ = [
+    "SingleThreadedAgentRuntime",
+    "WorkerAgentRuntime",
+    "WorkerAgentRuntimeHost",
+    "AgentStateStore",
+    "InMemoryAgentStateStore",
+    "SqliteAgentStateStore",
+    "HostAgentStateStore",
+    "VersionedStateStore",
+    "VersionedState",
+    "StateWrite",
+    "InMemoryVersionedStateStore",
+    "SqliteVersionedStateStore",
+    "MessageBatchingConfig",
+    "PayloadCompressionConfig",
+    "ReconnectConfig",
+]
@@ -0,0 +1,185 @@
+import asyncio
+import logging
+import time
+from asyncio import Future
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Iterator, List, Set, Tuple
+
+from ..base import Agent, AgentId
+from ._agent_state_store import AgentStateStore, InMemoryAgentStateStore
+
+logger = logging.getLogger("autogen_core")
+
+
+class LiveAgentCache:
+    """Holds the live agent instances of a runtime.
+
+    When ``max_size`` or ``idle_timeout`` is set, agents beyond the size limit (least recently used first)
+    or idle for longer than the timeout are passivated: their state is saved with
+    :meth:`~autogen_core.base.Agent.save_state` into the state store and the instance is dropped.
+    The next activation of a passivated agent creates a new instance and restores its state with
+    :meth:`~autogen_core.base.Agent.load_state`.
+
+    Agents that are pinned, i.e. currently handling a message, are never passivated. Limits are
+    enforced whenever an agent is activated.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_size: int | None = None,
+        idle_timeout: float | None = None,
+        state_store: AgentStateStore | None = None,
+    ) -> None:
+        if max_size is not None and max_size < 1:
+            raise ValueError("max_size must be at least 1.")
+        if idle_timeout is not None and idle_timeout <= 0:
+            raise ValueError("idle_timeout must be positive.")
+        self._max_size = max_size
+        self._idle_timeout = idle_timeout
+        self._state_store = state_store if state_store is not None else InMemoryAgentStateStore()
+        # Ordered from least to most recently used.
+        self._agents: OrderedDict[AgentId, Agent] = OrderedDict()
+        self._last_used: Dict[AgentId, float] = {}
+        self._pins: Dict[AgentId, int] = {}
+        self._passivated: Set[AgentId] = set()
+        self._passivating: Dict[AgentId, Future[None]] = {}
+        self._activating: Dict[AgentId, Future[Agent]] = {}
+
+    @property
+    def _bounded(self) -> bool:
+        return self._max_size is not None or self._idle_timeout is not None
+
+    @property
+    def passivated_agents(self) -> Set[AgentId]:
+        """The ids of agents whose state is currently held in the state store."""
+        return set(self._passivated)
+
+    @property
+    def state_store(self) -> AgentStateStore:
+        return self._state_store
+
+    def __contains__(self, agent_id: object) -> bool:
+        return agent_id in self._agents
+
+    def __iter__(self) -> Iterator[AgentId]:
+        return iter(list(self._agents))
+
+    def __len__(self) -> int:
+        return len(self._agents)
+
+    def get(self, agent_id: AgentId) -> Agent | None:
+        """Return the live instance of an agent, or None if it is not live."""
+        agent = self._agents.get(agent_id)
+        if agent is not None and self._bounded:
+            self._touch(agent_id)
+        return agent
+
+    def pin(self, agent_id: AgentId) -> None:
+        """Prevent an agent from being passivated until :meth:`unpin` is called."""
+        self._pins[agent_id] = self._pins.get(agent_id, 0) + 1
+
+    def unpin(self, agent_id: AgentId) -> None:
+        count = self._pins.get(agent_id, 0) - 1
+        if count > 0:
+            self._pins[agent_id] = count
+        else:
+            self._pins.pop(agent_id, None)
+            if self._bounded and agent_id in self._agents:
+                self._touch(agent_id)
+
+    async def activate(self, agent_id: AgentId, factory: Callable[[], Awaitable[Agent]]) -> Agent:
+        """Return the live instance of an agent, creating it with ``factory`` and restoring
+        its state if it was passivated."""
+        while True:
+            # Wait for an in-flight passivation or activation of the same agent.
+            passivating = self._passivating.get(agent_id)
+            if passivating is not None:
+                await passivating
+                continue
+            agent = self.get(agent_id)
+            if agent is not None:
+                return agent
+            activating = self._activating.get(agent_id)
+            if activating is not None:
+                await asyncio.shield(activating)
+                continue
+            break
+
+        future: Future[Agent] = asyncio.get_event_loop().create_future()
+        self._activating[agent_id] = future
+        try:
+            agent = await factory()
+            if agent_id in self._passivated:
+                state = await self._state_store.load(agent_id)
+                if state is not None:
+                    await agent.load_state(state)
+                    await self._state_store.delete(agent_id)
+                self._passivated.discard(agent_id)
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved in case nobody else was waiting.
+            future.exception()
+            raise
+        finally:
+            del self._activating[agent_id]
+
+        self._agents[agent_id] = agent
+        if self._bounded:
+            self._touch(agent_id)
+        future.set_result(agent)
+        # Keep the new agent from being passivated by a concurrent activation while we wait.
+        self.pin(agent_id)
+        try:
+            await self._enforce_limits(keep=agent_id)
+        finally:
+            self.unpin(agent_id)
+        return agent
+
+    def _touch(self, agent_id: AgentId) -> None:
+        self._agents.move_to_end(agent_id)
+        if self._idle_timeout is not None:
+            self._last_used[agent_id] = time.monotonic()
+
+    def _select_victims(self, keep: AgentId) -> List[Tuple[AgentId, Agent]]:
+        victims: List[Tuple[AgentId, Agent]] = []
+        num_live = len(self._agents)
+        now = time.monotonic()
+        for agent_id, agent in self._agents.items():
+            if agent_id == keep or agent_id in self._pins:
+                continue
+            over_capacity = self._max_size is not None and num_live > self._max_size
+            idle = self._idle_timeout is not None and now - self._last_used.get(agent_id, now) > self._idle_timeout
+            if not over_capacity and not idle:
+                # Entries are in LRU order, so the agents after this one are neither over capacity nor idle.
+                break
+            victims.append((agent_id, agent))
+            num_live -= 1
+        return victims
+
+    async def _enforce_limits(self, keep: AgentId) -> None:
+        if not self._bounded:
+            return
+        for agent_id, agent in self._select_victims(keep):
+            # The agent may have been picked up for a message while an earlier victim was being saved.
+            if self._agents.get(agent_id) is agent and agent_id not in self._pins:
+                await self._passivate(agent_id, agent)
+
+    async def _passivate(self, agent_id: AgentId, agent: Agent) -> None:
+        del self._agents[agent_id]
+        self._last_used.pop(agent_id, None)
+        done: Future[None] = asyncio.get_event_loop().create_future()
+        self._passivating[agent_id] = done
+        try:
+            state = await agent.save_state()
+            await self._state_store.save(agent_id, state)
+            self._passivated.add(agent_id)
+            logger.debug("Passivated agent %s", agent_id)
+        except Exception:
+            # Keep the agent live rather than losing its state.
+            logger.error(f"Failed to passivate agent {agent_id}, keeping it in memory.", exc_info=True)
+            self._agents[agent_id] = agent
+            self._touch(agent_id)
+        finally:
+            del self._passivating[agent_id]
+            done.set_result(None)
@@ -0,0 +1,113 @@
+import asyncio
+from asyncio import Future
+from collections import deque
+from typing import Deque, Dict
+
+from ..base import AgentId
+
+
+class _Mailbox:
+    __slots__ = ("running", "waiting")
+
+    def __init__(self) -> None:
+        self.running = 0
+        self.waiting: Deque[Future[None]] = deque()
+
+
+class MailboxSlot:
+    """A place in the mailbox of an agent, taken with :meth:`AgentMailboxes.reserve`. Wait for it before calling
+    the handler of the agent and release it when the handler is done."""
+
+    __slots__ = ("_mailboxes", "_agent_id", "_waiter", "_released")
+
+    def __init__(self, mailboxes: "AgentMailboxes | None", agent_id: AgentId | None, waiter: Future[None] | None):
+        self._mailboxes = mailboxes
+        self._agent_id = agent_id
+        self._waiter = waiter
+        self._released = False
+
+    async def wait(self) -> None:
+        """Wait until the messages received before this one leave a free slot."""
+        if self._waiter is not None:
+            await self._waiter
+
+    def release(self) -> None:
+        """Free the slot, or give up the place in the mailbox if the turn has not come. Can be called more than
+        once."""
+        if self._mailboxes is None or self._released:
+            return
+        self._released = True
+        assert self._agent_id is not None
+        self._mailboxes._release(self._agent_id, self._waiter)  # type: ignore[reportPrivateUsage]
+
+
+# The slot of messages to agents of types without a concurrency limit.
+_UNLIMITED_SLOT = MailboxSlot(None, None, None)
+
+
+class AgentMailboxes:
+    """Limits how many messages each agent handles at once, by agent type.
+
+    Each agent of a type with a limit has a mailbox. Messages take a slot in the mailbox of their recipient in the
+    order they are dispatched and wait there until fewer than the limit of messages to the agent are being
+    handled, so an agent with a limit of 1 handles its messages one at a time in the order they arrived. Messages
+    to other agents are not held up by a busy agent. Agents of types without a limit handle their messages as soon
+    as they arrive.
+    """
+
+    def __init__(self) -> None:
+        self._max_concurrency: Dict[str, int] = {}
+        self._mailboxes: Dict[AgentId, _Mailbox] = {}
+
+    def set_max_concurrency(self, agent_type: str, max_concurrency: int | None) -> None:
+        """Set the number of messages each agent of the type handles at once. None means no limit."""
+        if max_concurrency is None:
+            self._max_concurrency.pop(agent_type, None)
+            return
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1.")
+        self._max_concurrency[agent_type] = max_concurrency
+
+    def max_concurrency(self, agent_type: str) -> int | None:
+        return self._max_concurrency.get(agent_type)
+
+    def reserve(self, agent_id: AgentId) -> MailboxSlot:
+        """Take the next slot in the mailbox of an agent. Slots are handed out in the order they are reserved."""
+        max_concurrency = self._max_concurrency.get(agent_id.type)
+        if max_concurrency is None:
+            return _UNLIMITED_SLOT
+        mailbox = self._mailboxes.get(agent_id)
+        if mailbox is None:
+            mailbox = self._mailboxes[agent_id] = _Mailbox()
+        if mailbox.running < max_concurrency and not mailbox.waiting:
+            mailbox.running += 1
+            return MailboxSlot(self, agent_id, None)
+        waiter: Future[None] = asyncio.get_running_loop().create_future()
+        mailbox.waiting.append(waiter)
+        return MailboxSlot(self, agent_id, waiter)
+
+    def queued(self, agent_id: AgentId) -> int:
+        """Number of messages waiting for a slot in the mailbox of an agent."""
+        mailbox = self._mailboxes.get(agent_id)
+        return len(mailbox.waiting) if mailbox is not None else 0
+
+    def _release(self, agent_id: AgentId, waiter: Future[None] | None) -> None:
+        mailbox = self._mailboxes[agent_id]
+        if waiter is not None and not (waiter.done() and not waiter.cancelled()):
+            # The turn of the message had not come, so it only leaves the queue.
+            if not waiter.done():
+                waiter.cancel()
+            try:
+                mailbox.waiting.remove(waiter)
+            except ValueError:
+                pass
+        else:
+            # Hand the slot to the next waiting message that is still waiting.
+            while mailbox.waiting:
+                next_waiter = mailbox.waiting.popleft()
+                if not next_waiter.done():
+                    next_waiter.set_result(None)
+                    return
+            mailbox.running -= 1
+        if mailbox.running == 0 and not mailbox.waiting:
+            del self._mailboxes[agent_id]
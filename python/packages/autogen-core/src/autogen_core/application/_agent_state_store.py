@@ -0,0 +1,99 @@
+import asyncio
+import json
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Dict, Mapping
+
+from ..base import AgentId
+
+
+class AgentStateStore(ABC):
+    """A store for the state of agents that have been passivated by a runtime.
+
+    States are the JSON-serializable mappings returned by :meth:`~autogen_core.base.Agent.save_state`.
+    """
+
+    @abstractmethod
+    async def save(self, agent_id: AgentId, state: Mapping[str, Any]) -> None:
+        """Save the state of an agent, replacing any previously saved state."""
+        ...
+
+    @abstractmethod
+    async def load(self, agent_id: AgentId) -> Mapping[str, Any] | None:
+        """Load the saved state of an agent, or None if there is no saved state."""
+        ...
+
+    @abstractmethod
+    async def delete(self, agent_id: AgentId) -> None:
+        """Delete the saved state of an agent. Does nothing if there is no saved state."""
+        ...
+
+
+class InMemoryAgentStateStore(AgentStateStore):
+    """An :class:`AgentStateStore` that keeps states in a dictionary in memory."""
+
+    def __init__(self) -> None:
+        self._states: Dict[AgentId, Mapping[str, Any]] = {}
+
+    async def save(self, agent_id: AgentId, state: Mapping[str, Any]) -> None:
+        self._states[agent_id] = state
+
+    async def load(self, agent_id: AgentId) -> Mapping[str, Any] | None:
+        return self._states.get(agent_id)
+
+    async def delete(self, agent_id: AgentId) -> None:
+        self._states.pop(agent_id, None)
+
+
+class SqliteAgentStateStore(AgentStateStore):
+    """An :class:`AgentStateStore` that keeps JSON-encoded states in a SQLite database.
+
+    Database calls run in a worker thread so they do not block the event loop.
+
+    Args:
+        path (str | Path, optional): Path to the database file. Defaults to ``":memory:"``.
+    """
+
+    def __init__(self, path: str | Path = ":memory:") -> None:
+        self._connection = sqlite3.connect(str(path), check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS agent_state (agent_id TEXT PRIMARY KEY, state TEXT NOT NULL)"
+            )
+
+    def _save(self, agent_id: AgentId, state: Mapping[str, Any]) -> None:
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO agent_state (agent_id, state) VALUES (?, ?)", (str(agent_id), json.dumps(state))
+            )
+
+    def _load(self, agent_id: AgentId) -> Mapping[str, Any] | None:
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT state FROM agent_state WHERE agent_id = ?", (str(agent_id),)
+            ).fetchone()
+        if row is None:
+            return None
+        state: Mapping[str, Any] = json.loads(row[0])
+        return state
+
+    def _delete(self, agent_id: AgentId) -> None:
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM agent_state WHERE agent_id = ?", (str(agent_id),))
+
+    async def save(self, agent_id: AgentId, state: Mapping[str, Any]) -> None:
+        await asyncio.to_thread(self._save, agent_id, state)
+
+    async def load(self, agent_id: AgentId) -> Mapping[str, Any] | None:
+        return await asyncio.to_thread(self._load, agent_id)
+
+    async def delete(self, agent_id: AgentId) -> None:
+        await asyncio.to_thread(self._delete, agent_id)
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,16 @@
+# Metadata exchanged when a worker opens a channel to the host. Workers announce their capabilities in the
+# invocation metadata of OpenChannel, and the host announces its capabilities in the initial metadata of the response.
+CAPABILITY_ENABLED = "1"
+
+# Sent by a worker that reads message batches, and by a host that reads them.
+BATCHING_METADATA_KEY = "agent-message-batching"
+
+# Sent by a host that does not deliver events marked as delivered locally back to the worker that published them.
+LOCAL_DELIVERY_METADATA_KEY = "agent-local-delivery"
+
+# Sent by a host that lets several workers register the same agent type.
+SHARED_AGENT_TYPES_METADATA_KEY = "agent-shared-agent-types"
+
+# Key in the metadata of an RpcRequest: the number of seconds the sender waits for the response, counted from when
+# the request was sent. Relative, like the gRPC timeout header, so that it does not depend on synchronized clocks.
+TIMEOUT_METADATA_KEY = "agent-timeout"
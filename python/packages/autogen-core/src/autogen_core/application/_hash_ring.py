@@ -0,0 +1,85 @@
+import bisect
+import hashlib
+from typing import Dict, Generic, Hashable, Iterator, List, TypeVar
+
+T = TypeVar("T", bound=Hashable)
+
+
+def _hash(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), "big")
+
+
+class ConsistentHashRing(Generic[T]):
+    """Maps keys to nodes with consistent hashing.
+
+    Each node is placed on the ring at ``replicas`` points. A key belongs to the first node point at or after
+    the hash of the key, so adding or removing a node only moves the keys of the ring segments next to that
+    node's points; all other keys keep their node.
+
+    Args:
+        replicas (int, optional): Number of points per node on the ring. More points spread keys more evenly.
+            Defaults to 100.
+    """
+
+    def __init__(self, replicas: int = 100) -> None:
+        if replicas < 1:
+            raise ValueError("replicas must be at least 1.")
+        self._replicas = replicas
+        # Sorted hashes of the node points, and the node at each point.
+        self._hashes: List[int] = []
+        self._points: Dict[int, T] = {}
+        self._nodes: List[T] = []
+
+    def add(self, node: T) -> None:
+        """Add a node to the ring.
+
+        Raises:
+            ValueError: If the node is already on the ring.
+        """
+        if node in self._nodes:
+            raise ValueError(f"Node {node} is already on the ring.")
+        self._nodes.append(node)
+        for i in range(self._replicas):
+            point = _hash(f"{node}#{i}")
+            # Collisions are practically impossible with 64-bit hashes; keep the existing owner if one happens.
+            if point not in self._points:
+                self._points[point] = node
+                bisect.insort(self._hashes, point)
+
+    def remove(self, node: T) -> None:
+        """Remove a node from the ring.
+
+        Raises:
+            ValueError: If the node is not on the ring.
+        """
+        self._nodes.remove(node)
+        self._points = {point: owner for point, owner in self._points.items() if owner != node}
+        self._hashes = sorted(self._points)
+
+    def copy(self) -> "ConsistentHashRing[T]":
+        """Return a copy of the ring that can be changed without affecting this one."""
+        ring = ConsistentHashRing[T](self._replicas)
+        ring._hashes = list(self._hashes)
+        ring._points = dict(self._points)
+        ring._nodes = list(self._nodes)
+        return ring
+
+    def get(self, key: str) -> T | None:
+        """Return the node that owns a key, or None if the ring is empty."""
+        if not self._hashes:
+            return None
+        if len(self._nodes) == 1:
+            return self._nodes[0]
+        index = bisect.bisect_left(self._hashes, _hash(key))
+        if index == len(self._hashes):
+            index = 0
+        return self._points[self._hashes[index]]
+
+    def __contains__(self, node: object) -> bool:
+        return node in self._nodes
+
+    def __iter__(self) -> Iterator[T]:
+        return iter(list(self._nodes))
+
+    def __len__(self) -> int:
+        return len(self._nodes)
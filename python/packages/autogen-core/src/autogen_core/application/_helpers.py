@@ -1,11 +1,12 @@
-from collections import defaultdict
-from typing import Awaitable, Callable, DefaultDict, List, Set
+from collections import OrderedDict, defaultdict
+from typing import Awaitable, Callable, DefaultDict, Iterable, List, Set, Tuple
 
 from ..base._agent import Agent
 from ..base._agent_id import AgentId
 from ..base._agent_type import AgentType
 from ..base._subscription import Subscription
 from ..base._topic import TopicId
+from ..components import TypeSubscription
 
 
 async def get_impl(
@@ -30,45 +31,95 @@ async def get_impl(
 
 
 class SubscriptionManager:
-    def __init__(self) -> None:
+    """Resolves the recipients of a topic from the registered subscriptions.
+
+    :class:`~autogen_core.components.TypeSubscription` only looks at the topic type, so those subscriptions are
+    indexed by topic type and only the subscriptions for a topic's type are checked. Other subscriptions are
+    checked against every topic. Resolved recipients are cached per topic in a bounded LRU cache, and the cache
+    is updated incrementally when subscriptions are added or removed.
+
+    Args:
+        max_cached_topics (int, optional): Maximum number of topics whose recipients are cached. Defaults to 4096.
+    """
+
+    def __init__(self, max_cached_topics: int = 4096) -> None:
         self._subscriptions: List[Subscription] = []
-        self._seen_topics: Set[TopicId] = set()
-        self._subscribed_recipients: DefaultDict[TopicId, List[AgentId]] = defaultdict(list)
+        self._subscriptions_by_topic_type: DefaultDict[str, List[TypeSubscription]] = defaultdict(list)
+        self._type_subscription_keys: Set[Tuple[str, str]] = set()
+        self._other_subscriptions: List[Subscription] = []
+        self._max_cached_topics = max_cached_topics
+        # Ordered from least to most recently used.
+        self._subscribed_recipients: OrderedDict[TopicId, List[AgentId]] = OrderedDict()
+        self._cached_topics_by_type: DefaultDict[str, Set[TopicId]] = defaultdict(set)
 
     async def add_subscription(self, subscription: Subscription) -> None:
         # Check if the subscription already exists
-        if any(sub == subscription for sub in self._subscriptions):
+        if isinstance(subscription, TypeSubscription):
+            key = (subscription.topic_type, subscription.agent_type)
+            if key in self._type_subscription_keys or any(sub.id == subscription.id for sub in self._subscriptions):
+                raise ValueError("Subscription already exists")
+        elif any(sub == subscription for sub in self._subscriptions):
             raise ValueError("Subscription already exists")
 
         self._subscriptions.append(subscription)
-        self._rebuild_subscriptions(self._seen_topics)
+        if isinstance(subscription, TypeSubscription):
+            self._type_subscription_keys.add((subscription.topic_type, subscription.agent_type))
+            self._subscriptions_by_topic_type[subscription.topic_type].append(subscription)
+            affected_topics: Iterable[TopicId] = self._cached_topics_by_type.get(subscription.topic_type, ())
+        else:
+            self._other_subscriptions.append(subscription)
+            affected_topics = self._subscribed_recipients.keys()
+        # Replace the cached lists rather than changing them, as they may be in use by deliveries in progress.
+        for topic in affected_topics:
+            if subscription.is_match(topic):
+                self._subscribed_recipients[topic] = self._resolve(topic)
 
     async def remove_subscription(self, id: str) -> None:
         # Check if the subscription exists
-        if not any(sub.id == id for sub in self._subscriptions):
+        subscription = next((sub for sub in self._subscriptions if sub.id == id), None)
+        if subscription is None:
             raise ValueError("Subscription does not exist")
 
-        def is_not_sub(x: Subscription) -> bool:
-            return x.id != id
-
-        self._subscriptions = list(filter(is_not_sub, self._subscriptions))
-
-        # Rebuild the subscriptions
-        self._rebuild_subscriptions(self._seen_topics)
+        self._subscriptions = [sub for sub in self._subscriptions if sub.id != id]
+        if isinstance(subscription, TypeSubscription):
+            self._type_subscription_keys.discard((subscription.topic_type, subscription.agent_type))
+            remaining = [sub for sub in self._subscriptions_by_topic_type[subscription.topic_type] if sub.id != id]
+            if remaining:
+                self._subscriptions_by_topic_type[subscription.topic_type] = remaining
+            else:
+                del self._subscriptions_by_topic_type[subscription.topic_type]
+            affected_topics: List[TopicId] = list(self._cached_topics_by_type.get(subscription.topic_type, ()))
+        else:
+            self._other_subscriptions = [sub for sub in self._other_subscriptions if sub.id != id]
+            affected_topics = list(self._subscribed_recipients.keys())
+
+        # Rebuild only the cached topics the removed subscription could have contributed to.
+        for topic in affected_topics:
+            if subscription.is_match(topic):
+                self._subscribed_recipients[topic] = self._resolve(topic)
 
     async def get_subscribed_recipients(self, topic: TopicId) -> List[AgentId]:
-        if topic not in self._seen_topics:
-            self._build_for_new_topic(topic)
-        return self._subscribed_recipients[topic]
-
-    # TODO: optimize this...
-    def _rebuild_subscriptions(self, topics: Set[TopicId]) -> None:
-        self._subscribed_recipients.clear()
-        for topic in topics:
-            self._build_for_new_topic(topic)
-
-    def _build_for_new_topic(self, topic: TopicId) -> None:
-        self._seen_topics.add(topic)
-        for subscription in self._subscriptions:
+        recipients = self._subscribed_recipients.get(topic)
+        if recipients is not None:
+            self._subscribed_recipients.move_to_end(topic)
+            return recipients
+
+        recipients = self._resolve(topic)
+        self._subscribed_recipients[topic] = recipients
+        self._cached_topics_by_type[topic.type].add(topic)
+        if len(self._subscribed_recipients) > self._max_cached_topics:
+            evicted, _ = self._subscribed_recipients.popitem(last=False)
+            cached_of_type = self._cached_topics_by_type[evicted.type]
+            cached_of_type.discard(evicted)
+            if not cached_of_type:
+                del self._cached_topics_by_type[evicted.type]
+        return recipients
+
+    def _resolve(self, topic: TopicId) -> List[AgentId]:
+        recipients: List[AgentId] = [
+            subscription.map_to_agent(topic) for subscription in self._subscriptions_by_topic_type.get(topic.type, ())
+        ]
+        for subscription in self._other_subscriptions:
             if subscription.is_match(topic):
-                self._subscribed_recipients[topic].append(subscription.map_to_agent(topic))
+                recipients.append(subscription.map_to_agent(topic))
+        return recipients
@@ -0,0 +1,162 @@
+import asyncio
+import json
+from asyncio import Future, Task
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, Generic, List, Mapping, Sequence, Tuple, TypeVar
+
+import grpc
+
+from ..base import AgentId
+from ..base._type_helpers import ChannelArgumentType
+from ..base.exceptions import StateConflictException
+from ._agent_state_store import AgentStateStore
+from ._inproc_transport import create_channel
+from .protos import agent_worker_pb2, agent_worker_pb2_grpc
+
+if TYPE_CHECKING:
+    from .protos.agent_worker_pb2_grpc import AgentRpcAsyncStub
+
+ItemT = TypeVar("ItemT")
+ResultT = TypeVar("ResultT")
+
+
+class _Batcher(Generic[ItemT, ResultT]):
+    """Sends items in batches, one batch at a time. Items submitted while a batch is in flight go into the next
+    batch, so the batches grow with the load without delaying items when there is none."""
+
+    def __init__(self, send: Callable[[List[ItemT]], Awaitable[Sequence[ResultT]]], max_batch_size: int) -> None:
+        self._send = send
+        self._max_batch_size = max_batch_size
+        self._pending: List[Tuple[ItemT, Future[ResultT]]] = []
+        self._task: Task[None] | None = None
+
+    async def submit(self, item: ItemT) -> ResultT:
+        future: Future[ResultT] = asyncio.get_running_loop().create_future()
+        self._pending.append((item, future))
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+        return await future
+
+    async def _run(self) -> None:
+        try:
+            while self._pending:
+                batch = self._pending[: self._max_batch_size]
+                del self._pending[: self._max_batch_size]
+                try:
+                    results = await self._send([item for item, _ in batch])
+                except Exception as e:
+                    for _, future in batch:
+                        if not future.done():
+                            future.set_exception(e)
+                    continue
+                for (_, future), result in zip(batch, results, strict=True):
+                    if not future.done():
+                        future.set_result(result)
+        finally:
+            self._task = None
+
+
+class HostAgentStateStore(AgentStateStore):
+    """An :class:`AgentStateStore` that keeps states in the state store of a :class:`WorkerAgentRuntimeHost`, so
+    that they outlive the worker, for example as the ``agent_state_store`` of a :class:`WorkerAgentRuntime` or
+    to checkpoint the states returned by :meth:`WorkerAgentRuntime.agent_save_state`.
+
+    States are sent to the host as JSON. Calls made while a call to the host is in flight are sent together in
+    the next call, where only the last save or delete of each agent is sent. The store remembers the ETag of each state it loads or saves, and the host only accepts a
+    save or delete if the state still has that ETag, so :meth:`save` raises
+    :class:`~autogen_core.base.exceptions.StateConflictException` instead of overwriting a state that was saved
+    elsewhere since this store last saw it. States this store has not seen are overwritten.
+
+    Args:
+        host_address (str): The address of the host.
+        extra_grpc_config (ChannelArgumentType, optional): Extra gRPC channel options.
+        max_batch_size (int, optional): Maximum number of states in a call to the host. Defaults to 256.
+    """
+
+    def __init__(
+        self, host_address: str, extra_grpc_config: ChannelArgumentType | None = None, max_batch_size: int = 256
+    ) -> None:
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1.")
+        self._host_address = host_address
+        self._extra_grpc_config = extra_grpc_config or []
+        self._channel: grpc.aio.Channel | None = None  # type: ignore
+        self._stub: AgentRpcAsyncStub | None = None
+        self._etags: Dict[AgentId, str] = {}
+        self._gets = _Batcher[AgentId, agent_worker_pb2.GetStateResponse](self._send_gets, max_batch_size)
+        # Writes are the states to save, or None to delete the state.
+        self._saves = _Batcher[Tuple[AgentId, bytes | None], agent_worker_pb2.SaveStateResponse](
+            self._send_saves, max_batch_size
+        )
+
+    def _get_stub(self) -> "AgentRpcAsyncStub":
+        # The channel is created on first use, in the event loop that uses it.
+        if self._stub is None:
+            self._channel = create_channel(self._host_address, self._extra_grpc_config)
+            stub: AgentRpcAsyncStub = agent_worker_pb2_grpc.AgentRpcStub(self._channel)  # type: ignore
+            self._stub = stub
+        return self._stub
+
+    async def _send_gets(self, agent_ids: List[AgentId]) -> Sequence[agent_worker_pb2.GetStateResponse]:
+        request = agent_worker_pb2.GetStatesRequest(
+            agent_ids=[agent_worker_pb2.AgentId(type=agent_id.type, key=agent_id.key) for agent_id in agent_ids]
+        )
+        response: agent_worker_pb2.GetStatesResponse = await self._get_stub().GetStates(request)  # type: ignore
+        return response.responses
+
+    async def _send_saves(
+        self, writes: List[Tuple[AgentId, bytes | None]]
+    ) -> Sequence[agent_worker_pb2.SaveStateResponse]:
+        # Only the last write of each agent in the batch is sent, and the earlier ones get its response, as if they
+        # had been made just before it. The ETags are read here rather than when the writes are made, so that
+        # writes of an agent that was written by an earlier batch carry the ETag of that write.
+        last_writes = {agent_id: data for agent_id, data in writes}
+        agent_states: List[agent_worker_pb2.AgentState] = []
+        for agent_id, data in last_writes.items():
+            agent_state = agent_worker_pb2.AgentState(
+                agent_id=agent_worker_pb2.AgentId(type=agent_id.type, key=agent_id.key),
+                eTag=self._etags.get(agent_id, ""),
+            )
+            if data is not None:
+                agent_state.binary_data = data
+            agent_states.append(agent_state)
+        request = agent_worker_pb2.SaveStatesRequest(agent_states=agent_states)
+        response: agent_worker_pb2.SaveStatesResponse = await self._get_stub().SaveStates(request)  # type: ignore
+        responses = dict(zip(last_writes, response.responses, strict=True))
+        for agent_id, data in last_writes.items():
+            if responses[agent_id].success:
+                if data is None:
+                    self._etags.pop(agent_id, None)
+                else:
+                    self._etags[agent_id] = responses[agent_id].eTag
+        return [responses[agent_id] for agent_id, _ in writes]
+
+    async def _write(self, agent_id: AgentId, data: bytes | None) -> None:
+        response = await self._saves.submit((agent_id, data))
+        if response.conflict:
+            raise StateConflictException(f"The state of {agent_id} was saved elsewhere since it was last loaded.")
+        if not response.success:
+            raise RuntimeError(response.error)
+
+    async def save(self, agent_id: AgentId, state: Mapping[str, Any]) -> None:
+        await self._write(agent_id, json.dumps(state).encode())
+
+    async def load(self, agent_id: AgentId) -> Mapping[str, Any] | None:
+        response = await self._gets.submit(agent_id)
+        if not response.success:
+            raise RuntimeError(response.error)
+        if not response.HasField("agent_state"):
+            self._etags.pop(agent_id, None)
+            return None
+        self._etags[agent_id] = response.agent_state.eTag
+        state: Mapping[str, Any] = json.loads(response.agent_state.binary_data)
+        return state
+
+    async def delete(self, agent_id: AgentId) -> None:
+        await self._write(agent_id, None)
+
+    async def close(self) -> None:
+        """Close the connection to the host."""
+        if self._channel is not None:
+            await self._channel.close()
+            self._channel = None
+            self._stub = None
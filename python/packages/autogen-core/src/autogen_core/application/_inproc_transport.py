@@ -0,0 +1,238 @@
+import asyncio
+import logging
+from asyncio import Future, Task
+from typing import Any, AsyncIterator, Callable, Dict, Sequence, Set, Tuple
+
+import grpc
+
+from .protos import agent_worker_pb2, agent_worker_pb2_grpc
+
+logger = logging.getLogger("autogen_core")
+
+INPROC_SCHEME = "inproc://"
+
+# The in-process servers that are running, by address.
+_servers: Dict[str, "InProcessServer"] = {}
+
+
+def is_inproc_address(address: str) -> bool:
+    return address.startswith(INPROC_SCHEME)
+
+
+def create_channel(address: str, options: Sequence[Tuple[str, Any]] = ()) -> grpc.aio.Channel:  # type: ignore
+    """Open an insecure channel to a host address. ``inproc://`` addresses get an :class:`InProcessChannel`, other
+    addresses, such as ``host:port`` or ``unix:///path/to/socket``, a gRPC channel."""
+    if is_inproc_address(address):
+        return InProcessChannel(address)  # type: ignore
+    return grpc.aio.insecure_channel(address, options=options)
+
+
+def _rpc_error(code: grpc.StatusCode, details: str) -> grpc.aio.AioRpcError:  # type: ignore
+    return grpc.aio.AioRpcError(code, grpc.aio.Metadata(), grpc.aio.Metadata(), details=details)
+
+
+class InProcessServer:
+    """Serves an ``AgentRpc`` servicer to the :class:`InProcessChannel` instances of the same event loop, in place
+    of a :class:`grpc.aio.Server`. Messages are passed to the servicer as they are, without serializing them."""
+
+    def __init__(self, address: str, servicer: agent_worker_pb2_grpc.AgentRpcServicer) -> None:
+        self._address = address
+        self.servicer = servicer
+        self.calls: Set[_InProcessStreamCall] = set()
+        self._terminated = asyncio.Event()
+
+    async def start(self) -> None:
+        if self._address in _servers:
+            raise RuntimeError(f"Address {self._address} is already in use.")
+        _servers[self._address] = self
+
+    async def stop(self, grace: float | None) -> None:
+        if _servers.get(self._address) is self:
+            del _servers[self._address]
+        for call in list(self.calls):
+            call.abort(grpc.StatusCode.UNAVAILABLE, "The server stopped.")
+        self._terminated.set()
+
+    async def wait_for_termination(self) -> None:
+        await self._terminated.wait()
+
+
+class _InProcessContext:
+    """The parts of :class:`grpc.aio.ServicerContext` that the host servicer uses."""
+
+    def __init__(self, metadata: Sequence[Tuple[str, str]] | None) -> None:
+        self._invocation_metadata = tuple(metadata or ())
+        self.initial_metadata: Future[Tuple[Tuple[str, str], ...]] = asyncio.get_running_loop().create_future()
+
+    def invocation_metadata(self) -> Tuple[Tuple[str, str], ...]:
+        return self._invocation_metadata
+
+    async def send_initial_metadata(self, initial_metadata: Sequence[Tuple[str, str]]) -> None:
+        if not self.initial_metadata.done():
+            self.initial_metadata.set_result(tuple(initial_metadata))
+
+
+class _InProcessStreamCall:
+    """A bidirectional streaming call to an in-process server, with the methods of
+    :class:`grpc.aio.StreamStreamCall` that the worker runtime uses."""
+
+    def __init__(
+        self,
+        server: InProcessServer | None,
+        method_name: str,
+        request_iterator: AsyncIterator[agent_worker_pb2.Message],
+        metadata: Sequence[Tuple[str, str]] | None,
+    ) -> None:
+        self._context = _InProcessContext(metadata)
+        self._status: grpc.StatusCode | None = None  # type: ignore
+        self._details = ""
+        self._server = server
+        self._requests: asyncio.Queue[agent_worker_pb2.Message | None] = asyncio.Queue()
+        self._read_task: Task[agent_worker_pb2.Message] | None = None
+        self._pump_task: Task[None] | None = None
+        if server is None:
+            self.abort(grpc.StatusCode.UNAVAILABLE, "No in-process server is running at the address.")
+            return
+        server.calls.add(self)
+        handler: Callable[[AsyncIterator[agent_worker_pb2.Message], _InProcessContext], Any] = getattr(
+            server.servicer, method_name
+        )
+        self._responses: AsyncIterator[agent_worker_pb2.Message] = handler(self._request_stream(), self._context)
+        self._pump_task = asyncio.create_task(self._pump_requests(request_iterator))
+        self._pump_task.add_done_callback(lambda task: task.cancelled() or task.exception())
+        # Run the handler until it sends its initial metadata.
+        self._start_read()
+
+    async def _pump_requests(self, request_iterator: AsyncIterator[agent_worker_pb2.Message]) -> None:
+        try:
+            async for message in request_iterator:
+                self._requests.put_nowait(message)
+        finally:
+            self._requests.put_nowait(None)
+
+    async def _request_stream(self) -> AsyncIterator[agent_worker_pb2.Message]:
+        while True:
+            message = await self._requests.get()
+            if message is None:
+                return
+            yield message
+
+    def _start_read(self) -> Task[agent_worker_pb2.Message]:
+        self._read_task = asyncio.ensure_future(anext(self._responses))
+        self._read_task.add_done_callback(self._on_read_done)
+        return self._read_task
+
+    def _on_read_done(self, task: Task[agent_worker_pb2.Message]) -> None:
+        if not task.cancelled() and task.exception() is not None and self._status is None:
+            if isinstance(task.exception(), StopAsyncIteration):
+                self._finish(grpc.StatusCode.OK, "")
+            else:
+                self._finish(grpc.StatusCode.UNKNOWN, str(task.exception()))
+
+    @property
+    def done(self) -> bool:
+        return self._status is not None
+
+    def _error(self) -> BaseException:
+        assert self._status is not None
+        if self._status == grpc.StatusCode.CANCELLED:
+            return asyncio.CancelledError()
+        return _rpc_error(self._status, self._details)  # type: ignore
+
+    def _finish(self, code: grpc.StatusCode, details: str) -> None:  # type: ignore
+        self._status = code
+        self._details = details
+        if self._server is not None:
+            self._server.calls.discard(self)
+        if not self._context.initial_metadata.done():
+            self._context.initial_metadata.set_exception(self._error())
+            # Mark the exception as retrieved in case nobody waits for the metadata.
+            self._context.initial_metadata.exception()
+        if self._pump_task is not None:
+            self._pump_task.cancel()
+        # Let the handler see the end of the requests.
+        self._requests.put_nowait(None)
+
+    def abort(self, code: grpc.StatusCode, details: str) -> None:  # type: ignore
+        if self._status is not None:
+            return
+        self._finish(code, details)
+        if self._read_task is not None and not self._read_task.done():
+            self._read_task.cancel()
+        elif self._server is not None:
+            # The handler is waiting at a yield, close it to run its cleanup.
+            task = asyncio.ensure_future(self._responses.aclose())  # type: ignore
+            task.add_done_callback(lambda task: task.cancelled() or task.exception())
+
+    def cancel(self) -> bool:
+        if self._status is not None:
+            return False
+        self.abort(grpc.StatusCode.CANCELLED, "Cancelled by the client.")
+        return True
+
+    async def initial_metadata(self) -> Tuple[Tuple[str, str], ...]:
+        return await self._context.initial_metadata
+
+    async def read(self) -> Any:
+        task = self._read_task
+        if task is None:
+            if self._status == grpc.StatusCode.OK:
+                return grpc.aio.EOF  # type: ignore
+            if self._status is not None:
+                raise self._error()
+            task = self._start_read()
+        try:
+            return await task
+        except StopAsyncIteration:
+            return grpc.aio.EOF  # type: ignore
+        except asyncio.CancelledError:
+            if self._status is not None:
+                raise self._error() from None
+            raise
+        except Exception as e:
+            if self._status is None:
+                self._finish(grpc.StatusCode.UNKNOWN, str(e))
+            raise self._error() from None
+        finally:
+            self._read_task = None
+
+
+class InProcessChannel:
+    """A stand-in for :class:`grpc.aio.Channel` that connects to the :class:`InProcessServer` at an ``inproc://``
+    address in the same event loop. It provides what the generated ``AgentRpc`` stub uses."""
+
+    def __init__(self, address: str) -> None:
+        self._address = address
+        self._calls: Set[_InProcessStreamCall] = set()
+
+    def stream_stream(self, method: str, *args: Any, **kwargs: Any) -> Callable[..., _InProcessStreamCall]:
+        method_name = method.rsplit("/", 1)[-1]
+
+        def call(
+            request_iterator: AsyncIterator[agent_worker_pb2.Message],
+            *,
+            metadata: Sequence[Tuple[str, str]] | None = None,
+            **kwargs: Any,
+        ) -> _InProcessStreamCall:
+            stream_call = _InProcessStreamCall(_servers.get(self._address), method_name, request_iterator, metadata)
+            self._calls = {call for call in self._calls if not call.done}
+            self._calls.add(stream_call)
+            return stream_call
+
+        return call
+
+    def unary_unary(self, method: str, *args: Any, **kwargs: Any) -> Callable[..., Any]:
+        method_name = method.rsplit("/", 1)[-1]
+
+        async def call(request: Any, *, metadata: Sequence[Tuple[str, str]] | None = None, **kwargs: Any) -> Any:
+            server = _servers.get(self._address)
+            if server is None:
+                raise _rpc_error(grpc.StatusCode.UNAVAILABLE, "No in-process server is running at the address.")
+            return await getattr(server.servicer, method_name)(request, _InProcessContext(metadata))
+
+        return call
+
+    async def close(self, grace: float | None = None) -> None:
+        for call in self._calls:
+            call.cancel()
+        self._calls.clear()
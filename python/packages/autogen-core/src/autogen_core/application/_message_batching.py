@@ -0,0 +1,91 @@
+import asyncio
+from dataclasses import dataclass
+from typing import AsyncIterator, Callable, Iterable, List, Protocol
+
+from .protos import agent_worker_pb2
+
+
+@dataclass(frozen=True)
+class MessageBatchingConfig:
+    """Configuration for sending several messages as one frame on the connection between a worker and the host.
+
+    Batching is negotiated when a worker connects: each side only sends batches if the other side announced that
+    it can read them, so peers without batching support keep working.
+
+    Args:
+        max_messages (int, optional): Maximum number of messages in a batch. Defaults to 128.
+        max_bytes (int, optional): Maximum serialized size of a batch in bytes. A message larger than this is sent
+            on its own. Keep it below the gRPC maximum message size. Defaults to 1 MiB.
+        linger (float, optional): How long to wait for more messages after the first message of a batch, in seconds.
+            With the default of 0, a batch holds the messages that are already queued, so batching adds no latency
+            and only takes effect when messages are produced faster than they are sent.
+    """
+
+    max_messages: int = 128
+    max_bytes: int = 1024 * 1024
+    linger: float = 0.0
+
+    def __post_init__(self) -> None:
+        if self.max_messages < 1:
+            raise ValueError("max_messages must be at least 1.")
+        if self.max_bytes < 1:
+            raise ValueError("max_bytes must be at least 1.")
+        if self.linger < 0:
+            raise ValueError("linger must not be negative.")
+
+
+class MessageQueue(Protocol):
+    """The part of :class:`asyncio.Queue` that :func:`batch_messages` reads messages with."""
+
+    async def get(self) -> agent_worker_pb2.Message: ...
+
+    def get_nowait(self) -> agent_worker_pb2.Message: ...
+
+
+def unbatch(message: agent_worker_pb2.Message) -> Iterable[agent_worker_pb2.Message]:
+    """Return the messages in a received frame."""
+    if message.WhichOneof("message") == "batch":
+        return message.batch.messages
+    return (message,)
+
+
+async def batch_messages(
+    queue: MessageQueue,
+    config: MessageBatchingConfig,
+    enabled: Callable[[], bool] = lambda: True,
+) -> AsyncIterator[agent_worker_pb2.Message]:
+    """Yield the frames to send for the messages put on a queue, coalescing queued messages into batches
+    while ``enabled`` returns True."""
+    loop = asyncio.get_running_loop()
+    # A message that did not fit into the previous batch.
+    carry: agent_worker_pb2.Message | None = None
+    while True:
+        first = carry if carry is not None else await queue.get()
+        carry = None
+        if not enabled():
+            yield first
+            continue
+        messages: List[agent_worker_pb2.Message] = [first]
+        size = first.ByteSize()
+        deadline = loop.time() + config.linger
+        while len(messages) < config.max_messages:
+            try:
+                message = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    message = await asyncio.wait_for(queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+            message_size = message.ByteSize()
+            if size + message_size > config.max_bytes:
+                carry = message
+                break
+            messages.append(message)
+            size += message_size
+        if len(messages) == 1:
+            yield first
+        else:
+            yield agent_worker_pb2.Message(batch=agent_worker_pb2.MessageBatch(messages=messages))
@@ -0,0 +1,140 @@
+import heapq
+from collections import deque
+from collections.abc import Sequence
+from typing import Callable, Deque, Dict, Generic, Iterator, List, TypeVar, overload
+
+T = TypeVar("T")
+
+
+class _FairQueue(Generic[T]):
+    """Round-robin queue over per-key FIFO sub-queues."""
+
+    def __init__(self) -> None:
+        self._queues: Dict[str, Deque[T]] = {}
+        # Keys that currently have queued items, in round-robin order.
+        self._ready: Deque[str] = deque()
+        self._size = 0
+
+    def append(self, key: str, item: T) -> None:
+        queue = self._queues.get(key)
+        if queue is None:
+            queue = deque()
+            self._queues[key] = queue
+        if not queue:
+            self._ready.append(key)
+        queue.append(item)
+        self._size += 1
+
+    def popleft(self) -> T:
+        key = self._ready.popleft()
+        queue = self._queues[key]
+        item = queue.popleft()
+        if queue:
+            # Give the other keys a turn before this one is served again.
+            self._ready.append(key)
+        else:
+            del self._queues[key]
+        self._size -= 1
+        return item
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[T]:
+        for key in self._ready:
+            yield from self._queues[key]
+
+
+class MessageScheduler(Sequence[T]):
+    """Queue of pending message envelopes for :class:`SingleThreadedAgentRuntime`.
+
+    Without any options this is a plain FIFO backed by a :class:`collections.deque`, so
+    both enqueue and dequeue are O(1).
+
+    Args:
+        priority (Callable[[T], int], optional): Returns the priority of an item. Items with a
+            lower value are dequeued first; items with equal priority keep FIFO order.
+        fairness_key (Callable[[T], str], optional): Returns the key an item is scheduled under.
+            Within a priority level, keys are served round-robin so that one busy key cannot
+            starve the others.
+    """
+
+    def __init__(
+        self,
+        *,
+        priority: Callable[[T], int] | None = None,
+        fairness_key: Callable[[T], str] | None = None,
+    ) -> None:
+        self._priority = priority
+        self._fairness_key = fairness_key
+        self._fifo: Deque[T] = deque()
+        self._levels: Dict[int, _FairQueue[T] | Deque[T]] = {}
+        # Min-heap of priorities that have a non-empty level.
+        self._active_priorities: List[int] = []
+        self._size = 0
+
+    @property
+    def _is_simple(self) -> bool:
+        return self._priority is None and self._fairness_key is None
+
+    def put(self, item: T) -> None:
+        """Add an item to the queue."""
+        if self._is_simple:
+            self._fifo.append(item)
+            return
+        priority = self._priority(item) if self._priority is not None else 0
+        level = self._levels.get(priority)
+        if level is None:
+            level = _FairQueue[T]() if self._fairness_key is not None else deque()
+            self._levels[priority] = level
+            heapq.heappush(self._active_priorities, priority)
+        if isinstance(level, _FairQueue):
+            assert self._fairness_key is not None
+            level.append(self._fairness_key(item), item)
+        else:
+            level.append(item)
+        self._size += 1
+
+    def get(self) -> T:
+        """Remove and return the next item.
+
+        Raises:
+            IndexError: If the queue is empty.
+        """
+        if self._is_simple:
+            return self._fifo.popleft()
+        if not self._active_priorities:
+            raise IndexError("get from an empty scheduler")
+        priority = self._active_priorities[0]
+        level = self._levels[priority]
+        item = level.popleft()
+        if len(level) == 0:
+            heapq.heappop(self._active_priorities)
+            del self._levels[priority]
+        self._size -= 1
+        return item
+
+    def __len__(self) -> int:
+        if self._is_simple:
+            return len(self._fifo)
+        return self._size
+
+    def __iter__(self) -> Iterator[T]:
+        """Iterate over the queued items in priority order. Fair levels are listed by key, not in
+        exact dequeue order."""
+        if self._is_simple:
+            yield from self._fifo
+            return
+        for priority in sorted(self._levels):
+            yield from self._levels[priority]
+
+    @overload
+    def __getitem__(self, index: int) -> T: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> Sequence[T]: ...
+
+    def __getitem__(self, index: int | slice) -> T | Sequence[T]:
+        if self._is_simple and isinstance(index, int):
+            return self._fifo[index]
+        return list(self)[index]
@@ -0,0 +1,87 @@
+import gzip
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Literal, Tuple
+
+from .protos import agent_worker_pb2
+
+GZIP_CONTENT_ENCODING = "gzip"
+ZSTD_CONTENT_ENCODING = "zstd"
+
+
+@dataclass(frozen=True)
+class PayloadCompressionConfig:
+    """Configuration for compressing large message payloads sent by a worker.
+
+    Compressed payloads are marked with their content encoding. The host forwards them as they are, and the
+    receiving worker decompresses them, whether or not it compresses the payloads it sends itself. All workers
+    connected to the host must be able to read compressed payloads when one of them compresses.
+
+    Args:
+        algorithm (Literal["gzip", "zstd"], optional): Compression algorithm. ``"zstd"`` is faster at a similar
+            ratio, and requires the ``zstd`` extra of autogen-core on every worker. Defaults to ``"gzip"``.
+        threshold (int, optional): Payloads smaller than this many bytes are sent uncompressed, since compressing
+            them costs more time than it saves on the wire. Defaults to 16 KiB.
+        level (int | None, optional): Compression level. Defaults to 6 for gzip and 3 for zstd.
+    """
+
+    algorithm: Literal["gzip", "zstd"] = "gzip"
+    threshold: int = 16 * 1024
+    level: int | None = None
+
+    def __post_init__(self) -> None:
+        if self.algorithm not in (GZIP_CONTENT_ENCODING, ZSTD_CONTENT_ENCODING):
+            raise ValueError(f"Unsupported compression algorithm {self.algorithm}.")
+        if self.threshold < 0:
+            raise ValueError("threshold must not be negative.")
+        if self.algorithm == ZSTD_CONTENT_ENCODING:
+            _import_zstandard()
+
+
+def _import_zstandard() -> Any:
+    try:
+        import zstandard
+    except ImportError as e:
+        raise RuntimeError(
+            "Missing dependencies for zstd payload compression. Please ensure the autogen-core package was installed with the 'zstd' extra."
+        ) from e
+    return zstandard
+
+
+@lru_cache(maxsize=None)
+def _zstd_compressor(level: int | None) -> Any:
+    zstandard = _import_zstandard()
+    return zstandard.ZstdCompressor() if level is None else zstandard.ZstdCompressor(level=level)
+
+
+@lru_cache(maxsize=1)
+def _zstd_decompressor() -> Any:
+    return _import_zstandard().ZstdDecompressor()
+
+
+def compress_payload_data(data: bytes, config: PayloadCompressionConfig | None) -> Tuple[bytes, str]:
+    """Return the data to send and its content encoding, which is empty if the data is not compressed."""
+    if config is None or len(data) < config.threshold:
+        return data, ""
+    if config.algorithm == ZSTD_CONTENT_ENCODING:
+        compressed = _zstd_compressor(config.level).compress(data)
+    else:
+        level = 6 if config.level is None else config.level
+        compressed = gzip.compress(data, compresslevel=level, mtime=0)
+    # Already compressed data, such as images, may not get smaller.
+    if len(compressed) >= len(data):
+        return data, ""
+    return compressed, config.algorithm
+
+
+def decompress_payload_data(payload: agent_worker_pb2.Payload) -> bytes:
+    """Return the uncompressed data of a received payload."""
+    match payload.data_content_encoding:
+        case "":
+            return payload.data
+        case "gzip":
+            return gzip.decompress(payload.data)
+        case "zstd":
+            return _zstd_decompressor().decompress(payload.data)  # type: ignore[no-any-return]
+        case encoding:
+            raise ValueError(f"Unsupported payload content encoding {encoding}.")
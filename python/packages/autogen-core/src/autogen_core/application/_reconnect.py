@@ -0,0 +1,43 @@
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class ReconnectConfig:
+    """Configuration for reconnecting a worker to the host after its connection is lost.
+
+    The worker retries with exponential backoff. Once reconnected, it registers its agent types and subscriptions
+    again, since the host forgets them when a worker disconnects, and sends again the requests that the host has
+    not answered. A request that reached the host before the connection was lost may therefore be delivered
+    twice, so request handlers should tolerate being called more than once. Events and responses that were
+    sent just before the connection was lost are not sent again.
+
+    Args:
+        initial_backoff (float, optional): Seconds to wait before the first attempt to reconnect. Defaults to 0.1.
+        max_backoff (float, optional): Maximum number of seconds to wait between attempts. Defaults to 10.
+        multiplier (float, optional): Factor by which the wait grows after each failed attempt. Defaults to 2.
+        max_attempts (int | None, optional): Number of failed attempts in a row after which the worker stops
+            reconnecting. Defaults to retrying indefinitely.
+    """
+
+    initial_backoff: float = 0.1
+    max_backoff: float = 10.0
+    multiplier: float = 2.0
+    max_attempts: int | None = None
+
+    def __post_init__(self) -> None:
+        if self.initial_backoff <= 0:
+            raise ValueError("initial_backoff must be positive.")
+        if self.max_backoff < self.initial_backoff:
+            raise ValueError("max_backoff must not be less than initial_backoff.")
+        if self.multiplier < 1:
+            raise ValueError("multiplier must be at least 1.")
+        if self.max_attempts is not None and self.max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1.")
+
+    def backoff(self, attempt: int) -> float:
+        """Return the number of seconds to wait before an attempt, counting from 0."""
+        try:
+            delay = self.initial_backoff * self.multiplier**attempt
+        except OverflowError:
+            return self.max_backoff
+        return min(delay, self.max_backoff)
@@ -4,13 +4,15 @@
 import inspect
 import logging
 import threading
+import time
 import warnings
 from asyncio import CancelledError, Future, Task
 from collections.abc import Sequence
 from dataclasses import dataclass
 from enum import Enum
-from typing import Any, Awaitable, Callable, Dict, List, Mapping, ParamSpec, Set, Type, TypeVar, cast
+from typing import Any, Awaitable, Callable, Dict, List, Literal, Mapping, ParamSpec, Set, Tuple, Type, TypeVar, cast
 
+from opentelemetry.metrics import MeterProvider
 from opentelemetry.trace import TracerProvider
 from typing_extensions import deprecated
 
@@ -30,10 +32,22 @@
     SubscriptionInstantiationContext,
     TopicId,
 )
-from ..base.exceptions import MessageDroppedException
+from ..base.exceptions import MessageDroppedException, UndeliverableException
 from ..base.intervention import DropMessage, InterventionHandler
+from ._agent_cache import LiveAgentCache
+from ._agent_mailbox import AgentMailboxes, MailboxSlot
+from ._agent_state_store import AgentStateStore
 from ._helpers import SubscriptionManager, get_impl
-from .telemetry import EnvelopeMetadata, MessageRuntimeTracingConfig, TraceHelper, get_telemetry_envelope_metadata
+from ._message_scheduler import MessageScheduler
+from .logging._sampling import should_log_event
+from .logging.events import DeliveryStage, MessageEvent, MessageKind
+from .telemetry import (
+    EnvelopeMetadata,
+    MessageRuntimeTracingConfig,
+    RuntimeMetrics,
+    TraceHelper,
+    get_telemetry_envelope_metadata,
+)
 
 logger = logging.getLogger("autogen_core")
 event_logger = logging.getLogger("autogen_core.events")
@@ -53,6 +67,7 @@ class PublishMessageEnvelope:
     sender: AgentId | None
     topic_id: TopicId
     metadata: EnvelopeMetadata | None = None
+    enqueued_at: float = 0.0
 
 
 @dataclass(kw_only=True)
@@ -66,6 +81,7 @@ class SendMessageEnvelope:
     future: Future[Any]
     cancellation_token: CancellationToken
     metadata: EnvelopeMetadata | None = None
+    enqueued_at: float = 0.0
 
 
 @dataclass(kw_only=True)
@@ -77,11 +93,26 @@ class ResponseMessageEnvelope:
     sender: AgentId
     recipient: AgentId | None
     metadata: EnvelopeMetadata | None = None
+    enqueued_at: float = 0.0
 
 
 P = ParamSpec("P")
 T = TypeVar("T", bound=Agent)
 
+MessageEnvelope = PublishMessageEnvelope | SendMessageEnvelope | ResponseMessageEnvelope
+
+
+def _envelope_fairness_key(envelope: MessageEnvelope) -> str:
+    # Schedule each envelope under the agent type that will handle it. Published messages
+    # are keyed by topic type, which maps onto the subscribed agent types.
+    match envelope:
+        case SendMessageEnvelope(recipient=recipient):
+            return recipient.type
+        case ResponseMessageEnvelope(recipient=recipient):
+            return recipient.type if recipient is not None else ""
+        case PublishMessageEnvelope(topic_id=topic_id):
+            return topic_id.type
+
 
 class Counter:
     def __init__(self) -> None:
@@ -118,26 +149,37 @@ def __init__(self, runtime: SingleThreadedAgentRuntime) -> None:
     async def _run(self) -> None:
         while True:
             async with self._lock:
+                # Clear before checking so that any activity from here on wakes up the wait below.
+                self._runtime._activity.clear()  # type: ignore[reportPrivateUsage]
                 if self._end_condition():
                     return
 
-                await self._runtime.process_next()
+                has_messages = len(self._runtime.unprocessed_messages) > 0
+                if has_messages:
+                    await self._runtime.process_next()
+
+            if not has_messages:
+                # Sleep until a message is queued, a task completes or the run state changes.
+                await self._runtime._activity.wait()  # type: ignore[reportPrivateUsage]
 
     async def stop(self) -> None:
         async with self._lock:
             self._run_state = RunContext.RunState.CANCELLED
             self._end_condition = self._stop_when_cancelled
+            self._runtime._activity.set()  # type: ignore[reportPrivateUsage]
         await self._run_task
 
     async def stop_when_idle(self) -> None:
         async with self._lock:
             self._run_state = RunContext.RunState.UNTIL_IDLE
             self._end_condition = self._stop_when_idle
+            self._runtime._activity.set()  # type: ignore[reportPrivateUsage]
         await self._run_task
 
     async def stop_when(self, condition: Callable[[], bool]) -> None:
         async with self._lock:
             self._end_condition = condition
+            self._runtime._activity.set()  # type: ignore[reportPrivateUsage]
         await self._run_task
 
     def _stop_when_cancelled(self) -> bool:
@@ -148,36 +190,129 @@ def _stop_when_idle(self) -> bool:
 
 
 class SingleThreadedAgentRuntime(AgentRuntime):
+    """An agent runtime that processes all messages using a single asyncio queue.
+
+    Args:
+        intervention_handlers (List[InterventionHandler], optional): Handlers that can intercept
+            messages before they are delivered.
+        tracer_provider (TracerProvider, optional): The tracer provider used for tracing messages.
+        trace_sampling_ratio (float, optional): Fraction of the traces started by this runtime that are recorded,
+            see :class:`~autogen_core.application.telemetry.TraceHelper`. Defaults to 1.0.
+        meter_provider (MeterProvider, optional): Export the runtime :attr:`metrics` through OpenTelemetry with
+            this meter provider. Defaults to only keeping them in process.
+        message_priority (Callable[[MessageEnvelope], int], optional): Returns the scheduling priority
+            of a queued envelope, lower values are processed first. For example,
+            ``lambda e: 0 if isinstance(e, ResponseMessageEnvelope) else 1`` resolves responses before
+            delivering new messages. Envelopes with the same priority are processed in FIFO order.
+        fair_scheduling (bool, optional): If True, queued envelopes of the same priority are served
+            round-robin per recipient agent type, so a burst for one agent type does not delay the others.
+            Defaults to False.
+        max_live_agents (int, optional): Maximum number of agent instances kept in memory. When exceeded,
+            the least recently used agents are passivated: their state is saved with ``save_state`` into
+            ``agent_state_store`` and restored with ``load_state`` when they are next needed.
+            Defaults to no limit.
+        agent_idle_timeout (float, optional): Passivate agents that have not handled a message for this
+            many seconds. Checked whenever an agent is activated. Defaults to no timeout.
+        agent_state_store (AgentStateStore, optional): Where passivated agent states are kept.
+            Defaults to an :class:`InMemoryAgentStateStore`.
+        max_queue_size (int, optional): Maximum number of queued messages. Defaults to no limit.
+        max_queue_size_per_agent_type (int, optional): Maximum number of queued messages for a single
+            recipient agent type. Published messages count against their topic type. Defaults to no limit.
+        queue_full_policy (Literal["wait", "fail"], optional): What :meth:`send_message` and
+            :meth:`publish_message` do when a queue limit is reached. ``"wait"`` waits until there is
+            capacity, ``"fail"`` raises :class:`~autogen_core.base.exceptions.UndeliverableException`.
+            Responses are never limited. Defaults to ``"wait"``.
+    """
+
     def __init__(
         self,
         *,
         intervention_handlers: List[InterventionHandler] | None = None,
         tracer_provider: TracerProvider | None = None,
+        trace_sampling_ratio: float = 1.0,
+        meter_provider: MeterProvider | None = None,
+        message_priority: Callable[[MessageEnvelope], int] | None = None,
+        fair_scheduling: bool = False,
+        max_live_agents: int | None = None,
+        agent_idle_timeout: float | None = None,
+        agent_state_store: AgentStateStore | None = None,
+        max_queue_size: int | None = None,
+        max_queue_size_per_agent_type: int | None = None,
+        queue_full_policy: Literal["wait", "fail"] = "wait",
     ) -> None:
-        self._tracer_helper = TraceHelper(tracer_provider, MessageRuntimeTracingConfig("SingleThreadedAgentRuntime"))
-        self._message_queue: List[PublishMessageEnvelope | SendMessageEnvelope | ResponseMessageEnvelope] = []
+        self._tracer_helper = TraceHelper(
+            tracer_provider, MessageRuntimeTracingConfig("SingleThreadedAgentRuntime"), trace_sampling_ratio
+        )
+        self._message_queue: MessageScheduler[MessageEnvelope] = MessageScheduler(
+            priority=message_priority,
+            fairness_key=_envelope_fairness_key if fair_scheduling else None,
+        )
         # (namespace, type) -> List[AgentId]
         self._agent_factories: Dict[
             str, Callable[[], Agent | Awaitable[Agent]] | Callable[[AgentRuntime, AgentId], Agent | Awaitable[Agent]]
         ] = {}
-        self._instantiated_agents: Dict[AgentId, Agent] = {}
+        self._instantiated_agents = LiveAgentCache(
+            max_size=max_live_agents, idle_timeout=agent_idle_timeout, state_store=agent_state_store
+        )
         self._intervention_handlers = intervention_handlers
+        self._mailboxes = AgentMailboxes()
         self._outstanding_tasks = Counter()
         self._background_tasks: Set[Task[Any]] = set()
         self._subscription_manager = SubscriptionManager()
         self._run_context: RunContext | None = None
+        # Set whenever a message is queued or a processing task completes, so the run loop
+        # can wait for work instead of polling.
+        self._activity = asyncio.Event()
         self._serialization_registry = SerializationRegistry()
+        self._max_queue_size = max_queue_size
+        self._max_queue_size_per_agent_type = max_queue_size_per_agent_type
+        self._queue_full_policy = queue_full_policy
+        self._queued_per_agent_type: Dict[str, int] = {}
+        # Set whenever a message is taken off the queue, to wake up senders waiting for capacity.
+        self._capacity_available = asyncio.Event()
+        self._rejected_messages = 0
+        self._delayed_messages = 0
+        self._metrics = RuntimeMetrics(
+            "SingleThreadedAgentRuntime", lambda: len(self._message_queue), meter_provider=meter_provider
+        )
 
     @property
     def unprocessed_messages(
         self,
-    ) -> Sequence[PublishMessageEnvelope | SendMessageEnvelope | ResponseMessageEnvelope]:
+    ) -> Sequence[MessageEnvelope]:
         return self._message_queue
 
     @property
     def outstanding_tasks(self) -> int:
         return self._outstanding_tasks.get()
 
+    @property
+    def rejected_messages(self) -> int:
+        """Number of messages rejected because a queue limit was reached."""
+        return self._rejected_messages
+
+    @property
+    def delayed_messages(self) -> int:
+        """Number of messages that had to wait for queue capacity."""
+        return self._delayed_messages
+
+    @property
+    def metrics(self) -> RuntimeMetrics:
+        """The metrics of the runtime, see :meth:`RuntimeMetrics.snapshot`."""
+        return self._metrics
+
+    def _record_handler_call(self, agent_type: str, message: Any, start: float, error: BaseException | None) -> None:
+        self._metrics.record_handler_call(
+            agent_type,
+            type(message).__name__,
+            time.perf_counter() - start,
+            error is not None and not isinstance(error, CancelledError),
+        )
+
+    def _current_telemetry_metadata(self) -> EnvelopeMetadata | None:
+        # Without tracing there is no trace context to propagate.
+        return get_telemetry_envelope_metadata() if self._tracer_helper.enabled else None
+
     @property
     def _known_agent_names(self) -> Set[str]:
         return set(self._agent_factories.keys())
@@ -194,15 +329,16 @@ async def send_message(
         if cancellation_token is None:
             cancellation_token = CancellationToken()
 
-        # event_logger.info(
-        #     MessageEvent(
-        #         payload=message,
-        #         sender=sender,
-        #         receiver=recipient,
-        #         kind=MessageKind.DIRECT,
-        #         delivery_stage=DeliveryStage.SEND,
-        #     )
-        # )
+        if should_log_event(event_logger):
+            event_logger.info(
+                MessageEvent(
+                    payload=message,
+                    sender=sender,
+                    receiver=recipient,
+                    kind=MessageKind.DIRECT,
+                    delivery_stage=DeliveryStage.SEND,
+                )
+            )
 
         with self._tracer_helper.trace_block(
             "create",
@@ -210,21 +346,23 @@ async def send_message(
             parent=None,
             extraAttributes={"message_type": type(message).__name__},
         ):
+            await self._wait_for_capacity(recipient.type)
             future = asyncio.get_event_loop().create_future()
             if recipient.type not in self._known_agent_names:
                 future.set_exception(Exception("Recipient not found"))
 
-            content = message.__dict__ if hasattr(message, "__dict__") else message
-            logger.info(f"Sending message of type {type(message).__name__} to {recipient.type}: {content}")
+            if logger.isEnabledFor(logging.INFO):
+                content = message.__dict__ if hasattr(message, "__dict__") else message
+                logger.info("Sending message of type %s to %s: %s", type(message).__name__, recipient.type, content)
 
-            self._message_queue.append(
+            self._enqueue(
                 SendMessageEnvelope(
                     message=message,
                     recipient=recipient,
                     future=future,
                     cancellation_token=cancellation_token,
                     sender=sender,
-                    metadata=get_telemetry_envelope_metadata(),
+                    metadata=self._current_telemetry_metadata(),
                 )
             )
 
@@ -248,33 +386,134 @@ async def publish_message(
         ):
             if cancellation_token is None:
                 cancellation_token = CancellationToken()
-            content = message.__dict__ if hasattr(message, "__dict__") else message
-            logger.info(f"Publishing message of type {type(message).__name__} to all subscribers: {content}")
-
-            # event_logger.info(
-            #     MessageEvent(
-            #         payload=message,
-            #         sender=sender,
-            #         receiver=None,
-            #         kind=MessageKind.PUBLISH,
-            #         delivery_stage=DeliveryStage.SEND,
-            #     )
-            # )
-
-            self._message_queue.append(
+            await self._wait_for_capacity(topic_id.type)
+            if logger.isEnabledFor(logging.INFO):
+                content = message.__dict__ if hasattr(message, "__dict__") else message
+                logger.info("Publishing message of type %s to all subscribers: %s", type(message).__name__, content)
+
+            if should_log_event(event_logger):
+                event_logger.info(
+                    MessageEvent(
+                        payload=message,
+                        sender=sender,
+                        receiver=None,
+                        kind=MessageKind.PUBLISH,
+                        delivery_stage=DeliveryStage.SEND,
+                    )
+                )
+
+            self._enqueue(
                 PublishMessageEnvelope(
                     message=message,
                     cancellation_token=cancellation_token,
                     sender=sender,
                     topic_id=topic_id,
-                    metadata=get_telemetry_envelope_metadata(),
+                    metadata=self._current_telemetry_metadata(),
                 )
             )
 
+    async def send_messages(
+        self,
+        messages: Sequence[Tuple[Any, AgentId]],
+        *,
+        sender: AgentId | None = None,
+        cancellation_token: CancellationToken | None = None,
+    ) -> List[Future[Any]]:
+        if cancellation_token is None:
+            cancellation_token = CancellationToken()
+        futures: List[Future[Any]] = []
+        with self._tracer_helper.trace_block(
+            "create", None, parent=None, extraAttributes={"batch_size": len(messages)}
+        ):
+            metadata = self._current_telemetry_metadata()
+            loop = asyncio.get_running_loop()
+            for message, recipient in messages:
+                if should_log_event(event_logger):
+                    event_logger.info(
+                        MessageEvent(
+                            payload=message,
+                            sender=sender,
+                            receiver=recipient,
+                            kind=MessageKind.DIRECT,
+                            delivery_stage=DeliveryStage.SEND,
+                        )
+                    )
+                future: Future[Any] = loop.create_future()
+                futures.append(future)
+                if recipient.type not in self._agent_factories:
+                    future.set_exception(Exception("Recipient not found"))
+                    continue
+                try:
+                    await self._wait_for_capacity(recipient.type)
+                except UndeliverableException as e:
+                    future.set_exception(e)
+                    continue
+
+                if logger.isEnabledFor(logging.INFO):
+                    content = message.__dict__ if hasattr(message, "__dict__") else message
+                    logger.info("Sending message of type %s to %s: %s", type(message).__name__, recipient.type, content)
+
+                self._enqueue(
+                    SendMessageEnvelope(
+                        message=message,
+                        recipient=recipient,
+                        future=future,
+                        cancellation_token=cancellation_token,
+                        sender=sender,
+                        metadata=metadata,
+                    )
+                )
+                cancellation_token.link_future(future)
+        return futures
+
+    async def publish_messages(
+        self,
+        messages: Sequence[Tuple[Any, TopicId]],
+        *,
+        sender: AgentId | None = None,
+        cancellation_token: CancellationToken | None = None,
+    ) -> None:
+        if cancellation_token is None:
+            cancellation_token = CancellationToken()
+        with self._tracer_helper.trace_block(
+            "create", None, parent=None, extraAttributes={"batch_size": len(messages)}
+        ):
+            metadata = self._current_telemetry_metadata()
+            for message, topic_id in messages:
+                await self._wait_for_capacity(topic_id.type)
+                if logger.isEnabledFor(logging.INFO):
+                    content = message.__dict__ if hasattr(message, "__dict__") else message
+                    logger.info("Publishing message of type %s to all subscribers: %s", type(message).__name__, content)
+
+                if should_log_event(event_logger):
+                    event_logger.info(
+                        MessageEvent(
+                            payload=message,
+                            sender=sender,
+                            receiver=None,
+                            kind=MessageKind.PUBLISH,
+                            delivery_stage=DeliveryStage.SEND,
+                        )
+                    )
+
+                self._enqueue(
+                    PublishMessageEnvelope(
+                        message=message,
+                        cancellation_token=cancellation_token,
+                        sender=sender,
+                        topic_id=topic_id,
+                        metadata=metadata,
+                    )
+                )
+
     async def save_state(self) -> Mapping[str, Any]:
         state: Dict[str, Dict[str, Any]] = {}
         for agent_id in self._instantiated_agents:
             state[str(agent_id)] = dict(await (await self._get_agent(agent_id)).save_state())
+        for agent_id in self._instantiated_agents.passivated_agents:
+            agent_state = await self._instantiated_agents.state_store.load(agent_id)
+            if agent_state is not None:
+                state[str(agent_id)] = dict(agent_state)
         return state
 
     async def load_state(self, state: Mapping[str, Any]) -> None:
@@ -289,21 +528,30 @@ async def _process_send(self, message_envelope: SendMessageEnvelope) -> None:
             # todo: check if recipient is in the known namespaces
             # assert recipient in self._agents
 
+            # Messages are dispatched in queue order and their tasks start in the same order, so taking the place
+            # in the mailbox before the first await keeps the messages to an agent in order.
+            slot = self._mailboxes.reserve(recipient)
             try:
-                # TODO use id
-                sender_name = message_envelope.sender.type if message_envelope.sender is not None else "Unknown"
-                logger.info(
-                    f"Calling message handler for {recipient} with message type {type(message_envelope.message).__name__} sent by {sender_name}"
-                )
-                # event_logger.info(
-                #     MessageEvent(
-                #         payload=message_envelope.message,
-                #         sender=message_envelope.sender,
-                #         receiver=recipient,
-                #         kind=MessageKind.DIRECT,
-                #         delivery_stage=DeliveryStage.DELIVER,
-                #     )
-                # )
+                await slot.wait()
+                if logger.isEnabledFor(logging.INFO):
+                    # TODO use id
+                    sender_name = message_envelope.sender.type if message_envelope.sender is not None else "Unknown"
+                    logger.info(
+                        "Calling message handler for %s with message type %s sent by %s",
+                        recipient,
+                        type(message_envelope.message).__name__,
+                        sender_name,
+                    )
+                if should_log_event(event_logger):
+                    event_logger.info(
+                        MessageEvent(
+                            payload=message_envelope.message,
+                            sender=message_envelope.sender,
+                            receiver=recipient,
+                            kind=MessageKind.DIRECT,
+                            delivery_stage=DeliveryStage.DELIVER,
+                        )
+                    )
                 recipient_agent = await self._get_agent(recipient)
                 message_context = MessageContext(
                     sender=message_envelope.sender,
@@ -311,11 +559,21 @@ async def _process_send(self, message_envelope: SendMessageEnvelope) -> None:
                     is_rpc=True,
                     cancellation_token=message_envelope.cancellation_token,
                 )
-                with MessageHandlerContext.populate_context(recipient_agent.id):
-                    response = await recipient_agent.on_message(
-                        message_envelope.message,
-                        ctx=message_context,
-                    )
+                self._instantiated_agents.pin(recipient)
+                start = time.perf_counter()
+                try:
+                    with MessageHandlerContext.populate_context(recipient_agent.id):
+                        response = await recipient_agent.on_message(
+                            message_envelope.message,
+                            ctx=message_context,
+                        )
+                except BaseException as e:
+                    self._record_handler_call(recipient.type, message_envelope.message, start, e)
+                    raise
+                else:
+                    self._record_handler_call(recipient.type, message_envelope.message, start, None)
+                finally:
+                    self._instantiated_agents.unpin(recipient)
             except CancelledError as e:
                 if not message_envelope.future.cancelled():
                     message_envelope.future.set_exception(e)
@@ -325,44 +583,50 @@ async def _process_send(self, message_envelope: SendMessageEnvelope) -> None:
                 message_envelope.future.set_exception(e)
                 self._outstanding_tasks.decrement()
                 return
+            finally:
+                slot.release()
 
-            self._message_queue.append(
+            self._enqueue(
                 ResponseMessageEnvelope(
                     message=response,
                     future=message_envelope.future,
                     sender=message_envelope.recipient,
                     recipient=message_envelope.sender,
-                    metadata=get_telemetry_envelope_metadata(),
+                    metadata=self._current_telemetry_metadata(),
                 )
             )
             self._outstanding_tasks.decrement()
 
     async def _process_publish(self, message_envelope: PublishMessageEnvelope) -> None:
         with self._tracer_helper.trace_block("publish", message_envelope.topic_id, parent=message_envelope.metadata):
+            pinned: List[AgentId] = []
+            slots: List[MailboxSlot] = []
             try:
                 responses: List[Awaitable[Any]] = []
                 recipients = await self._subscription_manager.get_subscribed_recipients(message_envelope.topic_id)
-                for agent_id in recipients:
-                    # Avoid sending the message back to the sender
-                    if message_envelope.sender is not None and agent_id == message_envelope.sender:
-                        continue
-
-                    sender_agent = (
-                        await self._get_agent(message_envelope.sender) if message_envelope.sender is not None else None
-                    )
-                    sender_name = str(sender_agent.id) if sender_agent is not None else "Unknown"
-                    logger.info(
-                        f"Calling message handler for {agent_id.type} with message type {type(message_envelope.message).__name__} published by {sender_name}"
-                    )
-                    # event_logger.info(
-                    #     MessageEvent(
-                    #         payload=message_envelope.message,
-                    #         sender=message_envelope.sender,
-                    #         receiver=agent,
-                    #         kind=MessageKind.PUBLISH,
-                    #         delivery_stage=DeliveryStage.DELIVER,
-                    #     )
-                    # )
+                # Avoid sending the message back to the sender
+                recipients = [agent_id for agent_id in recipients if agent_id != message_envelope.sender]
+                # Take the places in the mailboxes before the first await, see _process_send.
+                slots = [self._mailboxes.reserve(agent_id) for agent_id in recipients]
+                for agent_id, slot in zip(recipients, slots, strict=True):
+                    if logger.isEnabledFor(logging.INFO):
+                        sender_name = str(message_envelope.sender) if message_envelope.sender is not None else "Unknown"
+                        logger.info(
+                            "Calling message handler for %s with message type %s published by %s",
+                            agent_id.type,
+                            type(message_envelope.message).__name__,
+                            sender_name,
+                        )
+                    if should_log_event(event_logger):
+                        event_logger.info(
+                            MessageEvent(
+                                payload=message_envelope.message,
+                                sender=message_envelope.sender,
+                                receiver=agent_id,
+                                kind=MessageKind.PUBLISH,
+                                delivery_stage=DeliveryStage.DELIVER,
+                            )
+                        )
                     message_context = MessageContext(
                         sender=message_envelope.sender,
                         topic_id=message_envelope.topic_id,
@@ -370,18 +634,32 @@ async def _process_publish(self, message_envelope: PublishMessageEnvelope) -> No
                         cancellation_token=message_envelope.cancellation_token,
                     )
                     agent = await self._get_agent(agent_id)
+                    self._instantiated_agents.pin(agent_id)
+                    pinned.append(agent_id)
 
-                    async def _on_message(agent: Agent, message_context: MessageContext) -> Any:
-                        with self._tracer_helper.trace_block("process", agent.id, parent=None):
-                            with MessageHandlerContext.populate_context(agent.id):
-                                return await agent.on_message(
-                                    message_envelope.message,
-                                    ctx=message_context,
-                                )
-
-                    future = _on_message(agent, message_context)
+                    async def _on_message(agent: Agent, message_context: MessageContext, slot: MailboxSlot) -> Any:
+                        try:
+                            await slot.wait()
+                            with self._tracer_helper.trace_block("process", agent.id, parent=None):
+                                with MessageHandlerContext.populate_context(agent.id):
+                                    start = time.perf_counter()
+                                    try:
+                                        result = await agent.on_message(
+                                            message_envelope.message,
+                                            ctx=message_context,
+                                        )
+                                    except BaseException as e:
+                                        self._record_handler_call(agent.id.type, message_envelope.message, start, e)
+                                        raise
+                                    self._record_handler_call(agent.id.type, message_envelope.message, start, None)
+                                    return result
+                        finally:
+                            slot.release()
+
+                    future = _on_message(agent, message_context, slot)
                     responses.append(future)
 
+                self._metrics.record_publish_fan_out(len(responses))
                 await asyncio.gather(*responses)
             except BaseException as e:
                 # Ignore cancelled errors from logs
@@ -389,28 +667,39 @@ async def _on_message(agent: Agent, message_context: MessageContext) -> Any:
                     return
                 logger.error("Error processing publish message", exc_info=True)
             finally:
+                for agent_id in pinned:
+                    self._instantiated_agents.unpin(agent_id)
+                # Free the slots of the handlers that did not run.
+                for slot in slots:
+                    slot.release()
                 self._outstanding_tasks.decrement()
             # TODO if responses are given for a publish
 
     async def _process_response(self, message_envelope: ResponseMessageEnvelope) -> None:
         with self._tracer_helper.trace_block("ack", message_envelope.recipient, parent=message_envelope.metadata):
-            content = (
-                message_envelope.message.__dict__
-                if hasattr(message_envelope.message, "__dict__")
-                else message_envelope.message
-            )
-            logger.info(
-                f"Resolving response with message type {type(message_envelope.message).__name__} for recipient {message_envelope.recipient} from {message_envelope.sender.type}: {content}"
-            )
-            # event_logger.info(
-            #     MessageEvent(
-            #         payload=message_envelope.message,
-            #         sender=message_envelope.sender,
-            #         receiver=message_envelope.recipient,
-            #         kind=MessageKind.RESPOND,
-            #         delivery_stage=DeliveryStage.DELIVER,
-            #     )
-            # )
+            if logger.isEnabledFor(logging.INFO):
+                content = (
+                    message_envelope.message.__dict__
+                    if hasattr(message_envelope.message, "__dict__")
+                    else message_envelope.message
+                )
+                logger.info(
+                    "Resolving response with message type %s for recipient %s from %s: %s",
+                    type(message_envelope.message).__name__,
+                    message_envelope.recipient,
+                    message_envelope.sender.type,
+                    content,
+                )
+            if should_log_event(event_logger):
+                event_logger.info(
+                    MessageEvent(
+                        payload=message_envelope.message,
+                        sender=message_envelope.sender,
+                        receiver=message_envelope.recipient,
+                        kind=MessageKind.RESPOND,
+                        delivery_stage=DeliveryStage.DELIVER,
+                    )
+                )
             self._outstanding_tasks.decrement()
             if not message_envelope.future.cancelled():
                 message_envelope.future.set_result(message_envelope.message)
@@ -422,7 +711,14 @@ async def process_next(self) -> None:
             # Yield control to the event loop to allow other tasks to run
             await asyncio.sleep(0)
             return
-        message_envelope = self._message_queue.pop(0)
+        message_envelope = self._message_queue.get()
+        self._metrics.record_queue_delay(time.perf_counter() - message_envelope.enqueued_at)
+        if self._queue_limited:
+            key = _envelope_fairness_key(message_envelope)
+            self._queued_per_agent_type[key] -= 1
+            if self._queued_per_agent_type[key] == 0:
+                del self._queued_per_agent_type[key]
+            self._capacity_available.set()
 
         match message_envelope:
             case SendMessageEnvelope(message=message, sender=sender, recipient=recipient, future=future):
@@ -445,6 +741,7 @@ async def process_next(self) -> None:
                 task = asyncio.create_task(self._process_send(message_envelope))
                 self._background_tasks.add(task)
                 task.add_done_callback(self._background_tasks.discard)
+                task.add_done_callback(self._on_task_done)
             case PublishMessageEnvelope(
                 message=message,
                 sender=sender,
@@ -458,7 +755,7 @@ async def process_next(self) -> None:
                                 temp_message = await handler.on_publish(message, sender=sender)
                             except BaseException as e:
                                 # TODO: we should raise the intervention exception to the publisher.
-                                logger.error(f"Exception raised in in intervention handler: {e}", exc_info=True)
+                                logger.error("Exception raised in in intervention handler: %s", e, exc_info=True)
                                 return
                             if temp_message is DropMessage or isinstance(temp_message, DropMessage):
                                 # TODO log message dropped
@@ -469,6 +766,7 @@ async def process_next(self) -> None:
                 task = asyncio.create_task(self._process_publish(message_envelope))
                 self._background_tasks.add(task)
                 task.add_done_callback(self._background_tasks.discard)
+                task.add_done_callback(self._on_task_done)
             case ResponseMessageEnvelope(message=message, sender=sender, recipient=recipient, future=future):
                 if self._intervention_handlers is not None:
                     for handler in self._intervention_handlers:
@@ -486,10 +784,46 @@ async def process_next(self) -> None:
                 task = asyncio.create_task(self._process_response(message_envelope))
                 self._background_tasks.add(task)
                 task.add_done_callback(self._background_tasks.discard)
+                task.add_done_callback(self._on_task_done)
 
         # Yield control to the message loop to allow other tasks to run
         await asyncio.sleep(0)
 
+    def _enqueue(self, envelope: MessageEnvelope) -> None:
+        envelope.enqueued_at = time.perf_counter()
+        self._message_queue.put(envelope)
+        self._metrics.record_queue_depth(len(self._message_queue))
+        if self._queue_limited:
+            key = _envelope_fairness_key(envelope)
+            self._queued_per_agent_type[key] = self._queued_per_agent_type.get(key, 0) + 1
+        self._activity.set()
+
+    @property
+    def _queue_limited(self) -> bool:
+        return self._max_queue_size is not None or self._max_queue_size_per_agent_type is not None
+
+    def _is_queue_full(self, agent_type: str) -> bool:
+        if self._max_queue_size is not None and len(self._message_queue) >= self._max_queue_size:
+            return True
+        return (
+            self._max_queue_size_per_agent_type is not None
+            and self._queued_per_agent_type.get(agent_type, 0) >= self._max_queue_size_per_agent_type
+        )
+
+    async def _wait_for_capacity(self, agent_type: str) -> None:
+        if not self._queue_limited or not self._is_queue_full(agent_type):
+            return
+        if self._queue_full_policy == "fail":
+            self._rejected_messages += 1
+            raise UndeliverableException(f"Message queue is full for agent type {agent_type}.")
+        self._delayed_messages += 1
+        while self._is_queue_full(agent_type):
+            self._capacity_available.clear()
+            await self._capacity_available.wait()
+
+    def _on_task_done(self, task: Task[Any]) -> None:
+        self._activity.set()
+
     @property
     def idle(self) -> bool:
         return len(self._message_queue) == 0 and self._outstanding_tasks.get() == 0
@@ -568,9 +902,11 @@ async def register_factory(
         type: AgentType,
         agent_factory: Callable[[], T | Awaitable[T]],
         expected_class: type[T],
+        max_concurrency: int | None = None,
     ) -> AgentType:
         if type.type in self._agent_factories:
             raise ValueError(f"Agent with type {type} already exists.")
+        self._mailboxes.set_max_concurrency(type.type, max_concurrency)
 
         async def factory_wrapper() -> T:
             maybe_agent_instance = agent_factory()
@@ -613,16 +949,21 @@ async def _invoke_agent_factory(
             return agent
 
     async def _get_agent(self, agent_id: AgentId) -> Agent:
-        if agent_id in self._instantiated_agents:
-            return self._instantiated_agents[agent_id]
+        agent = self._instantiated_agents.get(agent_id)
+        if agent is not None:
+            return agent
 
         if agent_id.type not in self._agent_factories:
             raise LookupError(f"Agent with name {agent_id.type} not found.")
 
         agent_factory = self._agent_factories[agent_id.type]
-        agent = await self._invoke_agent_factory(agent_factory, agent_id)
-        self._instantiated_agents[agent_id] = agent
-        return agent
+
+        async def create_agent() -> Agent:
+            agent = await self._invoke_agent_factory(agent_factory, agent_id)
+            self._metrics.record_agent_activation(agent_id.type)
+            return agent
+
+        return await self._instantiated_agents.activate(agent_id, create_agent)
 
     # TODO: uncomment out the following type ignore when this is fixed in mypy: https://github.com/python/mypy/issues/3737
     async def try_get_underlying_agent_instance(self, id: AgentId, type: Type[T] = Agent) -> T:  # type: ignore[assignment]
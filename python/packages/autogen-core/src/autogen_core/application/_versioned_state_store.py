@@ -0,0 +1,142 @@
+import asyncio
+import sqlite3
+import threading
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Sequence
+
+from ..base import AgentId
+
+
+@dataclass(frozen=True)
+class VersionedState:
+    """A saved agent state and its ETag, which changes every time the state is saved."""
+
+    data: bytes
+    etag: str
+
+
+@dataclass(frozen=True)
+class StateWrite:
+    """A change to the saved state of an agent.
+
+    Args:
+        agent_id (AgentId): The agent whose state to change.
+        data (bytes | None): The new state, or None to delete the saved state.
+        etag (str, optional): Only apply the change if the saved state has this ETag. A state that does not
+            exist has no ETag, so it is never matched. Empty to apply the change unconditionally.
+    """
+
+    agent_id: AgentId
+    data: bytes | None
+    etag: str = ""
+
+
+class VersionedStateStore(ABC):
+    """A store for binary agent states with optimistic concurrency, used by :class:`WorkerAgentRuntimeHost`
+    to serve the states that workers save and load.
+
+    The methods take several agents at once, so that an implementation can read or write them in one
+    round trip or transaction.
+    """
+
+    @abstractmethod
+    async def get(self, agent_ids: Sequence[AgentId]) -> List[VersionedState | None]:
+        """Return the saved state of each agent, or None for an agent without a saved state."""
+        ...
+
+    @abstractmethod
+    async def write(self, writes: Sequence[StateWrite]) -> List[str | None]:
+        """Apply changes in order, and return for each change the new ETag, an empty string if the state was
+        deleted, or None if the change was not applied because its ETag did not match."""
+        ...
+
+
+class InMemoryVersionedStateStore(VersionedStateStore):
+    """A :class:`VersionedStateStore` that keeps states in a dictionary in memory."""
+
+    def __init__(self) -> None:
+        self._states: Dict[AgentId, VersionedState] = {}
+
+    async def get(self, agent_ids: Sequence[AgentId]) -> List[VersionedState | None]:
+        return [self._states.get(agent_id) for agent_id in agent_ids]
+
+    async def write(self, writes: Sequence[StateWrite]) -> List[str | None]:
+        etags: List[str | None] = []
+        for write in writes:
+            current = self._states.get(write.agent_id)
+            if write.etag and (current is None or current.etag != write.etag):
+                etags.append(None)
+            elif write.data is None:
+                self._states.pop(write.agent_id, None)
+                etags.append("")
+            else:
+                etag = uuid.uuid4().hex
+                self._states[write.agent_id] = VersionedState(write.data, etag)
+                etags.append(etag)
+        return etags
+
+
+class SqliteVersionedStateStore(VersionedStateStore):
+    """A :class:`VersionedStateStore` that keeps states in a SQLite database.
+
+    Each call runs in one transaction in a worker thread, so it does not block the event loop, and saving
+    the states of many agents at once takes a single commit.
+
+    Args:
+        path (str | Path, optional): Path to the database file. Defaults to ``":memory:"``.
+    """
+
+    def __init__(self, path: str | Path = ":memory:") -> None:
+        self._connection = sqlite3.connect(str(path), check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS versioned_agent_state "
+                "(agent_id TEXT PRIMARY KEY, state BLOB NOT NULL, etag TEXT NOT NULL)"
+            )
+
+    def _get(self, agent_ids: Sequence[AgentId]) -> List[VersionedState | None]:
+        with self._lock:
+            states: List[VersionedState | None] = []
+            for agent_id in agent_ids:
+                row = self._connection.execute(
+                    "SELECT state, etag FROM versioned_agent_state WHERE agent_id = ?", (str(agent_id),)
+                ).fetchone()
+                states.append(None if row is None else VersionedState(row[0], row[1]))
+            return states
+
+    def _write(self, writes: Sequence[StateWrite]) -> List[str | None]:
+        etags: List[str | None] = []
+        with self._lock, self._connection:
+            for write in writes:
+                agent_id = str(write.agent_id)
+                row = self._connection.execute(
+                    "SELECT etag FROM versioned_agent_state WHERE agent_id = ?", (agent_id,)
+                ).fetchone()
+                if write.etag and (row is None or row[0] != write.etag):
+                    etags.append(None)
+                elif write.data is None:
+                    self._connection.execute("DELETE FROM versioned_agent_state WHERE agent_id = ?", (agent_id,))
+                    etags.append("")
+                else:
+                    etag = uuid.uuid4().hex
+                    self._connection.execute(
+                        "INSERT OR REPLACE INTO versioned_agent_state (agent_id, state, etag) VALUES (?, ?, ?)",
+                        (agent_id, write.data, etag),
+                    )
+                    etags.append(etag)
+        return etags
+
+    async def get(self, agent_ids: Sequence[AgentId]) -> List[VersionedState | None]:
+        return await asyncio.to_thread(self._get, agent_ids)
+
+    async def write(self, writes: Sequence[StateWrite]) -> List[str | None]:
+        return await asyncio.to_thread(self._write, writes)
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._connection.close()
@@ -3,9 +3,10 @@
 import json
 import logging
 import signal
+import time
 import warnings
 from asyncio import Future, Task
-from collections import defaultdict
+from collections import defaultdict, deque
 from typing import (
     TYPE_CHECKING,
     Any,
@@ -14,7 +15,9 @@
     Awaitable,
     Callable,
     ClassVar,
+    Coroutine,
     DefaultDict,
+    Deque,
     Dict,
     List,
     Literal,
@@ -22,6 +25,7 @@
     ParamSpec,
     Sequence,
     Set,
+    Tuple,
     Type,
     TypeVar,
     cast,
@@ -29,10 +33,10 @@
 
 import grpc
 from grpc.aio import StreamStreamCall
+from opentelemetry.metrics import MeterProvider
 from opentelemetry.trace import TracerProvider
 from typing_extensions import Self, deprecated
 
-from autogen_core.base import JSON_DATA_CONTENT_TYPE
 from autogen_core.base._serialization import MessageSerializer, SerializationRegistry
 from autogen_core.base._type_helpers import ChannelArgumentType
 
@@ -50,10 +54,26 @@
     SubscriptionInstantiationContext,
     TopicId,
 )
+from ..base._timer_wheel import TimerWheel
+from ..base.exceptions import UndeliverableException
 from ..components import TypeSubscription
+from ._agent_cache import LiveAgentCache
+from ._agent_mailbox import AgentMailboxes, MailboxSlot
+from ._agent_state_store import AgentStateStore
+from ._channel_metadata import (
+    BATCHING_METADATA_KEY,
+    CAPABILITY_ENABLED,
+    LOCAL_DELIVERY_METADATA_KEY,
+    SHARED_AGENT_TYPES_METADATA_KEY,
+    TIMEOUT_METADATA_KEY,
+)
 from ._helpers import SubscriptionManager, get_impl
+from ._inproc_transport import create_channel
+from ._message_batching import MessageBatchingConfig, MessageQueue, batch_messages, unbatch
+from ._payload_compression import PayloadCompressionConfig, compress_payload_data, decompress_payload_data
+from ._reconnect import ReconnectConfig
 from .protos import agent_worker_pb2, agent_worker_pb2_grpc
-from .telemetry import MessageRuntimeTracingConfig, TraceHelper, get_telemetry_grpc_metadata
+from .telemetry import MessageRuntimeTracingConfig, RuntimeMetrics, TraceHelper, get_telemetry_grpc_metadata
 
 if TYPE_CHECKING:
     from .protos.agent_worker_pb2_grpc import AgentRpcAsyncStub
@@ -63,13 +83,18 @@
 
 P = ParamSpec("P")
 T = TypeVar("T", bound=Agent)
+R = TypeVar("R")
 
 
 type_func_alias = type
 
+# The messages the host answers, which are sent again after reconnecting until they are answered.
+_REQUEST_FIELDS = frozenset(("request", "registerAgentTypeRequest", "addSubscriptionRequest"))
+_DEFAULT_RECONNECT_CONFIG = ReconnectConfig()
+
 
 class QueueAsyncIterable(AsyncIterator[Any], AsyncIterable[Any]):
-    def __init__(self, queue: asyncio.Queue[Any]) -> None:
+    def __init__(self, queue: asyncio.Queue[Any] | MessageQueue) -> None:
         self._queue = queue
 
     async def __anext__(self) -> Any:
@@ -79,6 +104,54 @@ def __aiter__(self) -> AsyncIterator[Any]:
         return self
 
 
+class _ConnectionClosed(Exception):
+    pass
+
+
+class _ConnectionSendQueue:
+    """Reads the send queue of a host connection for one gRPC call, until the call ends.
+
+    gRPC keeps reading the request iterator of a call that has failed until the next message arrives, so
+    without this a message sent after the connection was lost could be taken by the old call and never sent.
+    The messages taken by a call are kept in ``taken`` until they are handed to gRPC.
+    """
+
+    def __init__(
+        self,
+        queue: asyncio.Queue[agent_worker_pb2.Message],
+        unsent: Deque[agent_worker_pb2.Message],
+        closed: Future[None],
+    ) -> None:
+        self._queue = queue
+        self._unsent = unsent
+        self._closed = closed
+        self.taken: List[agent_worker_pb2.Message] = []
+
+    def get_nowait(self) -> agent_worker_pb2.Message:
+        message = self._unsent.popleft() if self._unsent else self._queue.get_nowait()
+        self.taken.append(message)
+        return message
+
+    async def get(self) -> agent_worker_pb2.Message:
+        if self._closed.done():
+            raise _ConnectionClosed()
+        try:
+            return self.get_nowait()
+        except asyncio.QueueEmpty:
+            pass
+        get = asyncio.ensure_future(self._queue.get())
+        try:
+            await asyncio.wait((get, self._closed), return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            if not get.done():
+                get.cancel()
+            elif not get.cancelled():
+                self.taken.append(get.result())
+        if self._closed.done():
+            raise _ConnectionClosed()
+        return get.result()
+
+
 class HostConnection:
     DEFAULT_GRPC_CONFIG: ClassVar[ChannelArgumentType] = [
         (
@@ -102,84 +175,290 @@ class HostConnection:
         )
     ]
 
-    def __init__(self, channel: grpc.aio.Channel) -> None:  # type: ignore
+    def __init__(  # type: ignore
+        self,
+        channel: grpc.aio.Channel,  # type: ignore
+        max_queue_size: int = 0,
+        reconnect: ReconnectConfig | None = None,
+        on_reconnect: Callable[[], Awaitable[Sequence[agent_worker_pb2.Message]]] | None = None,
+    ) -> None:
         self._channel = channel
-        self._send_queue = asyncio.Queue[agent_worker_pb2.Message]()
-        self._recv_queue = asyncio.Queue[agent_worker_pb2.Message]()
+        # A max size of 0 means unbounded. A bounded receive queue stops reading from the stream
+        # when full, which applies gRPC flow control back to the host.
+        self._send_queue = asyncio.Queue[agent_worker_pb2.Message](maxsize=max_queue_size)
+        # Received messages, with the time they were received at.
+        self._recv_queue = asyncio.Queue[Tuple[agent_worker_pb2.Message, float]](maxsize=max_queue_size)
         self._connection_task: Task[None] | None = None
+        # The capabilities the host announced when the channel was opened.
+        self._host_capabilities: Set[str] = set()
+        self._reconnect = reconnect
+        # Returns the messages to send first on a new connection, before the unacknowledged requests.
+        self._on_reconnect = on_reconnect
+        self._closing = asyncio.Event()
+        # Messages taken from the send queue for a connection that was lost before they were sent.
+        self._unsent: Deque[agent_worker_pb2.Message] = deque()
+        # Requests sent to the host that have not been answered yet, by request id, in the order they were sent.
+        # Only tracked when reconnecting, to send them again on the new connection.
+        self._unacknowledged: Dict[str, agent_worker_pb2.Message] = {}
+        self._connections = 0
 
     @classmethod
-    def from_host_address(cls, host_address: str, extra_grpc_config: ChannelArgumentType = DEFAULT_GRPC_CONFIG) -> Self:
+    def from_host_address(
+        cls,
+        host_address: str,
+        extra_grpc_config: ChannelArgumentType = DEFAULT_GRPC_CONFIG,
+        max_queue_size: int = 0,
+        message_batching: MessageBatchingConfig | None = None,
+        reconnect: ReconnectConfig | None = None,
+        on_reconnect: Callable[[], Awaitable[Sequence[agent_worker_pb2.Message]]] | None = None,
+    ) -> Self:
         logger.info("Connecting to %s", host_address)
         #  Always use DEFAULT_GRPC_CONFIG and override it with provided grpc_config
-        merged_options = [
-            (k, v) for k, v in {**dict(HostConnection.DEFAULT_GRPC_CONFIG), **dict(extra_grpc_config)}.items()
-        ]
-
-        channel = grpc.aio.insecure_channel(
-            host_address,
-            options=merged_options,
-        )
-        instance = cls(channel)
-        instance._connection_task = asyncio.create_task(
-            instance._connect(channel, instance._send_queue, instance._recv_queue)
-        )
+        options = dict(HostConnection.DEFAULT_GRPC_CONFIG)
+        if reconnect is not None:
+            # Keep the channel from waiting longer than the reconnect backoff before it tries the host again.
+            options["grpc.initial_reconnect_backoff_ms"] = int(reconnect.initial_backoff * 1000)
+            options["grpc.min_reconnect_backoff_ms"] = int(reconnect.initial_backoff * 1000)
+            options["grpc.max_reconnect_backoff_ms"] = int(reconnect.max_backoff * 1000)
+        merged_options = [(k, v) for k, v in {**options, **dict(extra_grpc_config)}.items()]
+
+        channel = create_channel(host_address, merged_options)
+        instance = cls(channel, max_queue_size=max_queue_size, reconnect=reconnect, on_reconnect=on_reconnect)
+        instance._connection_task = asyncio.create_task(instance._connect(message_batching))
         return instance
 
     async def close(self) -> None:
         if self._connection_task is None:
             raise RuntimeError("Connection is not open.")
+        self._closing.set()
         await self._channel.close()
         await self._connection_task
 
-    @staticmethod
-    async def _connect(  # type: ignore
-        channel: grpc.aio.Channel,
-        send_queue: asyncio.Queue[agent_worker_pb2.Message],
-        receive_queue: asyncio.Queue[agent_worker_pb2.Message],
-    ) -> None:
-        stub: AgentRpcAsyncStub = agent_worker_pb2_grpc.AgentRpcStub(channel)  # type: ignore
-
-        # TODO: where do exceptions from reading the iterable go? How do we recover from those?
-        recv_stream: StreamStreamCall[agent_worker_pb2.Message, agent_worker_pb2.Message] = stub.OpenChannel(  # type: ignore
-            QueueAsyncIterable(send_queue)
-        )  # type: ignore
+    async def _connect(self, message_batching: MessageBatchingConfig | None = None) -> None:
+        stub: AgentRpcAsyncStub = agent_worker_pb2_grpc.AgentRpcStub(self._channel)  # type: ignore
+        metadata: List[tuple[str, str]] = []
+        if message_batching is not None:
+            metadata.append((BATCHING_METADATA_KEY, CAPABILITY_ENABLED))
+        loop = asyncio.get_running_loop()
+        failed_attempts = 0
+        while True:
+            ready: Future[None] = loop.create_future()
+            closed: Future[None] = loop.create_future()
+            recv_stream: StreamStreamCall[agent_worker_pb2.Message, agent_worker_pb2.Message] = stub.OpenChannel(  # type: ignore
+                self._send_frames(ready, closed, message_batching), metadata=metadata
+            )  # type: ignore
+            try:
+                # The host sends its initial metadata before, or together with, its first message.
+                initial_metadata = await recv_stream.initial_metadata()  # type: ignore
+                self._host_capabilities = {
+                    key
+                    for key, value in initial_metadata
+                    if value == CAPABILITY_ENABLED  # type: ignore
+                }
+                if message_batching is not None:
+                    logger.info(
+                        "Message batching %s by host",
+                        "accepted" if self.host_supports(BATCHING_METADATA_KEY) else "not supported",
+                    )
+                failed_attempts = 0
+                self._connections += 1
+                ready.set_result(None)
+                await self._receive_frames(recv_stream)
+            except grpc.aio.AioRpcError as e:
+                if self._reconnect is None or self._closing.is_set():
+                    raise
+                logger.warning("Connection to host lost: %s", e.details())
+            finally:
+                # Let the request iterator of the call return the messages it has not sent.
+                closed.set_result(None)
+            if self._reconnect is None or self._closing.is_set():
+                return
+            if self._reconnect.max_attempts is not None and failed_attempts >= self._reconnect.max_attempts:
+                logger.error("Giving up reconnecting to host after %d attempts", failed_attempts)
+                return
+            delay = self._reconnect.backoff(failed_attempts)
+            failed_attempts += 1
+            logger.info("Reconnecting to host in %.2f seconds", delay)
+            try:
+                await asyncio.wait_for(self._closing.wait(), delay)
+                return
+            except asyncio.TimeoutError:
+                pass
 
+    async def _receive_frames(  # type: ignore
+        self, recv_stream: StreamStreamCall[agent_worker_pb2.Message, agent_worker_pb2.Message]
+    ) -> None:
         while True:
-            logger.info("Waiting for message from host")
-            message = await recv_stream.read()  # type: ignore
-            if message == grpc.aio.EOF:  # type: ignore
+            frame = await recv_stream.read()  # type: ignore
+            if frame == grpc.aio.EOF:  # type: ignore
                 logger.info("EOF")
-                break
-            message = cast(agent_worker_pb2.Message, message)
-            logger.info(f"Received a message from host: {message}")
-            await receive_queue.put(message)
-            logger.info("Put message in receive queue")
+                return
+            frame = cast(agent_worker_pb2.Message, frame)
+            for message in unbatch(frame):
+                # Formatting a protobuf message is expensive, so only do it when the record will be emitted.
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Received a message from host: %s", message)
+                await self._recv_queue.put((message, time.perf_counter()))
+
+    async def _send_frames(
+        self, ready: Future[None], closed: Future[None], message_batching: MessageBatchingConfig | None
+    ) -> AsyncIterator[agent_worker_pb2.Message]:
+        """The request iterator of one call. Messages are only sent once the host has accepted the call, and
+        those the call did not send are kept for the next one."""
+        queue = _ConnectionSendQueue(self._send_queue, self._unsent, closed)
+        # Batches are only sent once the host has announced in its initial metadata that it reads them.
+        frames: AsyncIterator[agent_worker_pb2.Message] = QueueAsyncIterable(queue)
+        if message_batching is not None:
+            frames = batch_messages(queue, message_batching, enabled=lambda: self.host_supports(BATCHING_METADATA_KEY))
+        try:
+            await asyncio.wait((ready, closed), return_when=asyncio.FIRST_COMPLETED)
+            if closed.done():
+                return
+            if self._connections > 1:
+                for message in await self._resume_messages():
+                    if closed.done():
+                        return
+                    self._track_sent(message)
+                    yield message
+            while True:
+                try:
+                    frame = await anext(frames)
+                except _ConnectionClosed:
+                    return
+                if closed.done():
+                    return
+                sent = len(frame.batch.messages) if frame.WhichOneof("message") == "batch" else 1
+                for message in queue.taken[:sent]:
+                    self._track_sent(message)
+                del queue.taken[:sent]
+                yield frame
+        finally:
+            # Send the messages the call took but did not send on the next connection, before the queued ones.
+            self._unsent.extendleft(reversed(queue.taken))
+            queue.taken.clear()
+
+    async def _resume_messages(self) -> List[agent_worker_pb2.Message]:
+        messages: List[agent_worker_pb2.Message] = []
+        if self._on_reconnect is not None:
+            try:
+                messages.extend(await self._on_reconnect())
+            except Exception as e:
+                logger.error("Failed to prepare the messages to resend after reconnecting", exc_info=e)
+        messages.extend(self._unacknowledged.values())
+        if messages:
+            logger.info("Resending %d messages after reconnecting", len(messages))
+        return messages
+
+    def _track_sent(self, message: agent_worker_pb2.Message) -> None:
+        if self._reconnect is None:
+            return
+        field = message.WhichOneof("message")
+        if field in _REQUEST_FIELDS:
+            self._unacknowledged[getattr(message, field).request_id] = message
+
+    def acknowledge(self, request_id: str) -> None:
+        """Stop resending a request after reconnecting, because it was answered or is no longer awaited."""
+        self._unacknowledged.pop(request_id, None)
+
+    def host_supports(self, capability: str) -> bool:
+        """Whether the host announced a capability when the channel was opened."""
+        return capability in self._host_capabilities
+
+    @property
+    def send_queue_full(self) -> bool:
+        return self._send_queue.full()
 
     async def send(self, message: agent_worker_pb2.Message) -> None:
-        logger.info(f"Send message to host: {message}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Send message to host: %s", message)
         await self._send_queue.put(message)
-        logger.info("Put message in send queue")
 
-    async def recv(self) -> agent_worker_pb2.Message:
-        logger.info("Getting message from queue")
+    async def recv(self) -> Tuple[agent_worker_pb2.Message, float]:
+        """Return the next message from the host and the :func:`time.perf_counter` time it was received at."""
         return await self._recv_queue.get()
 
+    @property
+    def received_queue_size(self) -> int:
+        """Number of messages received from the host that have not been read yet."""
+        return self._recv_queue.qsize()
+
 
 class WorkerAgentRuntime(AgentRuntime):
+    """An agent runtime that connects to a :class:`WorkerAgentRuntimeHost` and exchanges messages with
+    agents hosted by other workers.
+
+    Args:
+        host_address (str): The address of the host, in any of the forms that :class:`WorkerAgentRuntimeHost`
+            accepts, including ``unix://`` and ``inproc://`` addresses.
+        tracer_provider (TracerProvider, optional): The tracer provider used for tracing messages.
+        extra_grpc_config (ChannelArgumentType, optional): Extra gRPC channel options.
+        trace_sampling_ratio (float, optional): Fraction of the traces started by this worker that are recorded,
+            see :class:`~autogen_core.application.telemetry.TraceHelper`. Defaults to 1.0.
+        meter_provider (MeterProvider, optional): Export the runtime :attr:`metrics` through OpenTelemetry with
+            this meter provider. Defaults to only keeping them in process.
+        max_live_agents (int, optional): Maximum number of agent instances kept in memory. When exceeded,
+            the least recently used agents are passivated into ``agent_state_store`` and restored when they
+            are next needed. Defaults to no limit.
+        agent_idle_timeout (float, optional): Passivate agents that have not handled a message for this
+            many seconds. Checked whenever an agent is activated. Defaults to no timeout.
+        agent_state_store (AgentStateStore, optional): Where passivated agent states are kept. Use a
+            :class:`HostAgentStateStore` to keep them in the host. Defaults to an :class:`InMemoryAgentStateStore`.
+        max_queue_size (int, optional): Maximum number of messages buffered in each direction of the
+            connection to the host. Defaults to no limit.
+        queue_full_policy (Literal["wait", "fail"], optional): What :meth:`send_message` and
+            :meth:`publish_message` do when the outgoing queue is full. ``"wait"`` waits until there is
+            capacity, ``"fail"`` raises :class:`~autogen_core.base.exceptions.UndeliverableException`.
+            Defaults to ``"wait"``.
+        message_batching (MessageBatchingConfig, optional): Send messages to the host in batches when the host
+            supports it, and let the host batch the messages it sends to this worker. Defaults to no batching.
+        local_delivery (bool, optional): Deliver messages for agent types registered with this worker directly,
+            without serializing them or sending them through the host. Events are still forwarded to the host
+            for subscribers on other workers. Only used when the host supports it and does not share agent types
+            between workers. Exceptions raised by a local recipient of :meth:`send_message` reach the sender
+            unchanged. Defaults to True.
+        payload_compression (PayloadCompressionConfig | None, optional): Compress the payloads of large messages
+            sent by this worker. Compressed payloads from other workers are decompressed either way. Defaults to
+            no compression.
+        request_timeout (float | None, optional): Default number of seconds :meth:`send_message` waits for a
+            response before it raises :class:`TimeoutError`. The timeout is sent along with the request, and the
+            cancellation token of the handler on the receiving worker is cancelled when it expires. Defaults to
+            waiting indefinitely.
+        reconnect (ReconnectConfig | None, optional): How to reconnect to the host when the connection is lost.
+            ``None`` disables reconnecting. Defaults to reconnecting with the defaults of :class:`ReconnectConfig`.
+    """
+
     def __init__(
         self,
         host_address: str,
         tracer_provider: TracerProvider | None = None,
         extra_grpc_config: ChannelArgumentType | None = None,
+        *,
+        trace_sampling_ratio: float = 1.0,
+        meter_provider: MeterProvider | None = None,
+        max_live_agents: int | None = None,
+        agent_idle_timeout: float | None = None,
+        agent_state_store: AgentStateStore | None = None,
+        max_queue_size: int | None = None,
+        queue_full_policy: Literal["wait", "fail"] = "wait",
+        message_batching: MessageBatchingConfig | None = None,
+        local_delivery: bool = True,
+        payload_compression: PayloadCompressionConfig | None = None,
+        request_timeout: float | None = None,
+        reconnect: ReconnectConfig | None = _DEFAULT_RECONNECT_CONFIG,
     ) -> None:
         self._host_address = host_address
-        self._trace_helper = TraceHelper(tracer_provider, MessageRuntimeTracingConfig("Worker Runtime"))
+        self._trace_helper = TraceHelper(
+            tracer_provider, MessageRuntimeTracingConfig("Worker Runtime"), trace_sampling_ratio
+        )
+        self._metrics = RuntimeMetrics("Worker Runtime", self._received_queue_size, meter_provider=meter_provider)
         self._per_type_subscribers: DefaultDict[tuple[str, str], Set[AgentId]] = defaultdict(set)
         self._agent_factories: Dict[
             str, Callable[[], Agent | Awaitable[Agent]] | Callable[[AgentRuntime, AgentId], Agent | Awaitable[Agent]]
         ] = {}
-        self._instantiated_agents: Dict[AgentId, Agent] = {}
+        self._mailboxes = AgentMailboxes()
+        self._instantiated_agents = LiveAgentCache(
+            max_size=max_live_agents, idle_timeout=agent_idle_timeout, state_store=agent_state_store
+        )
         self._known_namespaces: set[str] = set()
         self._read_task: None | Task[None] = None
         self._running = False
@@ -191,6 +470,23 @@ def __init__(
         self._subscription_manager = SubscriptionManager()
         self._serialization_registry = SerializationRegistry()
         self._extra_grpc_config = extra_grpc_config or []
+        self._max_queue_size = max_queue_size
+        self._queue_full_policy = queue_full_policy
+        self._message_batching = message_batching
+        self._local_delivery = local_delivery
+        self._payload_compression = payload_compression
+        if request_timeout is not None and request_timeout <= 0:
+            raise ValueError("request_timeout must be positive.")
+        self._request_timeout = request_timeout
+        # Deadlines of the requests sent by this worker and of the requests it handles.
+        self._timers = TimerWheel()
+        self._reconnect = reconnect
+        # Agent types whose registration the host has confirmed.
+        self._local_agent_types: Set[str] = set()
+        # Subscriptions the host has confirmed.
+        self._host_subscriptions: List[TypeSubscription] = []
+        self._rejected_messages = 0
+        self._delayed_messages = 0
 
     def start(self) -> None:
         """Start the runtime in a background task."""
@@ -198,13 +494,39 @@ def start(self) -> None:
             raise ValueError("Runtime is already running.")
         logger.info(f"Connecting to host: {self._host_address}")
         self._host_connection = HostConnection.from_host_address(
-            self._host_address, extra_grpc_config=self._extra_grpc_config
+            self._host_address,
+            extra_grpc_config=self._extra_grpc_config,
+            max_queue_size=self._max_queue_size or 0,
+            message_batching=self._message_batching,
+            reconnect=self._reconnect,
+            on_reconnect=self._reregistration_messages,
         )
         logger.info("Connection established")
         if self._read_task is None:
             self._read_task = asyncio.create_task(self._run_read_loop())
         self._running = True
 
+    @property
+    def metrics(self) -> RuntimeMetrics:
+        """The metrics of the runtime, see :meth:`RuntimeMetrics.snapshot`. The queue holds the messages received
+        from the host that have not been dispatched yet."""
+        return self._metrics
+
+    def _received_queue_size(self) -> int:
+        return self._host_connection.received_queue_size if self._host_connection is not None else 0
+
+    async def _call_handler(self, agent: Agent, message: Any, ctx: MessageContext, message_type: str) -> Any:
+        start = time.perf_counter()
+        try:
+            result = await agent.on_message(message, ctx=ctx)
+        except BaseException as e:
+            self._metrics.record_handler_call(
+                agent.id.type, message_type, time.perf_counter() - start, not isinstance(e, asyncio.CancelledError)
+            )
+            raise
+        self._metrics.record_handler_call(agent.id.type, message_type, time.perf_counter() - start, False)
+        return result
+
     def _raise_on_exception(self, task: Task[Any]) -> None:
         exception = task.exception()
         if exception is not None:
@@ -212,10 +534,11 @@ def _raise_on_exception(self, task: Task[Any]) -> None:
 
     async def _run_read_loop(self) -> None:
         logger.info("Starting read loop")
-        # TODO: catch exceptions and reconnect
         while self._running:
             try:
-                message = await self._host_connection.recv()  # type: ignore
+                message, received_at = await self._host_connection.recv()  # type: ignore
+                self._metrics.record_queue_depth(self._received_queue_size() + 1)
+                self._metrics.record_queue_delay(time.perf_counter() - received_at)
                 oneofcase = agent_worker_pb2.Message.WhichOneof(message, "message")
                 match oneofcase:
                     case "registerAgentTypeRequest" | "addSubscriptionRequest":
@@ -266,6 +589,7 @@ async def stop(self) -> None:
         for task_result in final_tasks_results:
             if isinstance(task_result, Exception):
                 logger.error("Error in background task", exc_info=task_result)
+        self._timers.close()
         # Close the host connection.
         if self._host_connection is not None:
             try:
@@ -302,6 +626,16 @@ def signal_handler() -> None:
     def _known_agent_names(self) -> Set[str]:
         return set(self._agent_factories.keys())
 
+    @property
+    def rejected_messages(self) -> int:
+        """Number of messages rejected because the outgoing queue was full."""
+        return self._rejected_messages
+
+    @property
+    def delayed_messages(self) -> int:
+        """Number of messages that had to wait for space in the outgoing queue."""
+        return self._delayed_messages
+
     async def _send_message(
         self,
         runtime_message: agent_worker_pb2.Message,
@@ -311,9 +645,102 @@ async def _send_message(
     ) -> None:
         if self._host_connection is None:
             raise RuntimeError("Host connection is not set.")
+        self._check_send_queue()
         with self._trace_helper.trace_block(send_type, recipient, parent=telemetry_metadata):
             await self._host_connection.send(runtime_message)
 
+    def _check_send_queue(self) -> None:
+        """Apply the queue full policy before queuing a message for the host."""
+        assert self._host_connection is not None
+        if self._host_connection.send_queue_full:
+            if self._queue_full_policy == "fail":
+                self._rejected_messages += 1
+                raise UndeliverableException("Outgoing message queue is full.")
+            self._delayed_messages += 1
+
+    def _telemetry_metadata(self) -> Dict[str, str]:
+        # Without tracing there is no trace context to propagate.
+        return get_telemetry_grpc_metadata() if self._trace_helper.enabled else {}
+
+    def _make_payload(self, data_type: str, data_content_type: str, data: bytes) -> agent_worker_pb2.Payload:
+        data, data_content_encoding = compress_payload_data(data, self._payload_compression)
+        return agent_worker_pb2.Payload(
+            data_type=data_type,
+            data_content_type=data_content_type,
+            data=data,
+            data_content_encoding=data_content_encoding,
+        )
+
+    def _deserialize_payload(self, payload: agent_worker_pb2.Payload) -> Any:
+        return self._serialization_registry.deserialize(
+            decompress_payload_data(payload), type_name=payload.data_type, data_content_type=payload.data_content_type
+        )
+
+    def _delivers_locally(self) -> bool:
+        # Agents of a type shared with other workers may live on another worker, so only the host can route them.
+        return (
+            self._local_delivery
+            and self._host_connection is not None
+            and self._host_connection.host_supports(LOCAL_DELIVERY_METADATA_KEY)
+            and not self._host_connection.host_supports(SHARED_AGENT_TYPES_METADATA_KEY)
+        )
+
+    def _start_background_task(self, coro: Coroutine[Any, Any, R]) -> Task[R]:
+        task = asyncio.create_task(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+        return task
+
+    async def _send_local_message(
+        self,
+        message: Any,
+        recipient: AgentId,
+        sender: AgentId | None,
+        cancellation_token: CancellationToken,
+        message_type: str,
+        telemetry_metadata: Mapping[str, str],
+        timeout: float | None,
+    ) -> Any:
+        async def process() -> Any:
+            slot = self._mailboxes.reserve(recipient)
+            try:
+                await slot.wait()
+                agent = await self._get_agent(recipient)
+                message_context = MessageContext(
+                    sender=sender,
+                    topic_id=None,
+                    is_rpc=True,
+                    cancellation_token=cancellation_token,
+                )
+                self._instantiated_agents.pin(recipient)
+                try:
+                    with MessageHandlerContext.populate_context(agent.id):
+                        with self._trace_helper.trace_block(
+                            "process",
+                            agent.id,
+                            parent=telemetry_metadata,
+                            extraAttributes={"message_type": message_type},
+                        ):
+                            return await self._call_handler(agent, message, message_context, message_type)
+                finally:
+                    self._instantiated_agents.unpin(recipient)
+            finally:
+                slot.release()
+
+        with self._trace_helper.trace_block("send", recipient, parent=telemetry_metadata):
+            # Handle the message in its own task, like a message from the host, so that messages sent or
+            # published earlier start first.
+            task = self._start_background_task(process())
+        # Like a request to the host, cancelling the token stops waiting for the response.
+        cancellation_token.link_future(task)
+        if timeout is None:
+            return await task
+        try:
+            return await asyncio.wait_for(task, timeout)
+        except asyncio.TimeoutError:
+            cancellation_token.cancel()
+            raise TimeoutError(f"No response from {recipient} within {timeout} seconds.") from None
+
     async def send_message(
         self,
         message: Any,
@@ -321,43 +748,197 @@ async def send_message(
         *,
         sender: AgentId | None = None,
         cancellation_token: CancellationToken | None = None,
+        timeout: float | None = None,
     ) -> Any:
+        """Send a message to an agent and return its response.
+
+        Args:
+            timeout (float | None, optional): Number of seconds to wait for the response before raising
+                :class:`TimeoutError`. Defaults to the ``request_timeout`` of the runtime.
+
+        See :meth:`~autogen_core.base.AgentRuntime.send_message` for the other arguments.
+        """
         if not self._running:
             raise ValueError("Runtime must be running when sending message.")
+        if timeout is None:
+            timeout = self._request_timeout
         if self._host_connection is None:
             raise RuntimeError("Host connection is not set.")
         data_type = self._serialization_registry.type_name(message)
         with self._trace_helper.trace_block(
             "create", recipient, parent=None, extraAttributes={"message_type": data_type}
         ):
-            # create a new future for the result
-            future = asyncio.get_event_loop().create_future()
-            request_id = await self._get_new_request_id()
-            self._pending_requests[request_id] = future
-            serialized_message = self._serialization_registry.serialize(
-                message, type_name=data_type, data_content_type=JSON_DATA_CONTENT_TYPE
+            if recipient.type in self._local_agent_types and self._delivers_locally():
+                # A child token, so that a timeout cancels the handler but not the other calls using the token.
+                return await self._send_local_message(
+                    message,
+                    recipient,
+                    sender,
+                    cancellation_token.child() if cancellation_token is not None else CancellationToken(),
+                    data_type,
+                    self._telemetry_metadata(),
+                    timeout,
+                )
+            telemetry_metadata = self._telemetry_metadata()
+            request_id, future, runtime_message = await self._create_request(
+                message, data_type, recipient, sender, telemetry_metadata, timeout
             )
-            telemetry_metadata = get_telemetry_grpc_metadata()
-            runtime_message = agent_worker_pb2.Message(
-                request=agent_worker_pb2.RpcRequest(
-                    request_id=request_id,
-                    target=agent_worker_pb2.AgentId(type=recipient.type, key=recipient.key),
-                    source=agent_worker_pb2.AgentId(type=sender.type, key=sender.key) if sender is not None else None,
-                    metadata=telemetry_metadata,
-                    payload=agent_worker_pb2.Payload(
-                        data_type=data_type,
-                        data=serialized_message,
-                        data_content_type=JSON_DATA_CONTENT_TYPE,
-                    ),
+            if cancellation_token is not None:
+                remove_callback = cancellation_token.add_callback(
+                    lambda: self._fail_pending_request(request_id, asyncio.CancelledError())
+                )
+                future.add_done_callback(lambda _: remove_callback())
+            # Await the send so that a full outgoing queue applies backpressure to the caller.
+            try:
+                await self._send_message(runtime_message, "send", recipient, telemetry_metadata)
+            except BaseException:
+                self._discard_request(request_id)
+                raise
+            return await future
+
+    async def send_messages(
+        self,
+        messages: Sequence[Tuple[Any, AgentId]],
+        *,
+        sender: AgentId | None = None,
+        cancellation_token: CancellationToken | None = None,
+        timeout: float | None = None,
+    ) -> List[Future[Any]]:
+        """Send several messages, each to its agent, and return the futures of their responses.
+
+        The requests to agents on other workers are queued for the host together, so with ``message_batching`` they
+        are sent in one frame up to the batch limits.
+
+        Args:
+            timeout (float | None, optional): Number of seconds to wait for each response before its future raises
+                :class:`TimeoutError`. Defaults to the ``request_timeout`` of the runtime.
+
+        See :meth:`~autogen_core.base.AgentRuntime.send_messages` for the other arguments.
+        """
+        if not self._running:
+            raise ValueError("Runtime must be running when sending message.")
+        if timeout is None:
+            timeout = self._request_timeout
+        if self._host_connection is None:
+            raise RuntimeError("Host connection is not set.")
+        if cancellation_token is None:
+            cancellation_token = CancellationToken()
+        futures: List[Future[Any]] = []
+        requests: List[Tuple[str, Future[Any], agent_worker_pb2.Message]] = []
+        with self._trace_helper.trace_block("create", None, parent=None, extraAttributes={"batch_size": len(messages)}):
+            telemetry_metadata = self._telemetry_metadata()
+            delivers_locally = self._delivers_locally()
+            for message, recipient in messages:
+                data_type = self._serialization_registry.type_name(message)
+                if recipient.type in self._local_agent_types and delivers_locally:
+                    # A child token, since a local send cancels its token when it times out.
+                    local_send = self._send_local_message(
+                        message, recipient, sender, cancellation_token.child(), data_type, telemetry_metadata, timeout
+                    )
+                    futures.append(asyncio.ensure_future(local_send))
+                    continue
+                request_id, future, runtime_message = await self._create_request(
+                    message, data_type, recipient, sender, telemetry_metadata, timeout
                 )
+                futures.append(future)
+                requests.append((request_id, future, runtime_message))
+            if not requests:
+                return futures
+
+            # One cancellation callback for all the requests, removed once they are all done.
+            request_ids = [request_id for request_id, _, _ in requests]
+            remove_callback = cancellation_token.add_callback(
+                lambda: self._fail_pending_requests(request_ids, asyncio.CancelledError())
+            )
+            remaining = len(requests)
+
+            def on_response(_: Future[Any]) -> None:
+                nonlocal remaining
+                remaining -= 1
+                if remaining == 0:
+                    remove_callback()
+
+            for _, future, _ in requests:
+                future.add_done_callback(on_response)
+            with self._trace_helper.trace_block(
+                "send", None, parent=telemetry_metadata, extraAttributes={"batch_size": len(requests)}
+            ):
+                for index, (_, _, runtime_message) in enumerate(requests):
+                    try:
+                        self._check_send_queue()
+                        await self._host_connection.send(runtime_message)
+                    except BaseException as e:
+                        # The requests that were not queued for the host get the error.
+                        self._fail_pending_requests(request_ids[index:], e)
+                        if isinstance(e, asyncio.CancelledError):
+                            raise
+                        break
+        return futures
+
+    async def _create_request(
+        self,
+        message: Any,
+        data_type: str,
+        recipient: AgentId,
+        sender: AgentId | None,
+        telemetry_metadata: Mapping[str, str],
+        timeout: float | None,
+    ) -> Tuple[str, Future[Any], agent_worker_pb2.Message]:
+        """Create the request message for a message to an agent on another worker, and register the future of
+        its response."""
+        future: Future[Any] = asyncio.get_running_loop().create_future()
+        request_id = await self._get_new_request_id()
+        data_content_type = self._serialization_registry.data_content_type(data_type)
+        serialized_message = self._serialization_registry.serialize(
+            message, type_name=data_type, data_content_type=data_content_type
+        )
+        request_metadata = telemetry_metadata
+        if timeout is not None:
+            request_metadata = {**telemetry_metadata, TIMEOUT_METADATA_KEY: repr(timeout)}
+        runtime_message = agent_worker_pb2.Message(
+            request=agent_worker_pb2.RpcRequest(
+                request_id=request_id,
+                target=agent_worker_pb2.AgentId(type=recipient.type, key=recipient.key),
+                source=agent_worker_pb2.AgentId(type=sender.type, key=sender.key) if sender is not None else None,
+                metadata=request_metadata,
+                payload=self._make_payload(data_type, data_content_type, serialized_message),
             )
+        )
 
-            # TODO: Find a way to handle timeouts/errors
-            task = asyncio.create_task(self._send_message(runtime_message, "send", recipient, telemetry_metadata))
-            self._background_tasks.add(task)
-            task.add_done_callback(self._raise_on_exception)
-            task.add_done_callback(self._background_tasks.discard)
-            return await future
+        self._pending_requests[request_id] = future
+        if timeout is not None:
+            self._timers.add(
+                request_id,
+                asyncio.get_running_loop().time() + timeout,
+                lambda: self._fail_pending_request(
+                    request_id, TimeoutError(f"No response from {recipient} within {timeout} seconds.")
+                ),
+            )
+        return request_id, future, runtime_message
+
+    def _discard_request(self, request_id: str) -> None:
+        """Forget a request that could not be sent."""
+        self._pending_requests.pop(request_id, None)
+        self._timers.remove(request_id)
+        if self._host_connection is not None:
+            self._host_connection.acknowledge(request_id)
+
+    def _fail_pending_requests(self, request_ids: Sequence[str], exception: BaseException) -> None:
+        for request_id in request_ids:
+            self._fail_pending_request(request_id, exception)
+
+    def _fail_pending_request(self, request_id: str, exception: BaseException) -> None:
+        """Stop waiting for the response to a request. A response that still arrives is dropped."""
+        self._timers.remove(request_id)
+        if self._host_connection is not None:
+            self._host_connection.acknowledge(request_id)
+        future = self._pending_requests.pop(request_id, None)
+        if future is None or future.done():
+            return
+        if isinstance(exception, asyncio.CancelledError):
+            future.cancel()
+        else:
+            future.set_exception(exception)
 
     async def publish_message(
         self,
@@ -375,43 +956,117 @@ async def publish_message(
         with self._trace_helper.trace_block(
             "create", topic_id, parent=None, extraAttributes={"message_type": message_type}
         ):
-            serialized_message = self._serialization_registry.serialize(
-                message, type_name=message_type, data_content_type=JSON_DATA_CONTENT_TYPE
+            telemetry_metadata = self._telemetry_metadata()
+            runtime_message = await self._create_event(
+                message, message_type, topic_id, sender, telemetry_metadata, self._delivers_locally()
             )
-            telemetry_metadata = get_telemetry_grpc_metadata()
-            runtime_message = agent_worker_pb2.Message(
-                event=agent_worker_pb2.Event(
-                    topic_type=topic_id.type,
-                    topic_source=topic_id.source,
-                    source=agent_worker_pb2.AgentId(type=sender.type, key=sender.key) if sender is not None else None,
-                    metadata=telemetry_metadata,
-                    payload=agent_worker_pb2.Payload(
-                        data_type=message_type,
-                        data=serialized_message,
-                        data_content_type=JSON_DATA_CONTENT_TYPE,
-                    ),
+            await self._send_message(runtime_message, "publish", topic_id, telemetry_metadata)
+
+    async def publish_messages(
+        self,
+        messages: Sequence[Tuple[Any, TopicId]],
+        *,
+        sender: AgentId | None = None,
+        cancellation_token: CancellationToken | None = None,
+    ) -> None:
+        """Publish several messages, each to its topic, in order. The events are queued for the host together, so
+        with ``message_batching`` they are sent in one frame up to the batch limits.
+
+        See :meth:`~autogen_core.base.AgentRuntime.publish_messages` for the arguments.
+        """
+        if not self._running:
+            raise ValueError("Runtime must be running when publishing message.")
+        if self._host_connection is None:
+            raise RuntimeError("Host connection is not set.")
+        with self._trace_helper.trace_block("create", None, parent=None, extraAttributes={"batch_size": len(messages)}):
+            telemetry_metadata = self._telemetry_metadata()
+            delivered_locally = self._delivers_locally()
+            with self._trace_helper.trace_block(
+                "publish", None, parent=telemetry_metadata, extraAttributes={"batch_size": len(messages)}
+            ):
+                # Create and queue the events one at a time, so that the local subscribers do not get the
+                # messages after one that is rejected by the queue full policy.
+                for message, topic_id in messages:
+                    self._check_send_queue()
+                    runtime_message = await self._create_event(
+                        message,
+                        self._serialization_registry.type_name(message),
+                        topic_id,
+                        sender,
+                        telemetry_metadata,
+                        delivered_locally,
+                    )
+                    await self._host_connection.send(runtime_message)
+
+    async def _create_event(
+        self,
+        message: Any,
+        message_type: str,
+        topic_id: TopicId,
+        sender: AgentId | None,
+        telemetry_metadata: Mapping[str, str],
+        delivered_locally: bool,
+    ) -> agent_worker_pb2.Message:
+        """Create the event message for a published message. When the event is delivered locally, also start
+        delivering it to the local subscribers."""
+        # When local delivery is on, the host does not send the event back to this worker, so it must be
+        # delivered to the local subscribers here.
+        if delivered_locally:
+            local_recipients = [
+                recipient
+                for recipient in await self._subscription_manager.get_subscribed_recipients(topic_id)
+                if recipient.type in self._local_agent_types
+            ]
+            if local_recipients:
+                # Deliver in a task, like an event from the host, so the publisher does not wait for the handlers.
+                task = self._start_background_task(
+                    self._deliver_event(message, topic_id, sender, local_recipients, message_type, telemetry_metadata)
                 )
+                task.add_done_callback(self._raise_on_exception)
+        data_content_type = self._serialization_registry.data_content_type(message_type)
+        serialized_message = self._serialization_registry.serialize(
+            message, type_name=message_type, data_content_type=data_content_type
+        )
+        return agent_worker_pb2.Message(
+            event=agent_worker_pb2.Event(
+                topic_type=topic_id.type,
+                topic_source=topic_id.source,
+                source=agent_worker_pb2.AgentId(type=sender.type, key=sender.key) if sender is not None else None,
+                metadata=telemetry_metadata,
+                payload=self._make_payload(message_type, data_content_type, serialized_message),
+                delivered_locally=delivered_locally,
             )
-
-            task = asyncio.create_task(self._send_message(runtime_message, "publish", topic_id, telemetry_metadata))
-            self._background_tasks.add(task)
-            task.add_done_callback(self._raise_on_exception)
-            task.add_done_callback(self._background_tasks.discard)
+        )
 
     async def save_state(self) -> Mapping[str, Any]:
-        raise NotImplementedError("Saving state is not yet implemented.")
+        """Save the states of the agents of this worker, including passivated ones. Agents on other workers are
+        not included."""
+        state: Dict[str, Dict[str, Any]] = {}
+        for agent_id in self._instantiated_agents:
+            state[str(agent_id)] = dict(await (await self._get_agent(agent_id)).save_state())
+        for agent_id in self._instantiated_agents.passivated_agents:
+            agent_state = await self._instantiated_agents.state_store.load(agent_id)
+            if agent_state is not None:
+                state[str(agent_id)] = dict(agent_state)
+        return state
 
     async def load_state(self, state: Mapping[str, Any]) -> None:
-        raise NotImplementedError("Loading state is not yet implemented.")
+        """Load the states of the agents whose types are registered with this worker. Other states are ignored."""
+        for agent_id_str in state:
+            agent_id = AgentId.from_str(agent_id_str)
+            if agent_id.type in self._known_agent_names:
+                await (await self._get_agent(agent_id)).load_state(state[str(agent_id)])
 
     async def agent_metadata(self, agent: AgentId) -> AgentMetadata:
         raise NotImplementedError("Agent metadata is not yet implemented.")
 
     async def agent_save_state(self, agent: AgentId) -> Mapping[str, Any]:
-        raise NotImplementedError("Agent save_state is not yet implemented.")
+        """Save the state of an agent of this worker. Use a :class:`HostAgentStateStore` to keep it in the host."""
+        return await (await self._get_agent(agent)).save_state()
 
     async def agent_load_state(self, agent: AgentId, state: Mapping[str, Any]) -> None:
-        raise NotImplementedError("Agent load_state is not yet implemented.")
+        """Load the state of an agent of this worker."""
+        await (await self._get_agent(agent)).load_state(state)
 
     async def _get_new_request_id(self) -> str:
         async with self._pending_requests_lock:
@@ -424,28 +1079,47 @@ async def _process_request(self, request: agent_worker_pb2.RpcRequest) -> None:
         sender: AgentId | None = None
         if request.HasField("source"):
             sender = AgentId(request.source.type, request.source.key)
-            logging.info(f"Processing request from {sender} to {recipient}")
+            logger.debug("Processing request from %s to %s", sender, recipient)
         else:
-            logging.info(f"Processing request from unknown source to {recipient}")
+            logger.debug("Processing request from unknown source to %s", recipient)
 
+        # Take the place in the mailbox of the recipient before the first await. Messages are handled in tasks
+        # that start in the order the messages arrived, so this keeps the messages to an agent in order.
+        slot = self._mailboxes.reserve(recipient)
+        try:
+            await self._process_request_in_slot(request, recipient, sender, slot)
+        finally:
+            slot.release()
+
+    async def _process_request_in_slot(
+        self, request: agent_worker_pb2.RpcRequest, recipient: AgentId, sender: AgentId | None, slot: MailboxSlot
+    ) -> None:
+        assert self._host_connection is not None
         # Deserialize the message.
-        message = self._serialization_registry.deserialize(
-            request.payload.data,
-            type_name=request.payload.data_type,
-            data_content_type=request.payload.data_content_type,
-        )
+        message = self._deserialize_payload(request.payload)
 
-        # Get the receiving agent and prepare the message context.
-        rec_agent = await self._get_agent(recipient)
+        # Prepare the message context.
+        cancellation_token = CancellationToken()
         message_context = MessageContext(
             sender=sender,
             topic_id=None,
             is_rpc=True,
-            cancellation_token=CancellationToken(),
+            cancellation_token=cancellation_token,
         )
-
-        # Call the receiving agent.
+        # Cancel the handler once the sender stops waiting for the response.
+        timer_key = (recipient, request.request_id)
+        timeout = request.metadata.get(TIMEOUT_METADATA_KEY)
+        if timeout is not None:
+            self._timers.add(timer_key, asyncio.get_running_loop().time() + float(timeout), cancellation_token.cancel)
+
+        # Call the receiving agent once the messages it received earlier leave a free slot.
+        self._instantiated_agents.pin(recipient)
         try:
+            await slot.wait()
+            if cancellation_token.is_cancelled():
+                logger.info(f"Dropping request {request.request_id}, the sender no longer waits for it.")
+                return
+            rec_agent = await self._get_agent(recipient)
             with MessageHandlerContext.populate_context(rec_agent.id):
                 with self._trace_helper.trace_block(
                     "process",
@@ -454,35 +1128,45 @@ async def _process_request(self, request: agent_worker_pb2.RpcRequest) -> None:
                     attributes={"request_id": request.request_id},
                     extraAttributes={"message_type": request.payload.data_type},
                 ):
-                    result = await rec_agent.on_message(message, ctx=message_context)
+                    result = await self._call_handler(rec_agent, message, message_context, request.payload.data_type)
         except BaseException as e:
+            if cancellation_token.is_cancelled() and timeout is not None:
+                logger.info(f"Dropping the error of request {request.request_id}, the sender no longer waits for it.")
+                return
             response_message = agent_worker_pb2.Message(
                 response=agent_worker_pb2.RpcResponse(
                     request_id=request.request_id,
-                    error=str(e),
-                    metadata=get_telemetry_grpc_metadata(),
+                    # An empty error means success, and some exceptions, such as CancelledError, have no message.
+                    error=str(e) or repr(e),
+                    metadata=self._telemetry_metadata(),
                 ),
             )
             # Send the error response.
             await self._host_connection.send(response_message)
             return
+        finally:
+            self._timers.remove(timer_key)
+            self._instantiated_agents.unpin(recipient)
+
+        if cancellation_token.is_cancelled() and timeout is not None:
+            logger.info(f"Dropping the response to request {request.request_id}, the sender no longer waits for it.")
+            return
 
-        # Serialize the result.
+        # Serialize the result, in the content type of the request if possible since the sender can read it.
         result_type = self._serialization_registry.type_name(result)
+        result_content_type = self._serialization_registry.data_content_type(
+            result_type, accept=request.payload.data_content_type
+        )
         serialized_result = self._serialization_registry.serialize(
-            result, type_name=result_type, data_content_type=JSON_DATA_CONTENT_TYPE
+            result, type_name=result_type, data_content_type=result_content_type
         )
 
         # Create the response message.
         response_message = agent_worker_pb2.Message(
             response=agent_worker_pb2.RpcResponse(
                 request_id=request.request_id,
-                payload=agent_worker_pb2.Payload(
-                    data_type=result_type,
-                    data=serialized_result,
-                    data_content_type=JSON_DATA_CONTENT_TYPE,
-                ),
-                metadata=get_telemetry_grpc_metadata(),
+                payload=self._make_payload(result_type, result_content_type, serialized_result),
+                metadata=self._telemetry_metadata(),
             )
         )
 
@@ -497,59 +1181,95 @@ async def _process_response(self, response: agent_worker_pb2.RpcResponse) -> Non
             attributes={"request_id": response.request_id},
             extraAttributes={"message_type": response.payload.data_type},
         ):
-            # Deserialize the result.
-            result = self._serialization_registry.deserialize(
-                response.payload.data,
-                type_name=response.payload.data_type,
-                data_content_type=response.payload.data_content_type,
-            )
+            assert self._host_connection is not None
+            self._host_connection.acknowledge(response.request_id)
             # Get the future and set the result.
-            future = self._pending_requests.pop(response.request_id)
+            future = self._pending_requests.pop(response.request_id, None)
+            if future is None:
+                logger.info(
+                    f"Dropping the response to request {response.request_id}, which timed out or was cancelled."
+                )
+                return
+            self._timers.remove(response.request_id)
             if len(response.error) > 0:
                 future.set_exception(Exception(response.error))
+                return
+            try:
+                result = self._deserialize_payload(response.payload)
+            except Exception as e:
+                future.set_exception(e)
             else:
                 future.set_result(result)
 
     async def _process_event(self, event: agent_worker_pb2.Event) -> None:
-        message = self._serialization_registry.deserialize(
-            event.payload.data, type_name=event.payload.data_type, data_content_type=event.payload.data_content_type
-        )
+        message = self._deserialize_payload(event.payload)
         sender: AgentId | None = None
         if event.HasField("source"):
             sender = AgentId(event.source.type, event.source.key)
         topic_id = TopicId(event.topic_type, event.topic_source)
-        # Get the recipients for the topic.
-        recipients = await self._subscription_manager.get_subscribed_recipients(topic_id)
+        # Get the recipients for the topic. The host lists the recipients when the agent types are shared
+        # with other workers, since this worker must only deliver to the agent keys it owns.
+        recipients: Sequence[AgentId]
+        if len(event.recipients) > 0:
+            recipients = [AgentId(recipient.type, recipient.key) for recipient in event.recipients]
+        else:
+            recipients = await self._subscription_manager.get_subscribed_recipients(topic_id)
+        await self._deliver_event(message, topic_id, sender, recipients, event.payload.data_type, event.metadata)
+
+    async def _deliver_event(
+        self,
+        message: Any,
+        topic_id: TopicId,
+        sender: AgentId | None,
+        recipients: Sequence[AgentId],
+        message_type: str,
+        telemetry_metadata: Mapping[str, str],
+    ) -> None:
+        recipients = [agent_id for agent_id in recipients if agent_id != sender]
+        # Take the places in the mailboxes before the first await, see _process_request.
+        slots = [self._mailboxes.reserve(agent_id) for agent_id in recipients]
         # Send the message to each recipient.
         responses: List[Awaitable[Any]] = []
-        for agent_id in recipients:
-            if agent_id == sender:
-                continue
-            message_context = MessageContext(
-                sender=sender,
-                topic_id=topic_id,
-                is_rpc=False,
-                cancellation_token=CancellationToken(),
-            )
-            agent = await self._get_agent(agent_id)
-            with MessageHandlerContext.populate_context(agent.id):
-
-                async def send_message(agent: Agent, message_context: MessageContext) -> Any:
-                    with self._trace_helper.trace_block(
-                        "process",
-                        agent.id,
-                        parent=event.metadata,
-                        extraAttributes={"message_type": event.payload.data_type},
-                    ):
-                        await agent.on_message(message, ctx=message_context)
-
-                future = send_message(agent, message_context)
-            responses.append(future)
-        # Wait for all responses.
+        pinned: List[AgentId] = []
         try:
+            for agent_id, slot in zip(recipients, slots, strict=True):
+                message_context = MessageContext(
+                    sender=sender,
+                    topic_id=topic_id,
+                    is_rpc=False,
+                    cancellation_token=CancellationToken(),
+                )
+                agent = await self._get_agent(agent_id)
+                self._instantiated_agents.pin(agent_id)
+                pinned.append(agent_id)
+                with MessageHandlerContext.populate_context(agent.id):
+
+                    async def send_message(agent: Agent, message_context: MessageContext, slot: MailboxSlot) -> Any:
+                        try:
+                            await slot.wait()
+                            with self._trace_helper.trace_block(
+                                "process",
+                                agent.id,
+                                parent=telemetry_metadata,
+                                extraAttributes={"message_type": message_type},
+                            ):
+                                await self._call_handler(agent, message, message_context, message_type)
+                        finally:
+                            slot.release()
+
+                    future = send_message(agent, message_context, slot)
+                responses.append(future)
+            self._metrics.record_publish_fan_out(len(responses))
+            # Wait for all responses.
             await asyncio.gather(*responses)
         except BaseException as e:
             logger.error("Error handling event", exc_info=e)
+        finally:
+            for agent_id in pinned:
+                self._instantiated_agents.unpin(agent_id)
+            # Free the slots of the handlers that did not run.
+            for slot in slots:
+                slot.release()
 
     @deprecated(
         "Use your agent's `register` method directly instead of this method. See documentation for latest usage."
@@ -582,6 +1302,7 @@ async def register(
 
         # Wait for the registration response.
         await future
+        self._local_agent_types.add(type)
 
         if subscriptions is not None:
             if callable(subscriptions):
@@ -605,11 +1326,13 @@ async def register_factory(
         type: AgentType,
         agent_factory: Callable[[], T | Awaitable[T]],
         expected_class: type[T],
+        max_concurrency: int | None = None,
     ) -> AgentType:
         if type.type in self._agent_factories:
             raise ValueError(f"Agent with type {type} already exists.")
         if self._host_connection is None:
             raise RuntimeError("Host connection is not set.")
+        self._mailboxes.set_max_concurrency(type.type, max_concurrency)
 
         async def factory_wrapper() -> T:
             maybe_agent_instance = agent_factory()
@@ -638,10 +1361,13 @@ async def factory_wrapper() -> T:
 
         # Wait for the registration response.
         await future
+        self._local_agent_types.add(type.type)
 
         return type
 
     async def _process_register_agent_type_response(self, response: agent_worker_pb2.RegisterAgentTypeResponse) -> None:
+        assert self._host_connection is not None
+        self._host_connection.acknowledge(response.request_id)
         future = self._pending_requests.pop(response.request_id)
         if response.HasField("error"):
             future.set_exception(RuntimeError(response.error))
@@ -673,16 +1399,21 @@ async def _invoke_agent_factory(
         return agent
 
     async def _get_agent(self, agent_id: AgentId) -> Agent:
-        if agent_id in self._instantiated_agents:
-            return self._instantiated_agents[agent_id]
+        agent = self._instantiated_agents.get(agent_id)
+        if agent is not None:
+            return agent
 
         if agent_id.type not in self._agent_factories:
             raise ValueError(f"Agent with name {agent_id.type} not found.")
 
         agent_factory = self._agent_factories[agent_id.type]
-        agent = await self._invoke_agent_factory(agent_factory, agent_id)
-        self._instantiated_agents[agent_id] = agent
-        return agent
+
+        async def create_agent() -> Agent:
+            agent = await self._invoke_agent_factory(agent_factory, agent_id)
+            self._metrics.record_agent_activation(agent_id.type)
+            return agent
+
+        return await self._instantiated_agents.activate(agent_id, create_agent)
 
     # TODO: uncomment out the following type ignore when this is fixed in mypy: https://github.com/python/mypy/issues/3737
     async def try_get_underlying_agent_instance(self, id: AgentId, type: Type[T] = Agent) -> T:  # type: ignore[assignment]
@@ -725,8 +1456,50 @@ async def add_subscription(self, subscription: Subscription) -> None:
 
         # Wait for the subscription response.
         await future
+        self._host_subscriptions.append(subscription)
+
+    async def _reregistration_messages(self) -> List[agent_worker_pb2.Message]:
+        """Return the requests that register the confirmed agent types and subscriptions of this worker again,
+        since the host forgets them when the worker disconnects."""
+        messages: List[agent_worker_pb2.Message] = []
+        for type in self._local_agent_types:
+            request_id = await self._expect_reregistration_response(f"agent type {type}")
+            messages.append(
+                agent_worker_pb2.Message(
+                    registerAgentTypeRequest=agent_worker_pb2.RegisterAgentTypeRequest(request_id=request_id, type=type)
+                )
+            )
+        for subscription in self._host_subscriptions:
+            request_id = await self._expect_reregistration_response(f"subscription {subscription.id}")
+            messages.append(
+                agent_worker_pb2.Message(
+                    addSubscriptionRequest=agent_worker_pb2.AddSubscriptionRequest(
+                        request_id=request_id,
+                        subscription=agent_worker_pb2.Subscription(
+                            typeSubscription=agent_worker_pb2.TypeSubscription(
+                                topic_type=subscription.topic_type, agent_type=subscription.agent_type
+                            )
+                        ),
+                    )
+                )
+            )
+        return messages
+
+    async def _expect_reregistration_response(self, description: str) -> str:
+        future: Future[Any] = asyncio.get_running_loop().create_future()
+        request_id = await self._get_new_request_id()
+        self._pending_requests[request_id] = future
+
+        def log_failure(future: Future[Any]) -> None:
+            if not future.cancelled() and future.exception() is not None:
+                logger.error(f"Failed to register {description} again after reconnecting", exc_info=future.exception())
+
+        future.add_done_callback(log_failure)
+        return request_id
 
     async def _process_add_subscription_response(self, response: agent_worker_pb2.AddSubscriptionResponse) -> None:
+        assert self._host_connection is not None
+        self._host_connection.acknowledge(response.request_id)
         future = self._pending_requests.pop(response.request_id)
         if response.HasField("error"):
             future.set_exception(RuntimeError(response.error))
@@ -7,6 +7,9 @@
 
 from autogen_core.base._type_helpers import ChannelArgumentType
 
+from ._inproc_transport import InProcessServer, is_inproc_address
+from ._message_batching import MessageBatchingConfig
+from ._versioned_state_store import VersionedStateStore
 from ._worker_runtime_host_servicer import WorkerAgentRuntimeHostServicer
 from .protos import agent_worker_pb2_grpc
 
@@ -14,11 +17,45 @@
 
 
 class WorkerAgentRuntimeHost:
-    def __init__(self, address: str, extra_grpc_config: Optional[ChannelArgumentType] = None) -> None:
-        self._server = grpc.aio.server(options=extra_grpc_config)
-        self._servicer = WorkerAgentRuntimeHostServicer()
-        agent_worker_pb2_grpc.add_AgentRpcServicer_to_server(self._servicer, self._server)
-        self._server.add_insecure_port(address)
+    """Hosts the message delivery service that connects :class:`WorkerAgentRuntime` workers.
+
+    Args:
+        address (str): The address to listen on: ``host:port`` for TCP, ``unix:///path/to/socket`` for a Unix
+            domain socket, or ``inproc://name`` to serve only workers in the same event loop, without gRPC or
+            serialization.
+        extra_grpc_config (ChannelArgumentType, optional): Extra options for the gRPC server.
+        max_queue_size (int, optional): Maximum number of messages buffered for each connected worker.
+            Defaults to 0, meaning no limit.
+        allow_shared_agent_types (bool, optional): Allow several workers to register the same agent type,
+            spreading its agents over the workers by consistent hashing of the agent key. Defaults to False.
+        message_batching (MessageBatchingConfig, optional): Send messages in batches to workers that support it.
+            Defaults to no batching.
+        state_store (VersionedStateStore, optional): Where the agent states that workers save are kept, see
+            :class:`HostAgentStateStore`. Defaults to an in-memory :class:`SqliteVersionedStateStore`.
+    """
+
+    def __init__(
+        self,
+        address: str,
+        extra_grpc_config: Optional[ChannelArgumentType] = None,
+        max_queue_size: int = 0,
+        allow_shared_agent_types: bool = False,
+        message_batching: MessageBatchingConfig | None = None,
+        state_store: VersionedStateStore | None = None,
+    ) -> None:
+        self._servicer = WorkerAgentRuntimeHostServicer(
+            max_queue_size=max_queue_size,
+            allow_shared_agent_types=allow_shared_agent_types,
+            message_batching=message_batching,
+            state_store=state_store,
+        )
+        self._server: grpc.aio.Server | InProcessServer  # type: ignore
+        if is_inproc_address(address):
+            self._server = InProcessServer(address, self._servicer)
+        else:
+            self._server = grpc.aio.server(options=extra_grpc_config)
+            agent_worker_pb2_grpc.add_AgentRpcServicer_to_server(self._servicer, self._server)
+            self._server.add_insecure_port(address)
         self._address = address
         self._serve_task: asyncio.Task[None] | None = None
 
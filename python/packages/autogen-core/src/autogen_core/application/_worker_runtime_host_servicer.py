@@ -2,13 +2,24 @@
 import logging
 from _collections_abc import AsyncIterator, Iterator
 from asyncio import Future, Task
-from typing import Any, Dict, Set
+from typing import Any, Dict, List, Mapping, Sequence, Set, Tuple
 
 import grpc
 
-from ..base import TopicId
+from ..base import AgentId, TopicId
+from ..base._timer_wheel import TimerWheel
 from ..components import TypeSubscription
+from ._channel_metadata import (
+    BATCHING_METADATA_KEY,
+    CAPABILITY_ENABLED,
+    LOCAL_DELIVERY_METADATA_KEY,
+    SHARED_AGENT_TYPES_METADATA_KEY,
+    TIMEOUT_METADATA_KEY,
+)
+from ._hash_ring import ConsistentHashRing
 from ._helpers import SubscriptionManager
+from ._message_batching import MessageBatchingConfig, batch_messages, unbatch
+from ._versioned_state_store import SqliteVersionedStateStore, StateWrite, VersionedStateStore
 from .protos import agent_worker_pb2, agent_worker_pb2_grpc
 
 logger = logging.getLogger("autogen_core")
@@ -16,18 +27,53 @@
 
 
 class WorkerAgentRuntimeHostServicer(agent_worker_pb2_grpc.AgentRpcServicer):
-    """A gRPC servicer that hosts message delivery service for agents."""
+    """A gRPC servicer that hosts message delivery service for agents.
 
-    def __init__(self) -> None:
+    Args:
+        max_queue_size (int, optional): Maximum number of messages buffered for each connected client.
+            When a client's queue is full, delivery to that client waits for capacity, which in turn stops
+            the host from reading further messages from the sending client. Defaults to 0, meaning no limit.
+        allow_shared_agent_types (bool, optional): Allow several clients to register the same agent type.
+            Requests and events for a shared type are routed by consistent hashing of the agent key, so all
+            messages for a given key go to the same client as long as the set of clients does not change.
+            When a client joins or leaves, only the keys on the affected part of the hash ring move.
+            Defaults to False, in which case registering a type that another client registered is an error.
+        message_batching (MessageBatchingConfig, optional): Send messages in batches to clients that announce
+            support for batches when they connect, and announce to clients that the host reads batches.
+            Defaults to no batching.
+        state_store (VersionedStateStore, optional): Where the agent states that clients save are kept.
+            Defaults to an in-memory :class:`SqliteVersionedStateStore`.
+    """
+
+    def __init__(
+        self,
+        max_queue_size: int = 0,
+        allow_shared_agent_types: bool = False,
+        message_batching: MessageBatchingConfig | None = None,
+        state_store: VersionedStateStore | None = None,
+    ) -> None:
+        self._max_queue_size = max_queue_size
+        self._allow_shared_agent_types = allow_shared_agent_types
+        self._message_batching = message_batching
+        self._state_store = state_store if state_store is not None else SqliteVersionedStateStore()
+        self._delayed_messages = 0
         self._client_id = 0
         self._client_id_lock = asyncio.Lock()
         self._send_queues: Dict[int, asyncio.Queue[agent_worker_pb2.Message]] = {}
+        # The routing table is copy-on-write: updates, serialized by the lock, replace the whole table,
+        # so routing messages reads the current table without taking the lock.
         self._agent_type_to_client_id_lock = asyncio.Lock()
-        self._agent_type_to_client_id: Dict[str, int] = {}
-        self._pending_responses: Dict[int, Dict[str, Future[Any]]] = {}
+        self._agent_type_to_client_ids: Mapping[str, ConsistentHashRing[int]] = {}
+        # Futures for the responses to requests sent to each client, resolved with None if no response comes.
+        self._pending_responses: Dict[int, Dict[str, Future[agent_worker_pb2.RpcResponse | None]]] = {}
+        # Deadlines of pending responses, for requests sent with a timeout.
+        self._response_timers = TimerWheel()
         self._background_tasks: Set[Task[Any]] = set()
         self._subscription_manager = SubscriptionManager()
         self._client_id_to_subscription_id_mapping: Dict[int, set[str]] = {}
+        # Clients that added each subscription, and the subscription id for each (topic type, agent type).
+        self._subscription_id_to_client_ids: Dict[str, Set[int]] = {}
+        self._type_subscription_ids: Dict[Tuple[str, str], str] = {}
 
     async def OpenChannel(  # type: ignore
         self,
@@ -40,7 +86,7 @@ async def OpenChannel(  # type: ignore
             client_id = self._client_id
 
         # Register the client with the server and create a send queue for the client.
-        send_queue: asyncio.Queue[agent_worker_pb2.Message] = asyncio.Queue()
+        send_queue: asyncio.Queue[agent_worker_pb2.Message] = asyncio.Queue(maxsize=self._max_queue_size)
         self._send_queues[client_id] = send_queue
         logger.info(f"Client {client_id} connected.")
 
@@ -49,39 +95,107 @@ async def OpenChannel(  # type: ignore
             # This task will receive messages from the client.
             receiving_task = asyncio.create_task(self._receive_messages(client_id, request_iterator))
 
+            # Tell the client what the host supports. Batch messages to the client if it announced that it reads
+            # batches, and tell it that the host does.
+            capabilities = [(LOCAL_DELIVERY_METADATA_KEY, CAPABILITY_ENABLED)]
+            if self._allow_shared_agent_types:
+                capabilities.append((SHARED_AGENT_TYPES_METADATA_KEY, CAPABILITY_ENABLED))
+            frames: AsyncIterator[agent_worker_pb2.Message] | None = None
+            if self._message_batching is not None and (BATCHING_METADATA_KEY, CAPABILITY_ENABLED) in list(
+                context.invocation_metadata() or ()
+            ):
+                capabilities.append((BATCHING_METADATA_KEY, CAPABILITY_ENABLED))
+                frames = batch_messages(send_queue, self._message_batching)
+                logger.info(f"Batching messages to client {client_id}.")
+            await context.send_initial_metadata(tuple(capabilities))
+
             # Return an async generator that will yield messages from the send queue to the client.
             while True:
-                message = await send_queue.get()
+                message = await send_queue.get() if frames is None else await anext(frames)
                 # Yield the message to the client.
                 try:
                     yield message
                 except Exception as e:
                     logger.error(f"Failed to send message to client {client_id}: {e}", exc_info=True)
                     break
-                logger.info(f"Sent message to client {client_id}: {message}")
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug("Sent message to client %s: %s", client_id, message)
             # Wait for the receiving task to finish.
             await receiving_task
 
         finally:
             # Clean up the client connection.
             del self._send_queues[client_id]
-            # Cancel pending requests sent to this client.
-            for future in self._pending_responses.pop(client_id, {}).values():
-                future.cancel()
+            # Fail pending requests sent to this client, so their senders don't wait for responses that won't come.
+            for request_id, future in self._pending_responses.pop(client_id, {}).items():
+                self._response_timers.remove((client_id, request_id))
+                future.set_result(agent_worker_pb2.RpcResponse(request_id=request_id, error="target disconnected"))
             # Remove the client id from the agent type to client id mapping.
             await self._on_client_disconnect(client_id)
 
     async def _on_client_disconnect(self, client_id: int) -> None:
         async with self._agent_type_to_client_id_lock:
-            agent_types = [agent_type for agent_type, id_ in self._agent_type_to_client_id.items() if id_ == client_id]
-            for agent_type in agent_types:
-                logger.info(f"Removing agent type {agent_type} from agent type to client id mapping")
-                del self._agent_type_to_client_id[agent_type]
-            for sub_id in self._client_id_to_subscription_id_mapping.get(client_id, []):
-                logger.info(f"Client id {client_id} disconnected. Removing corresponding subscription with id {id}")
+            routing_table = dict(self._agent_type_to_client_ids)
+            for agent_type, client_ids in self._agent_type_to_client_ids.items():
+                if client_id not in client_ids:
+                    continue
+                client_ids = client_ids.copy()
+                client_ids.remove(client_id)
+                if len(client_ids) == 0:
+                    logger.info(f"Removing agent type {agent_type} from agent type to client id mapping")
+                    del routing_table[agent_type]
+                else:
+                    logger.info(f"Rebalancing agent type {agent_type} over clients {list(client_ids)}")
+                    routing_table[agent_type] = client_ids
+            self._agent_type_to_client_ids = routing_table
+            for sub_id in self._client_id_to_subscription_id_mapping.pop(client_id, set()):
+                subscribers = self._subscription_id_to_client_ids[sub_id]
+                subscribers.discard(client_id)
+                if subscribers:
+                    # Another client that shares the agent type still uses the subscription.
+                    continue
+                logger.info(f"Client id {client_id} disconnected. Removing corresponding subscription with id {sub_id}")
+                del self._subscription_id_to_client_ids[sub_id]
+                self._type_subscription_ids = {
+                    key: id_ for key, id_ in self._type_subscription_ids.items() if id_ != sub_id
+                }
                 await self._subscription_manager.remove_subscription(sub_id)
         logger.info(f"Client {client_id} disconnected successfully")
 
+    @property
+    def delayed_messages(self) -> int:
+        """Number of messages that had to wait for space in a client's send queue."""
+        return self._delayed_messages
+
+    async def _put(
+        self, send_queue: asyncio.Queue[agent_worker_pb2.Message], message: agent_worker_pb2.Message
+    ) -> None:
+        if send_queue.full():
+            self._delayed_messages += 1
+        await send_queue.put(message)
+
+    async def _put_all(
+        self, deliveries: Sequence[Tuple[asyncio.Queue[agent_worker_pb2.Message], agent_worker_pb2.Message]]
+    ) -> None:
+        # Messages for clients with queue space are delivered right away; the rest wait concurrently
+        # so one slow client does not hold up delivery to the others.
+        blocked: List[Tuple[asyncio.Queue[agent_worker_pb2.Message], agent_worker_pb2.Message]] = []
+        for send_queue, message in deliveries:
+            try:
+                send_queue.put_nowait(message)
+            except asyncio.QueueFull:
+                blocked.append((send_queue, message))
+        if len(blocked) == 1:
+            await self._put(*blocked[0])
+        elif blocked:
+            await asyncio.gather(*(self._put(send_queue, message) for send_queue, message in blocked))
+
+    def _get_client_id(self, agent_id: AgentId | agent_worker_pb2.AgentId) -> int | None:
+        client_ids = self._agent_type_to_client_ids.get(agent_id.type)
+        if client_ids is None:
+            return None
+        return client_ids.get(agent_id.key)
+
     def _raise_on_exception(self, task: Task[Any]) -> None:
         exception = task.exception()
         if exception is not None:
@@ -91,53 +205,55 @@ async def _receive_messages(
         self, client_id: int, request_iterator: AsyncIterator[agent_worker_pb2.Message]
     ) -> None:
         # Receive messages from the client and process them.
-        async for message in request_iterator:
-            logger.info(f"Received message from client {client_id}: {message}")
-            oneofcase = message.WhichOneof("message")
-            match oneofcase:
-                case "request":
-                    request: agent_worker_pb2.RpcRequest = message.request
-                    task = asyncio.create_task(self._process_request(request, client_id))
-                    self._background_tasks.add(task)
-                    task.add_done_callback(self._raise_on_exception)
-                    task.add_done_callback(self._background_tasks.discard)
-                case "response":
-                    response: agent_worker_pb2.RpcResponse = message.response
-                    task = asyncio.create_task(self._process_response(response, client_id))
-                    self._background_tasks.add(task)
-                    task.add_done_callback(self._raise_on_exception)
-                    task.add_done_callback(self._background_tasks.discard)
-                case "event":
-                    event: agent_worker_pb2.Event = message.event
-                    task = asyncio.create_task(self._process_event(event))
-                    self._background_tasks.add(task)
-                    task.add_done_callback(self._raise_on_exception)
-                    task.add_done_callback(self._background_tasks.discard)
-                case "registerAgentTypeRequest":
-                    register_agent_type: agent_worker_pb2.RegisterAgentTypeRequest = message.registerAgentTypeRequest
-                    task = asyncio.create_task(
-                        self._process_register_agent_type_request(register_agent_type, client_id)
-                    )
-                    self._background_tasks.add(task)
-                    task.add_done_callback(self._raise_on_exception)
-                    task.add_done_callback(self._background_tasks.discard)
-                case "addSubscriptionRequest":
-                    add_subscription: agent_worker_pb2.AddSubscriptionRequest = message.addSubscriptionRequest
-                    task = asyncio.create_task(self._process_add_subscription_request(add_subscription, client_id))
-                    self._background_tasks.add(task)
-                    task.add_done_callback(self._raise_on_exception)
-                    task.add_done_callback(self._background_tasks.discard)
-                case "registerAgentTypeResponse" | "addSubscriptionResponse":
-                    logger.warning(f"Received unexpected message type: {oneofcase}")
-                case None:
-                    logger.warning("Received empty message")
-                case other:
-                    logger.error(f"Received unexpected message: {other}")
+        async for frame in request_iterator:
+            for message in unbatch(frame):
+                self._dispatch_message(client_id, message)
+
+    def _dispatch_message(self, client_id: int, message: agent_worker_pb2.Message) -> None:
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Received message from client %s: %s", client_id, message)
+        oneofcase = message.WhichOneof("message")
+        match oneofcase:
+            case "request":
+                request: agent_worker_pb2.RpcRequest = message.request
+                task = asyncio.create_task(self._process_request(request, client_id))
+                self._background_tasks.add(task)
+                task.add_done_callback(self._raise_on_exception)
+                task.add_done_callback(self._background_tasks.discard)
+            case "response":
+                response: agent_worker_pb2.RpcResponse = message.response
+                task = asyncio.create_task(self._process_response(response, client_id))
+                self._background_tasks.add(task)
+                task.add_done_callback(self._raise_on_exception)
+                task.add_done_callback(self._background_tasks.discard)
+            case "event":
+                event: agent_worker_pb2.Event = message.event
+                task = asyncio.create_task(self._process_event(event, client_id))
+                self._background_tasks.add(task)
+                task.add_done_callback(self._raise_on_exception)
+                task.add_done_callback(self._background_tasks.discard)
+            case "registerAgentTypeRequest":
+                register_agent_type: agent_worker_pb2.RegisterAgentTypeRequest = message.registerAgentTypeRequest
+                task = asyncio.create_task(self._process_register_agent_type_request(register_agent_type, client_id))
+                self._background_tasks.add(task)
+                task.add_done_callback(self._raise_on_exception)
+                task.add_done_callback(self._background_tasks.discard)
+            case "addSubscriptionRequest":
+                add_subscription: agent_worker_pb2.AddSubscriptionRequest = message.addSubscriptionRequest
+                task = asyncio.create_task(self._process_add_subscription_request(add_subscription, client_id))
+                self._background_tasks.add(task)
+                task.add_done_callback(self._raise_on_exception)
+                task.add_done_callback(self._background_tasks.discard)
+            case "registerAgentTypeResponse" | "addSubscriptionResponse":
+                logger.warning(f"Received unexpected message type: {oneofcase}")
+            case None:
+                logger.warning("Received empty message")
+            case other:
+                logger.error(f"Received unexpected message: {other}")
 
     async def _process_request(self, request: agent_worker_pb2.RpcRequest, client_id: int) -> None:
         # Deliver the message to a client given the target agent type.
-        async with self._agent_type_to_client_id_lock:
-            target_client_id = self._agent_type_to_client_id.get(request.target.type)
+        target_client_id = self._get_client_id(request.target)
         if target_client_id is None:
             logger.error(f"Agent {request.target.type} not found, failed to deliver message.")
             return
@@ -145,11 +261,19 @@ async def _process_request(self, request: agent_worker_pb2.RpcRequest, client_id
         if target_send_queue is None:
             logger.error(f"Client {target_client_id} not found, failed to deliver message.")
             return
-        await target_send_queue.put(agent_worker_pb2.Message(request=request))
+        await self._put(target_send_queue, agent_worker_pb2.Message(request=request))
 
         # Create a future to wait for the response from the target.
-        future = asyncio.get_event_loop().create_future()
+        future: Future[agent_worker_pb2.RpcResponse | None] = asyncio.get_event_loop().create_future()
         self._pending_responses.setdefault(target_client_id, {})[request.request_id] = future
+        # Stop waiting once the sender does.
+        timeout = request.metadata.get(TIMEOUT_METADATA_KEY)
+        if timeout is not None:
+            self._response_timers.add(
+                (target_client_id, request.request_id),
+                asyncio.get_running_loop().time() + float(timeout),
+                lambda: self._expire_pending_response(target_client_id, request.request_id),
+            )
 
         # Create a task to wait for the response and send it back to the client.
         send_response_task = asyncio.create_task(self._wait_and_send_response(future, client_id))
@@ -157,59 +281,101 @@ async def _process_request(self, request: agent_worker_pb2.RpcRequest, client_id
         send_response_task.add_done_callback(self._raise_on_exception)
         send_response_task.add_done_callback(self._background_tasks.discard)
 
-    async def _wait_and_send_response(self, future: Future[agent_worker_pb2.RpcResponse], client_id: int) -> None:
+    def _expire_pending_response(self, client_id: int, request_id: str) -> None:
+        future = self._pending_responses.get(client_id, {}).pop(request_id, None)
+        if future is not None:
+            logger.info(f"Request {request_id} to client {client_id} timed out.")
+            future.set_result(None)
+
+    async def _wait_and_send_response(
+        self, future: Future[agent_worker_pb2.RpcResponse | None], client_id: int
+    ) -> None:
         response = await future
+        if response is None:
+            # The request timed out, and the sender has stopped waiting for it.
+            return
         message = agent_worker_pb2.Message(response=response)
         send_queue = self._send_queues.get(client_id)
         if send_queue is None:
             logger.error(f"Client {client_id} not found, failed to send response message.")
             return
-        await send_queue.put(message)
+        await self._put(send_queue, message)
 
     async def _process_response(self, response: agent_worker_pb2.RpcResponse, client_id: int) -> None:
         # Setting the result of the future will send the response back to the original sender.
-        future = self._pending_responses[client_id].pop(response.request_id)
+        future = self._pending_responses.get(client_id, {}).pop(response.request_id, None)
+        if future is None:
+            logger.info(f"Dropping the response to request {response.request_id}, which timed out.")
+            return
+        self._response_timers.remove((client_id, response.request_id))
         future.set_result(response)
 
-    async def _process_event(self, event: agent_worker_pb2.Event) -> None:
+    async def _process_event(self, event: agent_worker_pb2.Event, client_id: int) -> None:
         topic_id = TopicId(type=event.topic_type, source=event.topic_source)
         recipients = await self._subscription_manager.get_subscribed_recipients(topic_id)
         # Get the client ids of the recipients.
-        async with self._agent_type_to_client_id_lock:
-            client_ids: Set[int] = set()
-            for recipient in recipients:
-                client_id = self._agent_type_to_client_id.get(recipient.type)
-                if client_id is not None:
-                    client_ids.add(client_id)
-                else:
-                    logger.error(f"Agent {recipient.type} and its client not found for topic {topic_id}.")
+        client_recipients: Dict[int, List[AgentId]] = {}
+        for recipient in recipients:
+            recipient_client_id = self._get_client_id(recipient)
+            if recipient_client_id is None:
+                logger.error(f"Agent {recipient.type} and its client not found for topic {topic_id}.")
+            elif recipient_client_id != client_id or not event.delivered_locally:
+                # The publishing client has already delivered the event to its own agents if it says so.
+                client_recipients.setdefault(recipient_client_id, []).append(recipient)
         # Deliver the event to clients.
-        for client_id in client_ids:
-            await self._send_queues[client_id].put(agent_worker_pb2.Message(event=event))
+        deliveries: List[Tuple[asyncio.Queue[agent_worker_pb2.Message], agent_worker_pb2.Message]] = []
+        # Unless agent types are shared, every client gets the same message.
+        shared_message = None if self._allow_shared_agent_types else agent_worker_pb2.Message(event=event)
+        for recipient_client_id, client_recipient_ids in client_recipients.items():
+            send_queue = self._send_queues.get(recipient_client_id)
+            if send_queue is None:
+                logger.error(f"Client {recipient_client_id} not found, failed to deliver event.")
+                continue
+            if shared_message is not None:
+                deliveries.append((send_queue, shared_message))
+                continue
+            # Clients sharing an agent type must only deliver to the keys they own.
+            client_event = agent_worker_pb2.Event()
+            client_event.CopyFrom(event)
+            client_event.recipients.extend(
+                agent_worker_pb2.AgentId(type=recipient.type, key=recipient.key) for recipient in client_recipient_ids
+            )
+            deliveries.append((send_queue, agent_worker_pb2.Message(event=client_event)))
+        await self._put_all(deliveries)
 
     async def _process_register_agent_type_request(
         self, register_agent_type_req: agent_worker_pb2.RegisterAgentTypeRequest, client_id: int
     ) -> None:
         # Register the agent type with the host runtime.
         async with self._agent_type_to_client_id_lock:
-            if register_agent_type_req.type in self._agent_type_to_client_id:
-                existing_client_id = self._agent_type_to_client_id[register_agent_type_req.type]
+            client_ids = self._agent_type_to_client_ids.get(register_agent_type_req.type)
+            if client_ids is not None and (not self._allow_shared_agent_types or client_id in client_ids):
                 logger.error(
-                    f"Agent type {register_agent_type_req.type} already registered with client {existing_client_id}."
+                    f"Agent type {register_agent_type_req.type} already registered with clients {list(client_ids)}."
                 )
                 success = False
                 error = f"Agent type {register_agent_type_req.type} already registered."
             else:
-                self._agent_type_to_client_id[register_agent_type_req.type] = client_id
+                client_ids = client_ids.copy() if client_ids is not None else ConsistentHashRing()
+                client_ids.add(client_id)
+                self._agent_type_to_client_ids = {
+                    **self._agent_type_to_client_ids,
+                    register_agent_type_req.type: client_ids,
+                }
+                if len(client_ids) > 1:
+                    logger.info(
+                        f"Rebalancing agent type {register_agent_type_req.type} over clients {list(client_ids)}"
+                    )
                 success = True
                 error = None
         # Send a response back to the client.
-        await self._send_queues[client_id].put(
+        await self._put(
+            self._send_queues[client_id],
             agent_worker_pb2.Message(
                 registerAgentTypeResponse=agent_worker_pb2.RegisterAgentTypeResponse(
                     request_id=register_agent_type_req.request_id, success=success, error=error
                 )
-            )
+            ),
         )
 
     async def _process_add_subscription_request(
@@ -224,22 +390,34 @@ async def _process_add_subscription_request(
                 type_subscription = TypeSubscription(
                     topic_type=type_subscription_msg.topic_type, agent_type=type_subscription_msg.agent_type
                 )
-                try:
-                    await self._subscription_manager.add_subscription(type_subscription)
-                    subscription_ids = self._client_id_to_subscription_id_mapping.setdefault(client_id, set())
-                    subscription_ids.add(type_subscription.id)
+                key = (type_subscription.topic_type, type_subscription.agent_type)
+                subscription_ids = self._client_id_to_subscription_id_mapping.setdefault(client_id, set())
+                existing_id = self._type_subscription_ids.get(key)
+                if self._allow_shared_agent_types and existing_id is not None and existing_id not in subscription_ids:
+                    # The same subscription added by another client sharing the agent type.
+                    subscription_ids.add(existing_id)
+                    self._subscription_id_to_client_ids[existing_id].add(client_id)
                     success = True
                     error = None
-                except ValueError as e:
-                    success = False
-                    error = str(e)
+                else:
+                    try:
+                        await self._subscription_manager.add_subscription(type_subscription)
+                        subscription_ids.add(type_subscription.id)
+                        self._subscription_id_to_client_ids[type_subscription.id] = {client_id}
+                        self._type_subscription_ids[key] = type_subscription.id
+                        success = True
+                        error = None
+                    except ValueError as e:
+                        success = False
+                        error = str(e)
                 # Send a response back to the client.
-                await self._send_queues[client_id].put(
+                await self._put(
+                    self._send_queues[client_id],
                     agent_worker_pb2.Message(
                         addSubscriptionResponse=agent_worker_pb2.AddSubscriptionResponse(
                             request_id=add_subscription_req.request_id, success=success, error=error
                         )
-                    )
+                    ),
                 )
             case None:
                 logger.warning("Received empty subscription message")
@@ -249,11 +427,83 @@ async def GetState(  # type: ignore
         request: agent_worker_pb2.AgentId,
         context: grpc.aio.ServicerContext[agent_worker_pb2.AgentId, agent_worker_pb2.GetStateResponse],
     ) -> agent_worker_pb2.GetStateResponse:  # type: ignore
-        raise NotImplementedError("Method not implemented!")
+        return (await self._get_states([request]))[0]
 
     async def SaveState(  # type: ignore
         self,
         request: agent_worker_pb2.AgentState,
         context: grpc.aio.ServicerContext[agent_worker_pb2.AgentId, agent_worker_pb2.SaveStateResponse],
     ) -> agent_worker_pb2.SaveStateResponse:  # type: ignore
-        raise NotImplementedError("Method not implemented!")
+        return (await self._save_states([request]))[0]
+
+    async def GetStates(  # type: ignore
+        self,
+        request: agent_worker_pb2.GetStatesRequest,
+        context: grpc.aio.ServicerContext[agent_worker_pb2.GetStatesRequest, agent_worker_pb2.GetStatesResponse],
+    ) -> agent_worker_pb2.GetStatesResponse:  # type: ignore
+        return agent_worker_pb2.GetStatesResponse(responses=await self._get_states(request.agent_ids))
+
+    async def SaveStates(  # type: ignore
+        self,
+        request: agent_worker_pb2.SaveStatesRequest,
+        context: grpc.aio.ServicerContext[agent_worker_pb2.SaveStatesRequest, agent_worker_pb2.SaveStatesResponse],
+    ) -> agent_worker_pb2.SaveStatesResponse:  # type: ignore
+        return agent_worker_pb2.SaveStatesResponse(responses=await self._save_states(request.agent_states))
+
+    async def _get_states(
+        self, agent_ids: Sequence[agent_worker_pb2.AgentId]
+    ) -> List[agent_worker_pb2.GetStateResponse]:
+        try:
+            states = await self._state_store.get([AgentId(agent_id.type, agent_id.key) for agent_id in agent_ids])
+        except Exception as e:
+            logger.error("Failed to load agent states", exc_info=e)
+            return [agent_worker_pb2.GetStateResponse(success=False, error=str(e)) for _ in agent_ids]
+        responses: List[agent_worker_pb2.GetStateResponse] = []
+        for agent_id, state in zip(agent_ids, states, strict=True):
+            if state is None:
+                responses.append(agent_worker_pb2.GetStateResponse(success=True))
+            else:
+                agent_state = agent_worker_pb2.AgentState(agent_id=agent_id, eTag=state.etag, binary_data=state.data)
+                responses.append(agent_worker_pb2.GetStateResponse(agent_state=agent_state, success=True))
+        return responses
+
+    async def _save_states(
+        self, agent_states: Sequence[agent_worker_pb2.AgentState]
+    ) -> List[agent_worker_pb2.SaveStateResponse]:
+        # Write all valid states in one call to the store, and answer for each state in the order received.
+        writes: List[StateWrite] = []
+        responses: List[agent_worker_pb2.SaveStateResponse | None] = []
+        for agent_state in agent_states:
+            agent_id = AgentId(agent_state.agent_id.type, agent_state.agent_id.key)
+            match agent_state.WhichOneof("data"):
+                case "binary_data":
+                    writes.append(StateWrite(agent_id, agent_state.binary_data, agent_state.eTag))
+                    responses.append(None)
+                case None:
+                    writes.append(StateWrite(agent_id, None, agent_state.eTag))
+                    responses.append(None)
+                case other:
+                    responses.append(
+                        agent_worker_pb2.SaveStateResponse(
+                            success=False, error=f"Unsupported state data {other}, only binary_data is supported."
+                        )
+                    )
+        try:
+            etags = await self._state_store.write(writes) if writes else []
+        except Exception as e:
+            logger.error("Failed to save agent states", exc_info=e)
+            return [
+                response or agent_worker_pb2.SaveStateResponse(success=False, error=str(e)) for response in responses
+            ]
+        written = iter(etags)
+        for i, response in enumerate(responses):
+            if response is not None:
+                continue
+            etag = next(written)
+            if etag is None:
+                responses[i] = agent_worker_pb2.SaveStateResponse(
+                    success=False, conflict=True, error="The eTag does not match the saved state."
+                )
+            else:
+                responses[i] = agent_worker_pb2.SaveStateResponse(success=True, eTag=etag)
+        return [response for response in responses if response is not None]
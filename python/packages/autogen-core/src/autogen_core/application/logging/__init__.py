@@ -1,4 +1,5 @@
 from ._llm_usage import LLMUsageTracker
+from ._sampling import get_event_sample_rate, set_event_sample_rate
 
 ROOT_LOGGER_NAME = "autogen_core"
 """str: Logger name used for structured event logging"""
@@ -15,4 +16,6 @@
     "EVENT_LOGGER_NAME",
     "TRACE_LOGGER_NAME",
     "LLMUsageTracker",
+    "set_event_sample_rate",
+    "get_event_sample_rate",
 ]
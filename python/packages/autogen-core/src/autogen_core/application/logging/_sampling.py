@@ -0,0 +1,35 @@
+import logging
+import random
+
+_event_sample_rate = 1.0
+
+
+def set_event_sample_rate(rate: float) -> None:
+    """Set the fraction of per-message events that are logged by the runtimes.
+
+    Per-message events are the :class:`~autogen_core.application.logging.events.MessageEvent` records
+    emitted for every message sent, published, delivered and responded to. Sampling happens before the
+    event is built, so skipped events cost nothing beyond a random number draw.
+
+    Args:
+        rate (float): A value between 0.0 (log nothing) and 1.0 (log everything, the default).
+    """
+    global _event_sample_rate
+    if not 0.0 <= rate <= 1.0:
+        raise ValueError("Sample rate must be between 0.0 and 1.0.")
+    _event_sample_rate = rate
+
+
+def get_event_sample_rate() -> float:
+    """Get the fraction of per-message events that are logged by the runtimes."""
+    return _event_sample_rate
+
+
+def should_log_event(logger: logging.Logger, level: int = logging.INFO) -> bool:
+    """Return True if a per-message event should be built and logged to ``logger`` at ``level``.
+
+    This checks the logger level first, so the common case of a disabled logger is a cached lookup.
+    """
+    if not logger.isEnabledFor(level):
+        return False
+    return _event_sample_rate >= 1.0 or random.random() < _event_sample_rate
@@ -81,4 +81,6 @@ def completion_tokens(self) -> int:
 
     # This must output the event in a json serializable format
     def __str__(self) -> str:
-        return json.dumps(self.kwargs)
+        # Payloads and enums are not JSON serializable, so fall back to their string form.
+        # This only runs when a handler formats the record.
+        return json.dumps(self.kwargs, default=str)
@@ -16,7 +16,7 @@
 from google.protobuf import any_pb2 as google_dot_protobuf_dot_any__pb2
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x12\x61gent_worker.proto\x12\x06\x61gents\x1a\x10\x63loudevent.proto\x1a\x19google/protobuf/any.proto\"\'\n\x07TopicId\x12\x0c\n\x04type\x18\x01 \x01(\t\x12\x0e\n\x06source\x18\x02 \x01(\t\"$\n\x07\x41gentId\x12\x0c\n\x04type\x18\x01 \x01(\t\x12\x0b\n\x03key\x18\x02 \x01(\t\"E\n\x07Payload\x12\x11\n\tdata_type\x18\x01 \x01(\t\x12\x19\n\x11\x64\x61ta_content_type\x18\x02 \x01(\t\x12\x0c\n\x04\x64\x61ta\x18\x03 \x01(\x0c\"\x89\x02\n\nRpcRequest\x12\x12\n\nrequest_id\x18\x01 \x01(\t\x12$\n\x06source\x18\x02 \x01(\x0b\x32\x0f.agents.AgentIdH\x00\x88\x01\x01\x12\x1f\n\x06target\x18\x03 \x01(\x0b\x32\x0f.agents.AgentId\x12\x0e\n\x06method\x18\x04 \x01(\t\x12 \n\x07payload\x18\x05 \x01(\x0b\x32\x0f.agents.Payload\x12\x32\n\x08metadata\x18\x06 \x03(\x0b\x32 .agents.RpcRequest.MetadataEntry\x1a/\n\rMetadataEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01\x42\t\n\x07_source\"\xb8\x01\n\x0bRpcResponse\x12\x12\n\nrequest_id\x18\x01 \x01(\t\x12 \n\x07payload\x18\x02 \x01(\x0b\x32\x0f.agents.Payload\x12\r\n\x05\x65rror\x18\x03 \x01(\t\x12\x33\n\x08metadata\x18\x04 \x03(\x0b\x32!.agents.RpcResponse.MetadataEntry\x1a/\n\rMetadataEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01\"\xe4\x01\n\x05\x45vent\x12\x12\n\ntopic_type\x18\x01 \x01(\t\x12\x14\n\x0ctopic_source\x18\x02 \x01(\t\x12$\n\x06source\x18\x03 \x01(\x0b\x32\x0f.agents.AgentIdH\x00\x88\x01\x01\x12 \n\x07payload\x18\x04 \x01(\x0b\x32\x0f.agents.Payload\x12-\n\x08metadata\x18\x05 \x03(\x0b\x32\x1b.agents.Event.MetadataEntry\x1a/\n\rMetadataEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01\x42\t\n\x07_source\"<\n\x18RegisterAgentTypeRequest\x12\x12\n\nrequest_id\x18\x01 \x01(\t\x12\x0c\n\x04type\x18\x02 \x01(\t\"^\n\x19RegisterAgentTypeResponse\x12\x12\n\nrequest_id\x18\x01 \x01(\t\x12\x0f\n\x07success\x18\x02 \x01(\x08\x12\x12\n\x05\x65rror\x18\x03 \x01(\tH\x00\x88\x01\x01\x42\x08\n\x06_error\":\n\x10TypeSubscription\x12\x12\n\ntopic_type\x18\x01 \x01(\t\x12\x12\n\nagent_type\x18\x02 \x01(\t\"T\n\x0cSubscription\x12\x34\n\x10typeSubscription\x18\x01 \x01(\x0b\x32\x18.agents.TypeSubscriptionH\x00\x42\x0e\n\x0csubscription\"X\n\x16\x41\x64\x64SubscriptionRequest\x12\x12\n\nrequest_id\x18\x01 \x01(\t\x12*\n\x0csubscription\x18\x02 \x01(\x0b\x32\x14.agents.Subscription\"\\\n\x17\x41\x64\x64SubscriptionResponse\x12\x12\n\nrequest_id\x18\x01 \x01(\t\x12\x0f\n\x07success\x18\x02 \x01(\x08\x12\x12\n\x05\x65rror\x18\x03 \x01(\tH\x00\x88\x01\x01\x42\x08\n\x06_error\"\x9d\x01\n\nAgentState\x12!\n\x08\x61gent_id\x18\x01 \x01(\x0b\x32\x0f.agents.AgentId\x12\x0c\n\x04\x65Tag\x18\x02 \x01(\t\x12\x15\n\x0b\x62inary_data\x18\x03 \x01(\x0cH\x00\x12\x13\n\ttext_data\x18\x04 \x01(\tH\x00\x12*\n\nproto_data\x18\x05 \x01(\x0b\x32\x14.google.protobuf.AnyH\x00\x42\x06\n\x04\x64\x61ta\"j\n\x10GetStateResponse\x12\'\n\x0b\x61gent_state\x18\x01 \x01(\x0b\x32\x12.agents.AgentState\x12\x0f\n\x07success\x18\x02 \x01(\x08\x12\x12\n\x05\x65rror\x18\x03 \x01(\tH\x00\x88\x01\x01\x42\x08\n\x06_error\"B\n\x11SaveStateResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x12\n\x05\x65rror\x18\x02 \x01(\tH\x00\x88\x01\x01\x42\x08\n\x06_error\"\xc6\x03\n\x07Message\x12%\n\x07request\x18\x01 \x01(\x0b\x32\x12.agents.RpcRequestH\x00\x12\'\n\x08response\x18\x02 \x01(\x0b\x32\x13.agents.RpcResponseH\x00\x12\x1e\n\x05\x65vent\x18\x03 \x01(\x0b\x32\r.agents.EventH\x00\x12\x44\n\x18registerAgentTypeRequest\x18\x04 \x01(\x0b\x32 .agents.RegisterAgentTypeRequestH\x00\x12\x46\n\x19registerAgentTypeResponse\x18\x05 \x01(\x0b\x32!.agents.RegisterAgentTypeResponseH\x00\x12@\n\x16\x61\x64\x64SubscriptionRequest\x18\x06 \x01(\x0b\x32\x1e.agents.AddSubscriptionRequestH\x00\x12\x42\n\x17\x61\x64\x64SubscriptionResponse\x18\x07 \x01(\x0b\x32\x1f.agents.AddSubscriptionResponseH\x00\x12,\n\ncloudEvent\x18\x08 \x01(\x0b\x32\x16.cloudevent.CloudEventH\x00\x42\t\n\x07message2\xb2\x01\n\x08\x41gentRpc\x12\x33\n\x0bOpenChannel\x12\x0f.agents.Message\x1a\x0f.agents.Message(\x01\x30\x01\x12\x35\n\x08GetState\x12\x0f.agents.AgentId\x1a\x18.agents.GetStateResponse\x12:\n\tSaveState\x12\x12.agents.AgentState\x1a\x19.agents.SaveStateResponseB!\xaa\x02\x1eMicrosoft.AutoGen.Abstractionsb\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x12\x61gent_worker.proto\x12\x06\x61gents\x1a\x10\x63loudevent.proto\x1a\x19google/protobuf/any.proto\"\'\n\x07TopicId\x12\x0c\n\x04type\x18\x01 \x01(\t\x12\x0e\n\x06source\x18\x02 \x01(\t\"$\n\x07\x41gentId\x12\x0c\n\x04type\x18\x01 \x01(\t\x12\x0b\n\x03key\x18\x02 \x01(\t\"d\n\x07Payload\x12\x11\n\tdata_type\x18\x01 \x01(\t\x12\x19\n\x11\x64\x61ta_content_type\x18\x02 \x01(\t\x12\x0c\n\x04\x64\x61ta\x18\x03 \x01(\x0c\x12\x1d\n\x15\x64\x61ta_content_encoding\x18\x04 \x01(\t\"\x89\x02\n\nRpcRequest\x12\x12\n\nrequest_id\x18\x01 \x01(\t\x12$\n\x06source\x18\x02 \x01(\x0b\x32\x0f.agents.AgentIdH\x00\x88\x01\x01\x12\x1f\n\x06target\x18\x03 \x01(\x0b\x32\x0f.agents.AgentId\x12\x0e\n\x06method\x18\x04 \x01(\t\x12 \n\x07payload\x18\x05 \x01(\x0b\x32\x0f.agents.Payload\x12\x32\n\x08metadata\x18\x06 \x03(\x0b\x32 .agents.RpcRequest.MetadataEntry\x1a/\n\rMetadataEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01\x42\t\n\x07_source\"\xb8\x01\n\x0bRpcResponse\x12\x12\n\nrequest_id\x18\x01 \x01(\t\x12 \n\x07payload\x18\x02 \x01(\x0b\x32\x0f.agents.Payload\x12\r\n\x05\x65rror\x18\x03 \x01(\t\x12\x33\n\x08metadata\x18\x04 \x03(\x0b\x32!.agents.RpcResponse.MetadataEntry\x1a/\n\rMetadataEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01\"\xa4\x02\n\x05\x45vent\x12\x12\n\ntopic_type\x18\x01 \x01(\t\x12\x14\n\x0ctopic_source\x18\x02 \x01(\t\x12$\n\x06source\x18\x03 \x01(\x0b\x32\x0f.agents.AgentIdH\x00\x88\x01\x01\x12 \n\x07payload\x18\x04 \x01(\x0b\x32\x0f.agents.Payload\x12-\n\x08metadata\x18\x05 \x03(\x0b\x32\x1b.agents.Event.MetadataEntry\x12#\n\nrecipients\x18\x06 \x03(\x0b\x32\x0f.agents.AgentId\x12\x19\n\x11\x64\x65livered_locally\x18\x07 \x01(\x08\x1a/\n\rMetadataEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01\x42\t\n\x07_source\"<\n\x18RegisterAgentTypeRequest\x12\x12\n\nrequest_id\x18\x01 \x01(\t\x12\x0c\n\x04type\x18\x02 \x01(\t\"^\n\x19RegisterAgentTypeResponse\x12\x12\n\nrequest_id\x18\x01 \x01(\t\x12\x0f\n\x07success\x18\x02 \x01(\x08\x12\x12\n\x05\x65rror\x18\x03 \x01(\tH\x00\x88\x01\x01\x42\x08\n\x06_error\":\n\x10TypeSubscription\x12\x12\n\ntopic_type\x18\x01 \x01(\t\x12\x12\n\nagent_type\x18\x02 \x01(\t\"T\n\x0cSubscription\x12\x34\n\x10typeSubscription\x18\x01 \x01(\x0b\x32\x18.agents.TypeSubscriptionH\x00\x42\x0e\n\x0csubscription\"X\n\x16\x41\x64\x64SubscriptionRequest\x12\x12\n\nrequest_id\x18\x01 \x01(\t\x12*\n\x0csubscription\x18\x02 \x01(\x0b\x32\x14.agents.Subscription\"\\\n\x17\x41\x64\x64SubscriptionResponse\x12\x12\n\nrequest_id\x18\x01 \x01(\t\x12\x0f\n\x07success\x18\x02 \x01(\x08\x12\x12\n\x05\x65rror\x18\x03 \x01(\tH\x00\x88\x01\x01\x42\x08\n\x06_error\"\x9d\x01\n\nAgentState\x12!\n\x08\x61gent_id\x18\x01 \x01(\x0b\x32\x0f.agents.AgentId\x12\x0c\n\x04\x65Tag\x18\x02 \x01(\t\x12\x15\n\x0b\x62inary_data\x18\x03 \x01(\x0cH\x00\x12\x13\n\ttext_data\x18\x04 \x01(\tH\x00\x12*\n\nproto_data\x18\x05 \x01(\x0b\x32\x14.google.protobuf.AnyH\x00\x42\x06\n\x04\x64\x61ta\"j\n\x10GetStateResponse\x12\'\n\x0b\x61gent_state\x18\x01 \x01(\x0b\x32\x12.agents.AgentState\x12\x0f\n\x07success\x18\x02 \x01(\x08\x12\x12\n\x05\x65rror\x18\x03 \x01(\tH\x00\x88\x01\x01\x42\x08\n\x06_error\"b\n\x11SaveStateResponse\x12\x0f\n\x07success\x18\x01 \x01(\x08\x12\x12\n\x05\x65rror\x18\x02 \x01(\tH\x00\x88\x01\x01\x12\x0c\n\x04\x65Tag\x18\x03 \x01(\t\x12\x10\n\x08\x63onflict\x18\x04 \x01(\x08\x42\x08\n\x06_error\"6\n\x10GetStatesRequest\x12\"\n\tagent_ids\x18\x01 \x03(\x0b\x32\x0f.agents.AgentId\"@\n\x11GetStatesResponse\x12+\n\tresponses\x18\x01 \x03(\x0b\x32\x18.agents.GetStateResponse\"=\n\x11SaveStatesRequest\x12(\n\x0c\x61gent_states\x18\x01 \x03(\x0b\x32\x12.agents.AgentState\"B\n\x12SaveStatesResponse\x12,\n\tresponses\x18\x01 \x03(\x0b\x32\x19.agents.SaveStateResponse\"\xed\x03\n\x07Message\x12%\n\x07request\x18\x01 \x01(\x0b\x32\x12.agents.RpcRequestH\x00\x12\'\n\x08response\x18\x02 \x01(\x0b\x32\x13.agents.RpcResponseH\x00\x12\x1e\n\x05\x65vent\x18\x03 \x01(\x0b\x32\r.agents.EventH\x00\x12\x44\n\x18registerAgentTypeRequest\x18\x04 \x01(\x0b\x32 .agents.RegisterAgentTypeRequestH\x00\x12\x46\n\x19registerAgentTypeResponse\x18\x05 \x01(\x0b\x32!.agents.RegisterAgentTypeResponseH\x00\x12@\n\x16\x61\x64\x64SubscriptionRequest\x18\x06 \x01(\x0b\x32\x1e.agents.AddSubscriptionRequestH\x00\x12\x42\n\x17\x61\x64\x64SubscriptionResponse\x18\x07 \x01(\x0b\x32\x1f.agents.AddSubscriptionResponseH\x00\x12,\n\ncloudEvent\x18\x08 \x01(\x0b\x32\x16.cloudevent.CloudEventH\x00\x12%\n\x05\x62\x61tch\x18\t \x01(\x0b\x32\x14.agents.MessageBatchH\x00\x42\t\n\x07message\"1\n\x0cMessageBatch\x12!\n\x08messages\x18\x01 \x03(\x0b\x32\x0f.agents.Message2\xb9\x02\n\x08\x41gentRpc\x12\x33\n\x0bOpenChannel\x12\x0f.agents.Message\x1a\x0f.agents.Message(\x01\x30\x01\x12\x35\n\x08GetState\x12\x0f.agents.AgentId\x1a\x18.agents.GetStateResponse\x12:\n\tSaveState\x12\x12.agents.AgentState\x1a\x19.agents.SaveStateResponse\x12@\n\tGetStates\x12\x18.agents.GetStatesRequest\x1a\x19.agents.GetStatesResponse\x12\x43\n\nSaveStates\x12\x19.agents.SaveStatesRequest\x1a\x1a.agents.SaveStatesResponseB!\xaa\x02\x1eMicrosoft.AutoGen.Abstractionsb\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
@@ -35,39 +35,49 @@
   _globals['_AGENTID']._serialized_start=116
   _globals['_AGENTID']._serialized_end=152
   _globals['_PAYLOAD']._serialized_start=154
-  _globals['_PAYLOAD']._serialized_end=223
-  _globals['_RPCREQUEST']._serialized_start=226
-  _globals['_RPCREQUEST']._serialized_end=491
-  _globals['_RPCREQUEST_METADATAENTRY']._serialized_start=433
-  _globals['_RPCREQUEST_METADATAENTRY']._serialized_end=480
-  _globals['_RPCRESPONSE']._serialized_start=494
-  _globals['_RPCRESPONSE']._serialized_end=678
-  _globals['_RPCRESPONSE_METADATAENTRY']._serialized_start=433
-  _globals['_RPCRESPONSE_METADATAENTRY']._serialized_end=480
-  _globals['_EVENT']._serialized_start=681
-  _globals['_EVENT']._serialized_end=909
-  _globals['_EVENT_METADATAENTRY']._serialized_start=433
-  _globals['_EVENT_METADATAENTRY']._serialized_end=480
-  _globals['_REGISTERAGENTTYPEREQUEST']._serialized_start=911
-  _globals['_REGISTERAGENTTYPEREQUEST']._serialized_end=971
-  _globals['_REGISTERAGENTTYPERESPONSE']._serialized_start=973
-  _globals['_REGISTERAGENTTYPERESPONSE']._serialized_end=1067
-  _globals['_TYPESUBSCRIPTION']._serialized_start=1069
-  _globals['_TYPESUBSCRIPTION']._serialized_end=1127
-  _globals['_SUBSCRIPTION']._serialized_start=1129
-  _globals['_SUBSCRIPTION']._serialized_end=1213
-  _globals['_ADDSUBSCRIPTIONREQUEST']._serialized_start=1215
-  _globals['_ADDSUBSCRIPTIONREQUEST']._serialized_end=1303
-  _globals['_ADDSUBSCRIPTIONRESPONSE']._serialized_start=1305
-  _globals['_ADDSUBSCRIPTIONRESPONSE']._serialized_end=1397
-  _globals['_AGENTSTATE']._serialized_start=1400
-  _globals['_AGENTSTATE']._serialized_end=1557
-  _globals['_GETSTATERESPONSE']._serialized_start=1559
-  _globals['_GETSTATERESPONSE']._serialized_end=1665
-  _globals['_SAVESTATERESPONSE']._serialized_start=1667
-  _globals['_SAVESTATERESPONSE']._serialized_end=1733
-  _globals['_MESSAGE']._serialized_start=1736
-  _globals['_MESSAGE']._serialized_end=2190
-  _globals['_AGENTRPC']._serialized_start=2193
-  _globals['_AGENTRPC']._serialized_end=2371
+  _globals['_PAYLOAD']._serialized_end=254
+  _globals['_RPCREQUEST']._serialized_start=257
+  _globals['_RPCREQUEST']._serialized_end=522
+  _globals['_RPCREQUEST_METADATAENTRY']._serialized_start=464
+  _globals['_RPCREQUEST_METADATAENTRY']._serialized_end=511
+  _globals['_RPCRESPONSE']._serialized_start=525
+  _globals['_RPCRESPONSE']._serialized_end=709
+  _globals['_RPCRESPONSE_METADATAENTRY']._serialized_start=464
+  _globals['_RPCRESPONSE_METADATAENTRY']._serialized_end=511
+  _globals['_EVENT']._serialized_start=712
+  _globals['_EVENT']._serialized_end=1004
+  _globals['_EVENT_METADATAENTRY']._serialized_start=464
+  _globals['_EVENT_METADATAENTRY']._serialized_end=511
+  _globals['_REGISTERAGENTTYPEREQUEST']._serialized_start=1006
+  _globals['_REGISTERAGENTTYPEREQUEST']._serialized_end=1066
+  _globals['_REGISTERAGENTTYPERESPONSE']._serialized_start=1068
+  _globals['_REGISTERAGENTTYPERESPONSE']._serialized_end=1162
+  _globals['_TYPESUBSCRIPTION']._serialized_start=1164
+  _globals['_TYPESUBSCRIPTION']._serialized_end=1222
+  _globals['_SUBSCRIPTION']._serialized_start=1224
+  _globals['_SUBSCRIPTION']._serialized_end=1308
+  _globals['_ADDSUBSCRIPTIONREQUEST']._serialized_start=1310
+  _globals['_ADDSUBSCRIPTIONREQUEST']._serialized_end=1398
+  _globals['_ADDSUBSCRIPTIONRESPONSE']._serialized_start=1400
+  _globals['_ADDSUBSCRIPTIONRESPONSE']._serialized_end=1492
+  _globals['_AGENTSTATE']._serialized_start=1495
+  _globals['_AGENTSTATE']._serialized_end=1652
+  _globals['_GETSTATERESPONSE']._serialized_start=1654
+  _globals['_GETSTATERESPONSE']._serialized_end=1760
+  _globals['_SAVESTATERESPONSE']._serialized_start=1762
+  _globals['_SAVESTATERESPONSE']._serialized_end=1860
+  _globals['_GETSTATESREQUEST']._serialized_start=1862
+  _globals['_GETSTATESREQUEST']._serialized_end=1916
+  _globals['_GETSTATESRESPONSE']._serialized_start=1918
+  _globals['_GETSTATESRESPONSE']._serialized_end=1982
+  _globals['_SAVESTATESREQUEST']._serialized_start=1984
+  _globals['_SAVESTATESREQUEST']._serialized_end=2045
+  _globals['_SAVESTATESRESPONSE']._serialized_start=2047
+  _globals['_SAVESTATESRESPONSE']._serialized_end=2113
+  _globals['_MESSAGE']._serialized_start=2116
+  _globals['_MESSAGE']._serialized_end=2609
+  _globals['_MESSAGEBATCH']._serialized_start=2611
+  _globals['_MESSAGEBATCH']._serialized_end=2660
+  _globals['_AGENTRPC']._serialized_start=2663
+  _globals['_AGENTRPC']._serialized_end=2976
 # @@protoc_insertion_point(module_scope)
@@ -57,17 +57,21 @@ class Payload(google.protobuf.message.Message):
     DATA_TYPE_FIELD_NUMBER: builtins.int
     DATA_CONTENT_TYPE_FIELD_NUMBER: builtins.int
     DATA_FIELD_NUMBER: builtins.int
+    DATA_CONTENT_ENCODING_FIELD_NUMBER: builtins.int
     data_type: builtins.str
     data_content_type: builtins.str
     data: builtins.bytes
+    data_content_encoding: builtins.str
+    """Compression applied to data, e.g. "gzip" or "zstd". Empty if data is not compressed."""
     def __init__(
         self,
         *,
         data_type: builtins.str = ...,
         data_content_type: builtins.str = ...,
         data: builtins.bytes = ...,
+        data_content_encoding: builtins.str = ...,
     ) -> None: ...
-    def ClearField(self, field_name: typing.Literal["data", b"data", "data_content_type", b"data_content_type", "data_type", b"data_type"]) -> None: ...
+    def ClearField(self, field_name: typing.Literal["data", b"data", "data_content_encoding", b"data_content_encoding", "data_content_type", b"data_content_type", "data_type", b"data_type"]) -> None: ...
 
 global___Payload = Payload
 
@@ -191,14 +195,26 @@ class Event(google.protobuf.message.Message):
     SOURCE_FIELD_NUMBER: builtins.int
     PAYLOAD_FIELD_NUMBER: builtins.int
     METADATA_FIELD_NUMBER: builtins.int
+    RECIPIENTS_FIELD_NUMBER: builtins.int
+    DELIVERED_LOCALLY_FIELD_NUMBER: builtins.int
     topic_type: builtins.str
     topic_source: builtins.str
+    delivered_locally: builtins.bool
+    """Set by a worker that already delivered the event to its own subscribers:
+    the host does not send the event back to that worker.
+    """
     @property
     def source(self) -> global___AgentId: ...
     @property
     def payload(self) -> global___Payload: ...
     @property
     def metadata(self) -> google.protobuf.internal.containers.ScalarMap[builtins.str, builtins.str]: ...
+    @property
+    def recipients(self) -> google.protobuf.internal.containers.RepeatedCompositeFieldContainer[global___AgentId]:
+        """Set by the host when an agent type is shared by several workers:
+        the recipients of the event that the receiving worker is responsible for.
+        """
+
     def __init__(
         self,
         *,
@@ -207,9 +223,11 @@ class Event(google.protobuf.message.Message):
         source: global___AgentId | None = ...,
         payload: global___Payload | None = ...,
         metadata: collections.abc.Mapping[builtins.str, builtins.str] | None = ...,
+        recipients: collections.abc.Iterable[global___AgentId] | None = ...,
+        delivered_locally: builtins.bool = ...,
     ) -> None: ...
     def HasField(self, field_name: typing.Literal["_source", b"_source", "payload", b"payload", "source", b"source"]) -> builtins.bool: ...
-    def ClearField(self, field_name: typing.Literal["_source", b"_source", "metadata", b"metadata", "payload", b"payload", "source", b"source", "topic_source", b"topic_source", "topic_type", b"topic_type"]) -> None: ...
+    def ClearField(self, field_name: typing.Literal["_source", b"_source", "delivered_locally", b"delivered_locally", "metadata", b"metadata", "payload", b"payload", "recipients", b"recipients", "source", b"source", "topic_source", b"topic_source", "topic_type", b"topic_type"]) -> None: ...
     def WhichOneof(self, oneof_group: typing.Literal["_source", b"_source"]) -> typing.Literal["source"] | None: ...
 
 global___Event = Event
@@ -336,6 +354,10 @@ global___AddSubscriptionResponse = AddSubscriptionResponse
 
 @typing.final
 class AgentState(google.protobuf.message.Message):
+    """The eTag of a saved state changes every time it is saved. A save with a non-empty eTag only succeeds
+    if the stored state still has that eTag. A state without data is deleted.
+    """
+
     DESCRIPTOR: google.protobuf.descriptor.Descriptor
 
     AGENT_ID_FIELD_NUMBER: builtins.int
@@ -367,6 +389,8 @@ global___AgentState = AgentState
 
 @typing.final
 class GetStateResponse(google.protobuf.message.Message):
+    """agent_state is not set if no state is saved for the agent."""
+
     DESCRIPTOR: google.protobuf.descriptor.Descriptor
 
     AGENT_STATE_FIELD_NUMBER: builtins.int
@@ -395,20 +419,96 @@ class SaveStateResponse(google.protobuf.message.Message):
 
     SUCCESS_FIELD_NUMBER: builtins.int
     ERROR_FIELD_NUMBER: builtins.int
+    ETAG_FIELD_NUMBER: builtins.int
+    CONFLICT_FIELD_NUMBER: builtins.int
     success: builtins.bool
     error: builtins.str
+    eTag: builtins.str
+    """The eTag of the saved state."""
+    conflict: builtins.bool
+    """Set when the save failed because the eTag did not match the stored state."""
     def __init__(
         self,
         *,
         success: builtins.bool = ...,
         error: builtins.str | None = ...,
+        eTag: builtins.str = ...,
+        conflict: builtins.bool = ...,
     ) -> None: ...
     def HasField(self, field_name: typing.Literal["_error", b"_error", "error", b"error"]) -> builtins.bool: ...
-    def ClearField(self, field_name: typing.Literal["_error", b"_error", "error", b"error", "success", b"success"]) -> None: ...
+    def ClearField(self, field_name: typing.Literal["_error", b"_error", "conflict", b"conflict", "eTag", b"eTag", "error", b"error", "success", b"success"]) -> None: ...
     def WhichOneof(self, oneof_group: typing.Literal["_error", b"_error"]) -> typing.Literal["error"] | None: ...
 
 global___SaveStateResponse = SaveStateResponse
 
+@typing.final
+class GetStatesRequest(google.protobuf.message.Message):
+    DESCRIPTOR: google.protobuf.descriptor.Descriptor
+
+    AGENT_IDS_FIELD_NUMBER: builtins.int
+    @property
+    def agent_ids(self) -> google.protobuf.internal.containers.RepeatedCompositeFieldContainer[global___AgentId]: ...
+    def __init__(
+        self,
+        *,
+        agent_ids: collections.abc.Iterable[global___AgentId] | None = ...,
+    ) -> None: ...
+    def ClearField(self, field_name: typing.Literal["agent_ids", b"agent_ids"]) -> None: ...
+
+global___GetStatesRequest = GetStatesRequest
+
+@typing.final
+class GetStatesResponse(google.protobuf.message.Message):
+    """One response for each requested agent, in the order of the request."""
+
+    DESCRIPTOR: google.protobuf.descriptor.Descriptor
+
+    RESPONSES_FIELD_NUMBER: builtins.int
+    @property
+    def responses(self) -> google.protobuf.internal.containers.RepeatedCompositeFieldContainer[global___GetStateResponse]: ...
+    def __init__(
+        self,
+        *,
+        responses: collections.abc.Iterable[global___GetStateResponse] | None = ...,
+    ) -> None: ...
+    def ClearField(self, field_name: typing.Literal["responses", b"responses"]) -> None: ...
+
+global___GetStatesResponse = GetStatesResponse
+
+@typing.final
+class SaveStatesRequest(google.protobuf.message.Message):
+    DESCRIPTOR: google.protobuf.descriptor.Descriptor
+
+    AGENT_STATES_FIELD_NUMBER: builtins.int
+    @property
+    def agent_states(self) -> google.protobuf.internal.containers.RepeatedCompositeFieldContainer[global___AgentState]: ...
+    def __init__(
+        self,
+        *,
+        agent_states: collections.abc.Iterable[global___AgentState] | None = ...,
+    ) -> None: ...
+    def ClearField(self, field_name: typing.Literal["agent_states", b"agent_states"]) -> None: ...
+
+global___SaveStatesRequest = SaveStatesRequest
+
+@typing.final
+class SaveStatesResponse(google.protobuf.message.Message):
+    """One response for each saved state, in the order of the request."""
+
+    DESCRIPTOR: google.protobuf.descriptor.Descriptor
+
+    RESPONSES_FIELD_NUMBER: builtins.int
+    @property
+    def responses(self) -> google.protobuf.internal.containers.RepeatedCompositeFieldContainer[global___SaveStateResponse]: ...
+    def __init__(
+        self,
+        *,
+        responses: collections.abc.Iterable[global___SaveStateResponse] | None = ...,
+    ) -> None: ...
+    def ClearField(self, field_name: typing.Literal["responses", b"responses"]) -> None: ...
+
+global___SaveStatesResponse = SaveStatesResponse
+
 @typing.final
 class Message(google.protobuf.message.Message):
     DESCRIPTOR: google.protobuf.descriptor.Descriptor
@@ -421,6 +521,7 @@ class Message(google.protobuf.message.Message):
     ADDSUBSCRIPTIONREQUEST_FIELD_NUMBER: builtins.int
     ADDSUBSCRIPTIONRESPONSE_FIELD_NUMBER: builtins.int
     CLOUDEVENT_FIELD_NUMBER: builtins.int
+    BATCH_FIELD_NUMBER: builtins.int
     @property
     def request(self) -> global___RpcRequest: ...
     @property
@@ -437,6 +538,8 @@ class Message(google.protobuf.message.Message):
     def addSubscriptionResponse(self) -> global___AddSubscriptionResponse: ...
     @property
     def cloudEvent(self) -> cloudevent_pb2.CloudEvent: ...
+    @property
+    def batch(self) -> global___MessageBatch: ...
     def __init__(
         self,
         *,
@@ -448,9 +551,30 @@ class Message(google.protobuf.message.Message):
         addSubscriptionRequest: global___AddSubscriptionRequest | None = ...,
         addSubscriptionResponse: global___AddSubscriptionResponse | None = ...,
         cloudEvent: cloudevent_pb2.CloudEvent | None = ...,
+        batch: global___MessageBatch | None = ...,
     ) -> None: ...
-    def HasField(self, field_name: typing.Literal["addSubscriptionRequest", b"addSubscriptionRequest", "addSubscriptionResponse", b"addSubscriptionResponse", "cloudEvent", b"cloudEvent", "event", b"event", "message", b"message", "registerAgentTypeRequest", b"registerAgentTypeRequest", "registerAgentTypeResponse", b"registerAgentTypeResponse", "request", b"request", "response", b"response"]) -> builtins.bool: ...
-    def ClearField(self, field_name: typing.Literal["addSubscriptionRequest", b"addSubscriptionRequest", "addSubscriptionResponse", b"addSubscriptionResponse", "cloudEvent", b"cloudEvent", "event", b"event", "message", b"message", "registerAgentTypeRequest", b"registerAgentTypeRequest", "registerAgentTypeResponse", b"registerAgentTypeResponse", "request", b"request", "response", b"response"]) -> None: ...
-    def WhichOneof(self, oneof_group: typing.Literal["message", b"message"]) -> typing.Literal["request", "response", "event", "registerAgentTypeRequest", "registerAgentTypeResponse", "addSubscriptionRequest", "addSubscriptionResponse", "cloudEvent"] | None: ...
+    def HasField(self, field_name: typing.Literal["addSubscriptionRequest", b"addSubscriptionRequest", "addSubscriptionResponse", b"addSubscriptionResponse", "batch", b"batch", "cloudEvent", b"cloudEvent", "event", b"event", "message", b"message", "registerAgentTypeRequest", b"registerAgentTypeRequest", "registerAgentTypeResponse", b"registerAgentTypeResponse", "request", b"request", "response", b"response"]) -> builtins.bool: ...
+    def ClearField(self, field_name: typing.Literal["addSubscriptionRequest", b"addSubscriptionRequest", "addSubscriptionResponse", b"addSubscriptionResponse", "batch", b"batch", "cloudEvent", b"cloudEvent", "event", b"event", "message", b"message", "registerAgentTypeRequest", b"registerAgentTypeRequest", "registerAgentTypeResponse", b"registerAgentTypeResponse", "request", b"request", "response", b"response"]) -> None: ...
+    def WhichOneof(self, oneof_group: typing.Literal["message", b"message"]) -> typing.Literal["request", "response", "event", "registerAgentTypeRequest", "registerAgentTypeResponse", "addSubscriptionRequest", "addSubscriptionResponse", "cloudEvent", "batch"] | None: ...
 
 global___Message = Message
+
+@typing.final
+class MessageBatch(google.protobuf.message.Message):
+    """Several messages sent as one frame on the OpenChannel stream. Only sent to a peer
+    that announced support for batches when the channel was opened.
+    """
+
+    DESCRIPTOR: google.protobuf.descriptor.Descriptor
+
+    MESSAGES_FIELD_NUMBER: builtins.int
+    @property
+    def messages(self) -> google.protobuf.internal.containers.RepeatedCompositeFieldContainer[global___Message]: ...
+    def __init__(
+        self,
+        *,
+        messages: collections.abc.Iterable[global___Message] | None = ...,
+    ) -> None: ...
+    def ClearField(self, field_name: typing.Literal["messages", b"messages"]) -> None: ...
+
+global___MessageBatch = MessageBatch
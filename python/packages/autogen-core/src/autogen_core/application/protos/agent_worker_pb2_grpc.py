@@ -29,6 +29,16 @@ def __init__(self, channel):
                 request_serializer=agent__worker__pb2.AgentState.SerializeToString,
                 response_deserializer=agent__worker__pb2.SaveStateResponse.FromString,
                 )
+        self.GetStates = channel.unary_unary(
+                '/agents.AgentRpc/GetStates',
+                request_serializer=agent__worker__pb2.GetStatesRequest.SerializeToString,
+                response_deserializer=agent__worker__pb2.GetStatesResponse.FromString,
+                )
+        self.SaveStates = channel.unary_unary(
+                '/agents.AgentRpc/SaveStates',
+                request_serializer=agent__worker__pb2.SaveStatesRequest.SerializeToString,
+                response_deserializer=agent__worker__pb2.SaveStatesResponse.FromString,
+                )
 
 
 class AgentRpcServicer(object):
@@ -52,6 +62,18 @@ def SaveState(self, request, context):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def GetStates(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def SaveStates(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_AgentRpcServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -70,6 +92,16 @@ def add_AgentRpcServicer_to_server(servicer, server):
                     request_deserializer=agent__worker__pb2.AgentState.FromString,
                     response_serializer=agent__worker__pb2.SaveStateResponse.SerializeToString,
             ),
+            'GetStates': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetStates,
+                    request_deserializer=agent__worker__pb2.GetStatesRequest.FromString,
+                    response_serializer=agent__worker__pb2.GetStatesResponse.SerializeToString,
+            ),
+            'SaveStates': grpc.unary_unary_rpc_method_handler(
+                    servicer.SaveStates,
+                    request_deserializer=agent__worker__pb2.SaveStatesRequest.FromString,
+                    response_serializer=agent__worker__pb2.SaveStatesResponse.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'agents.AgentRpc', rpc_method_handlers)
@@ -130,3 +162,37 @@ def SaveState(request,
             agent__worker__pb2.SaveStateResponse.FromString,
             options, channel_credentials,
             insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def GetStates(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/agents.AgentRpc/GetStates',
+            agent__worker__pb2.GetStatesRequest.SerializeToString,
+            agent__worker__pb2.GetStatesResponse.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def SaveStates(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/agents.AgentRpc/SaveStates',
+            agent__worker__pb2.SaveStatesRequest.SerializeToString,
+            agent__worker__pb2.SaveStatesResponse.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
@@ -1,3 +1,4 @@
+from ._metrics import HandlerMetricsSnapshot, HistogramSnapshot, RuntimeMetrics, RuntimeMetricsSnapshot
 from ._propagation import (
     EnvelopeMetadata,
     TelemetryMetadataContainer,
@@ -14,4 +15,8 @@
     "TelemetryMetadataContainer",
     "TraceHelper",
     "MessageRuntimeTracingConfig",
+    "RuntimeMetrics",
+    "RuntimeMetricsSnapshot",
+    "HandlerMetricsSnapshot",
+    "HistogramSnapshot",
 ]
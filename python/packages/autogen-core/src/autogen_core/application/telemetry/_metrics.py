@@ -0,0 +1,253 @@
+import bisect
+import math
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, Mapping, Sequence, Tuple
+
+from opentelemetry.metrics import CallbackOptions, MeterProvider, NoOpMeterProvider, Observation
+
+from ._constants import NAMESPACE
+
+# Upper bounds of the buckets of duration histograms, in seconds.
+DURATION_BUCKETS: Tuple[float, ...] = (
+    0.0001,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+# Upper bounds of the buckets of the publish fan-out histogram, in agents.
+FAN_OUT_BUCKETS: Tuple[float, ...] = (0, 1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024)
+
+
+@dataclass(frozen=True)
+class HistogramSnapshot:
+    """The distribution of the values recorded in a histogram.
+
+    ``bucket_counts[i]`` is the number of values in ``(boundaries[i - 1], boundaries[i]]``, and the last bucket
+    counts the values above the last boundary.
+    """
+
+    count: int
+    sum: float
+    min: float
+    max: float
+    boundaries: Tuple[float, ...]
+    bucket_counts: Tuple[int, ...]
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+    def quantile(self, q: float) -> float:
+        """Estimate the ``q`` quantile, for example 0.99 for the 99th percentile, as the upper bound of the bucket
+        it falls in, capped by the largest value recorded."""
+        if not 0.0 <= q <= 1.0:
+            raise ValueError("q must be between 0 and 1.")
+        if self.count == 0:
+            return 0.0
+        rank = max(1, math.ceil(q * self.count))
+        seen = 0
+        for boundary, bucket_count in zip(self.boundaries, self.bucket_counts, strict=False):
+            seen += bucket_count
+            if seen >= rank:
+                return min(boundary, self.max)
+        return self.max
+
+
+class _Histogram:
+    def __init__(self, boundaries: Sequence[float]) -> None:
+        self._boundaries = tuple(boundaries)
+        self._bucket_counts = [0] * (len(self._boundaries) + 1)
+        self._count = 0
+        self._sum = 0.0
+        self._min = math.inf
+        self._max = -math.inf
+
+    def record(self, value: float) -> None:
+        self._bucket_counts[bisect.bisect_left(self._boundaries, value)] += 1
+        self._count += 1
+        self._sum += value
+        if value < self._min:
+            self._min = value
+        if value > self._max:
+            self._max = value
+
+    def snapshot(self) -> HistogramSnapshot:
+        return HistogramSnapshot(
+            count=self._count,
+            sum=self._sum,
+            min=self._min if self._count else 0.0,
+            max=self._max if self._count else 0.0,
+            boundaries=self._boundaries,
+            bucket_counts=tuple(self._bucket_counts),
+        )
+
+
+@dataclass(frozen=True)
+class HandlerMetricsSnapshot:
+    """Metrics of the message handler calls for one agent type and message type."""
+
+    duration: HistogramSnapshot
+    """How long the handler calls took, in seconds."""
+    errors: int
+    """Number of handler calls that raised an exception other than a cancellation."""
+
+    @property
+    def calls(self) -> int:
+        return self.duration.count
+
+    @property
+    def error_rate(self) -> float:
+        return self.errors / self.calls if self.calls else 0.0
+
+
+@dataclass(frozen=True)
+class RuntimeMetricsSnapshot:
+    """The metrics of an agent runtime at one point in time, see :class:`RuntimeMetrics`."""
+
+    queue_depth: int
+    """Number of messages waiting to be dispatched."""
+    max_queue_depth: int
+    """Largest number of messages that waited to be dispatched at once."""
+    queue_delay: HistogramSnapshot
+    """Time from when a message was queued to when it was dispatched, in seconds."""
+    handlers: Mapping[Tuple[str, str], HandlerMetricsSnapshot]
+    """Handler call metrics by agent type and message type."""
+    publish_fan_out: HistogramSnapshot
+    """Number of agents each published message was delivered to by this runtime."""
+    agent_activations: Mapping[str, int]
+    """Number of agents created or restored from passivation, by agent type."""
+
+    @property
+    def handler_calls(self) -> int:
+        return sum(handler.calls for handler in self.handlers.values())
+
+    @property
+    def handler_errors(self) -> int:
+        return sum(handler.errors for handler in self.handlers.values())
+
+    @property
+    def error_rate(self) -> float:
+        calls = self.handler_calls
+        return self.handler_errors / calls if calls else 0.0
+
+
+class RuntimeMetrics:
+    """Collects the metrics of an agent runtime: queue depth, the time messages wait in the queue, the duration
+    and errors of message handler calls by agent type and message type, the fan-out of published messages and
+    agent activations.
+
+    The metrics are kept in process, where :meth:`snapshot` returns them, and are also exported through
+    OpenTelemetry when the runtime is given a meter provider. The queue depth is then reported as an observable
+    gauge, so exporters sample it over time.
+
+    Args:
+        name (str): Name of the runtime, used as the name of the OpenTelemetry meter.
+        queue_depth (Callable[[], int]): Returns the number of messages waiting to be dispatched.
+        meter_provider (MeterProvider, optional): Meter provider to export the metrics with. Defaults to not
+            exporting them.
+    """
+
+    def __init__(self, name: str, queue_depth: Callable[[], int], meter_provider: MeterProvider | None = None) -> None:
+        self._queue_depth = queue_depth
+        self._max_queue_depth = 0
+        self._queue_delay = _Histogram(DURATION_BUCKETS)
+        self._handler_durations: Dict[Tuple[str, str], _Histogram] = {}
+        self._handler_errors: Dict[Tuple[str, str], int] = {}
+        self._publish_fan_out = _Histogram(FAN_OUT_BUCKETS)
+        self._agent_activations: Dict[str, int] = {}
+        self._exporting = meter_provider is not None and not isinstance(meter_provider, NoOpMeterProvider)
+        if meter_provider is not None and self._exporting:
+            meter = meter_provider.get_meter(f"{NAMESPACE} {name}")
+            meter.create_observable_gauge(
+                f"{NAMESPACE}.runtime.queue.depth",
+                callbacks=[self._observe_queue_depth],
+                unit="{message}",
+                description="Number of messages waiting to be dispatched.",
+            )
+            self._queue_delay_instrument = meter.create_histogram(
+                f"{NAMESPACE}.runtime.queue.delay",
+                unit="s",
+                description="Time from when a message was queued to when it was dispatched.",
+            )
+            self._handler_duration_instrument = meter.create_histogram(
+                f"{NAMESPACE}.runtime.handler.duration", unit="s", description="Duration of message handler calls."
+            )
+            self._handler_error_instrument = meter.create_counter(
+                f"{NAMESPACE}.runtime.handler.errors",
+                unit="{error}",
+                description="Number of message handler calls that raised an exception.",
+            )
+            self._fan_out_instrument = meter.create_histogram(
+                f"{NAMESPACE}.runtime.publish.fan_out",
+                unit="{agent}",
+                description="Number of agents each published message was delivered to.",
+            )
+            self._activation_instrument = meter.create_counter(
+                f"{NAMESPACE}.runtime.agent.activations",
+                unit="{agent}",
+                description="Number of agents created or restored from passivation.",
+            )
+
+    def _observe_queue_depth(self, options: CallbackOptions) -> Iterable[Observation]:
+        return [Observation(self._queue_depth())]
+
+    def record_queue_depth(self, depth: int) -> None:
+        """Record the queue depth after a message was queued, to track the largest depth."""
+        if depth > self._max_queue_depth:
+            self._max_queue_depth = depth
+
+    def record_queue_delay(self, seconds: float) -> None:
+        self._queue_delay.record(seconds)
+        if self._exporting:
+            self._queue_delay_instrument.record(seconds)
+
+    def record_handler_call(self, agent_type: str, message_type: str, seconds: float, error: bool) -> None:
+        key = (agent_type, message_type)
+        histogram = self._handler_durations.get(key)
+        if histogram is None:
+            histogram = self._handler_durations[key] = _Histogram(DURATION_BUCKETS)
+        histogram.record(seconds)
+        if error:
+            self._handler_errors[key] = self._handler_errors.get(key, 0) + 1
+        if self._exporting:
+            attributes = {f"{NAMESPACE}.agent.type": agent_type, f"{NAMESPACE}.message.type": message_type}
+            self._handler_duration_instrument.record(seconds, attributes)
+            if error:
+                self._handler_error_instrument.add(1, attributes)
+
+    def record_publish_fan_out(self, recipients: int) -> None:
+        self._publish_fan_out.record(recipients)
+        if self._exporting:
+            self._fan_out_instrument.record(recipients)
+
+    def record_agent_activation(self, agent_type: str) -> None:
+        self._agent_activations[agent_type] = self._agent_activations.get(agent_type, 0) + 1
+        if self._exporting:
+            self._activation_instrument.add(1, {f"{NAMESPACE}.agent.type": agent_type})
+
+    def snapshot(self) -> RuntimeMetricsSnapshot:
+        """Return the metrics collected since the runtime was created."""
+        return RuntimeMetricsSnapshot(
+            queue_depth=self._queue_depth(),
+            max_queue_depth=self._max_queue_depth,
+            queue_delay=self._queue_delay.snapshot(),
+            handlers={
+                key: HandlerMetricsSnapshot(duration=histogram.snapshot(), errors=self._handler_errors.get(key, 0))
+                for key, histogram in self._handler_durations.items()
+            },
+            publish_fan_out=self._publish_fan_out.snapshot(),
+            agent_activations=dict(self._agent_activations),
+        )
@@ -1,12 +1,28 @@
 import contextlib
-from typing import Dict, Generic, Iterator, Optional, Sequence
+import random
+from typing import ContextManager, Dict, Generic, Optional, Sequence
 
-from opentelemetry.trace import Link, NoOpTracerProvider, Span, SpanKind, TracerProvider
+from opentelemetry.trace import (
+    INVALID_SPAN,
+    Link,
+    NonRecordingSpan,
+    NoOpTracerProvider,
+    Span,
+    SpanContext,
+    SpanKind,
+    TraceFlags,
+    TracerProvider,
+    get_current_span,
+    use_span,
+)
 from opentelemetry.util import types
 
 from ._propagation import TelemetryMetadataContainer, get_telemetry_context
 from ._tracing_config import Destination, ExtraAttributes, Operation, TracingConfig
 
+# Returned by `trace_block` when tracing is disabled. It holds no state, so it can be shared.
+_DISABLED_BLOCK: ContextManager[Span] = contextlib.nullcontext(INVALID_SPAN)
+
 
 class TraceHelper(Generic[Operation, Destination, ExtraAttributes]):
     """
@@ -15,19 +31,41 @@ class TraceHelper(Generic[Operation, Destination, ExtraAttributes]):
     This class provides a context manager `trace_block` to create and manage spans for tracing operations,
     following semantic conventions and supporting nested spans through metadata contexts.
 
+    Without a tracer provider, or with a :class:`~opentelemetry.trace.NoOpTracerProvider`, tracing is disabled and
+    `trace_block` does no work. Otherwise traces are sampled at their head: a trace started here is recorded with
+    probability `sampling_ratio`, and a span with a parent follows the sampling decision of the parent. Spans of
+    traces that are not sampled are not created, only the parent context is kept current, so that the decision is
+    propagated to other runtimes.
+
+    Args:
+        tracer_provider (TracerProvider | None): The tracer provider to create spans with.
+        instrumentation_builder_config (TracingConfig): Builds the names and attributes of the spans.
+        sampling_ratio (float, optional): Fraction of the traces started here that are recorded. Defaults to 1.0.
     """
 
     def __init__(
         self,
         tracer_provider: TracerProvider | None,
         instrumentation_builder_config: TracingConfig[Operation, Destination, ExtraAttributes],
+        sampling_ratio: float = 1.0,
     ) -> None:
+        if not 0.0 <= sampling_ratio <= 1.0:
+            raise ValueError("sampling_ratio must be between 0 and 1.")
         self.tracer = (tracer_provider if tracer_provider else NoOpTracerProvider()).get_tracer(
             f"autogen {instrumentation_builder_config.name}"
         )
         self.instrumentation_builder_config = instrumentation_builder_config
+        self.sampling_ratio = sampling_ratio
+        self._enabled = tracer_provider is not None and not isinstance(tracer_provider, NoOpTracerProvider)
+
+    @property
+    def enabled(self) -> bool:
+        """Whether spans can be recorded. When False, there is no trace context to propagate."""
+        return self._enabled
+
+    def _sample_root(self) -> bool:
+        return self.sampling_ratio >= 1.0 or random.random() < self.sampling_ratio
 
-    @contextlib.contextmanager
     def trace_block(
         self,
         operation: Operation,
@@ -42,7 +80,7 @@ def trace_block(
         record_exception: bool = True,
         set_status_on_exception: bool = True,
         end_on_exit: bool = True,
-    ) -> Iterator[Span]:
+    ) -> ContextManager[Span]:
         """
         Thin wrapper on top of start_as_current_span.
         1. It helps us follow semantic conventions
@@ -61,13 +99,30 @@ def trace_block(
             set_status_on_exception (bool, optional): Whether to set the status on exception. Defaults to True.
             end_on_exit (bool, optional): Whether to end the span on exit. Defaults to True.
 
-        Yields:
-            Iterator[Span]: The span object.
+        Returns:
+            ContextManager[Span]: A context manager that makes the span current and returns it.
 
         """
+        if not self._enabled:
+            return _DISABLED_BLOCK
+        context = get_telemetry_context(parent) if parent else None
+        parent_span_context = get_current_span(context).get_span_context()
+        if parent_span_context.is_valid:
+            sampled = parent_span_context.trace_flags.sampled
+        else:
+            sampled = self._sample_root()
+        if not sampled:
+            if not parent_span_context.is_valid:
+                # Start a trace that is not sampled, so that other runtimes do not sample its continuations.
+                parent_span_context = SpanContext(
+                    trace_id=random.getrandbits(128) or 1,
+                    span_id=random.getrandbits(64) or 1,
+                    is_remote=False,
+                    trace_flags=TraceFlags(TraceFlags.DEFAULT),
+                )
+            return use_span(NonRecordingSpan(parent_span_context))
         span_name = self.instrumentation_builder_config.get_span_name(operation, destination)
         span_kind = kind or self.instrumentation_builder_config.get_span_kind(operation)
-        context = get_telemetry_context(parent) if parent else None
         attributes_with_defaults: Dict[str, types.AttributeValue] = {}
         for key, value in (attributes or {}).items():
             attributes_with_defaults[key] = value
@@ -76,7 +131,7 @@ def trace_block(
         )
         for key, value in instrumentation_attributes.items():
             attributes_with_defaults[key] = value
-        with self.tracer.start_as_current_span(
+        return self.tracer.start_as_current_span(
             span_name,
             context,
             span_kind,
@@ -86,5 +141,4 @@ def trace_block(
             record_exception,
             set_status_on_exception,
             end_on_exit,
-        ) as span:
-            yield span
+        )
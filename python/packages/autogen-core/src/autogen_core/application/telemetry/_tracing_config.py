@@ -88,6 +88,7 @@ def get_span_kind(
 class ExtraMessageRuntimeAttributes(TypedDict):
     message_size: NotRequired[int]
     message_type: NotRequired[str]
+    batch_size: NotRequired[int]
 
 
 MessagingDestination = Union[AgentId, TopicId, str, None]
@@ -128,6 +129,8 @@ def build_attributes(
                 attrs["messaging.message.envelope.size"] = extraAttributes["message_size"]
             if "message_type" in extraAttributes:
                 attrs["messaging.message.type"] = extraAttributes["message_type"]
+            if "batch_size" in extraAttributes:
+                attrs["messaging.batch.message_count"] = extraAttributes["batch_size"]
         return attrs
 
     def get_span_name(
@@ -16,7 +16,9 @@
 from ._message_handler_context import MessageHandlerContext
 from ._serialization import (
     JSON_DATA_CONTENT_TYPE,
+    PROTOBUF_DATA_CONTENT_TYPE,
     MessageSerializer,
+    OrjsonMessageSerializer,
     SerializationRegistry,
     UnknownPayload,
     try_get_known_serializers_for_type,
@@ -43,7 +45,9 @@
     "SubscriptionInstantiationContext",
     "MessageHandlerContext",
     "JSON_DATA_CONTENT_TYPE",
+    "PROTOBUF_DATA_CONTENT_TYPE",
     "MessageSerializer",
+    "OrjsonMessageSerializer",
     "try_get_known_serializers_for_type",
     "UnknownPayload",
     "subscription_factory",
@@ -1,7 +1,21 @@
 from __future__ import annotations
 
+import asyncio
+from asyncio import Future
 from collections.abc import Sequence
-from typing import Any, Awaitable, Callable, Mapping, Protocol, Type, TypeVar, overload, runtime_checkable
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    List,
+    Mapping,
+    Protocol,
+    Tuple,
+    Type,
+    TypeVar,
+    overload,
+    runtime_checkable,
+)
 
 from typing_extensions import deprecated
 
@@ -71,6 +85,65 @@ async def publish_message(
         """
         ...
 
+    async def send_messages(
+        self,
+        messages: Sequence[Tuple[Any, AgentId]],
+        *,
+        sender: AgentId | None = None,
+        cancellation_token: CancellationToken | None = None,
+    ) -> List[Future[Any]]:
+        """Send several messages, each to its agent, and get the futures of their responses.
+
+        This is cheaper than a :meth:`send_message` call per message: the messages are traced as one batch and
+        queued together, and a :class:`WorkerAgentRuntime` hands them to the host together. Intervention handlers
+        still see each message. The messages are handled concurrently.
+
+        Args:
+            messages (Sequence[Tuple[Any, AgentId]]): The messages to send, each with the agent to send it to.
+            sender (AgentId | None, optional): Agent which sent the messages. Defaults to None.
+            cancellation_token (CancellationToken | None, optional): Token used to cancel all the messages. Defaults to None.
+
+        Returns:
+            List[Future[Any]]: The futures of the responses, in the order of the messages. Await them with
+            :func:`asyncio.gather` to get the responses in order, or with :func:`asyncio.as_completed` to get them as
+            they arrive. A future raises what :meth:`send_message` would raise for its message.
+
+        Example:
+            .. code-block:: python
+
+                futures = await runtime.send_messages([(call, tool_agent_id) for call in calls])
+                results = await asyncio.gather(*futures, return_exceptions=True)
+
+        """
+        # Runtimes that don't batch messages send them one by one.
+        return [
+            asyncio.ensure_future(
+                self.send_message(message, recipient, sender=sender, cancellation_token=cancellation_token)
+            )
+            for message, recipient in messages
+        ]
+
+    async def publish_messages(
+        self,
+        messages: Sequence[Tuple[Any, TopicId]],
+        *,
+        sender: AgentId | None = None,
+        cancellation_token: CancellationToken | None = None,
+    ) -> None:
+        """Publish several messages, each to its topic, in order. This is cheaper than a :meth:`publish_message`
+        call per message, see :meth:`send_messages`.
+
+        Args:
+            messages (Sequence[Tuple[Any, TopicId]]): The messages to publish, each with the topic to publish it to.
+            sender (AgentId | None, optional): The agent which sent the messages. Defaults to None.
+            cancellation_token (CancellationToken | None, optional): Token used to cancel all the messages. Defaults to None.
+
+        Raises:
+            UndeliverableException: If a message cannot be delivered. The messages before it are published.
+        """
+        for message, topic_id in messages:
+            await self.publish_message(message, topic_id, sender=sender, cancellation_token=cancellation_token)
+
     @deprecated(
         "Use your agent's `register` method directly instead of this method. See documentation for latest usage."
     )
@@ -111,12 +184,14 @@ async def register_factory(
         type: AgentType,
         agent_factory: Callable[[], T | Awaitable[T]],
         expected_class: type[T],
+        max_concurrency: int | None = None,
     ) -> AgentType:
         """Register an agent factory with the runtime associated with a specific type. The type must be unique.
 
         Args:
             type (str): The type of agent this factory creates. It is not the same as agent class name. The `type` parameter is used to differentiate between different factory functions rather than agent classes.
             agent_factory (Callable[[], T]): The factory that creates the agent, where T is a concrete Agent type. Inside the factory, use `autogen_core.base.AgentInstantiationContext` to access variables like the current runtime and agent ID.
+            max_concurrency (int, optional): Number of messages each agent of this type handles at once. Further messages to the agent wait in its mailbox and are handled in the order they arrived, so 1 makes the agent handle its messages one at a time. Defaults to no limit.
 
         Example:
             .. code-block:: python
@@ -3,6 +3,7 @@
 import inspect
 import warnings
 from abc import ABC, abstractmethod
+from asyncio import Future
 from collections.abc import Sequence
 from typing import Any, Awaitable, Callable, ClassVar, List, Mapping, Tuple, Type, TypeVar
 
@@ -56,6 +57,9 @@ def decorator(cls: Type[BaseAgentType]) -> Type[BaseAgentType]:
 class BaseAgent(ABC, Agent):
     internal_unbound_subscriptions_list: ClassVar[List[UnboundSubscription]] = []
     internal_extra_handles_types: ClassVar[List[Tuple[Type[Any], List[MessageSerializer[Any]]]]] = []
+    max_concurrency: ClassVar[int | None] = None
+    """Number of messages each agent of the class handles at once when registered with :meth:`register`, see
+    :meth:`AgentRuntime.register_factory`. Defaults to no limit."""
 
     def __init_subclass__(cls, **kwargs: Any) -> None:
         super().__init_subclass__(**kwargs)
@@ -133,6 +137,24 @@ async def publish_message(
     ) -> None:
         await self._runtime.publish_message(message, topic_id, sender=self.id, cancellation_token=cancellation_token)
 
+    async def send_messages(
+        self,
+        messages: Sequence[Tuple[Any, AgentId]],
+        *,
+        cancellation_token: CancellationToken | None = None,
+    ) -> List[Future[Any]]:
+        """See :py:meth:`autogen_core.base.AgentRuntime.send_messages` for more information."""
+        return await self._runtime.send_messages(messages, sender=self.id, cancellation_token=cancellation_token)
+
+    async def publish_messages(
+        self,
+        messages: Sequence[Tuple[Any, TopicId]],
+        *,
+        cancellation_token: CancellationToken | None = None,
+    ) -> None:
+        """See :py:meth:`autogen_core.base.AgentRuntime.publish_messages` for more information."""
+        await self._runtime.publish_messages(messages, sender=self.id, cancellation_token=cancellation_token)
+
     async def save_state(self) -> Mapping[str, Any]:
         warnings.warn("save_state not implemented", stacklevel=2)
         return {}
@@ -149,9 +171,18 @@ async def register(
         factory: Callable[[], Self | Awaitable[Self]],
         *,
         skip_class_subscriptions: bool = False,
+        max_concurrency: int | None = None,
     ) -> AgentType:
         agent_type = AgentType(type)
-        agent_type = await runtime.register_factory(type=agent_type, agent_factory=factory, expected_class=cls)
+        if max_concurrency is None:
+            max_concurrency = cls.max_concurrency
+        if max_concurrency is None:
+            # Runtimes written before concurrency limits do not take the argument.
+            agent_type = await runtime.register_factory(type=agent_type, agent_factory=factory, expected_class=cls)
+        else:
+            agent_type = await runtime.register_factory(
+                type=agent_type, agent_factory=factory, expected_class=cls, max_concurrency=max_concurrency
+            )
         if not skip_class_subscriptions:
             with SubscriptionInstantiationContext.populate_context(agent_type):
                 subscriptions: List[Subscription] = []
@@ -1,40 +1,127 @@
+import asyncio
 import threading
+import weakref
 from asyncio import Future
-from typing import Any, Callable, List
+from typing import Any, Callable, Dict
+
+from ._timer_wheel import TimerWheel
+
+# The timer wheel that runs the deadlines of the tokens in each event loop.
+_deadline_timers: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, TimerWheel]" = weakref.WeakKeyDictionary()
 
 
 class CancellationToken:
-    def __init__(self) -> None:
+    """A token used to cancel pending async calls.
+
+    Tokens form a tree: a token created with a ``parent`` is cancelled when its parent is, so cancelling the token
+    of a team also cancels the tokens it handed to its agents and their tool calls. Cancelling a child does not
+    cancel its parent.
+
+    Args:
+        parent (CancellationToken, optional): Cancel this token when the parent is cancelled. If the parent is
+            already cancelled, this token starts cancelled.
+        timeout (float, optional): Cancel this token after this many seconds. The token must then be created in a
+            running event loop. The deadlines of all tokens in an event loop share one timer, so a token is
+            cancelled up to 0.1 seconds after its deadline.
+    """
+
+    def __init__(self, parent: "CancellationToken | None" = None, timeout: float | None = None) -> None:
         self._cancelled: bool = False
         self._lock: threading.Lock = threading.Lock()
-        self._callbacks: List[Callable[[], None]] = []
+        self._callbacks: Dict[int, Callable[[], None]] = {}
+        self._next_callback_key = 0
+        self._children: weakref.WeakSet[CancellationToken] = weakref.WeakSet()
+        self._deadline_loop: asyncio.AbstractEventLoop | None = None
+        if timeout is not None:
+            if timeout < 0:
+                raise ValueError("timeout must not be negative.")
+            loop = asyncio.get_running_loop()
+            timers = _deadline_timers.get(loop)
+            if timers is None:
+                timers = _deadline_timers[loop] = TimerWheel()
+            timers.add(self, loop.time() + timeout, self.cancel)
+            self._deadline_loop = loop
+        if parent is not None:
+            parent._add_child(self)
+
+    def child(self, timeout: float | None = None) -> "CancellationToken":
+        """Create a token that is cancelled when this token is, or after ``timeout`` seconds."""
+        return CancellationToken(parent=self, timeout=timeout)
 
     def cancel(self) -> None:
         with self._lock:
-            if not self._cancelled:
-                self._cancelled = True
-                for callback in self._callbacks:
-                    callback()
+            if self._cancelled:
+                return
+            self._cancelled = True
+            callbacks = list(self._callbacks.values())
+            self._callbacks.clear()
+            children = list(self._children)
+            self._children.clear()
+        self._remove_deadline()
+        for callback in callbacks:
+            callback()
+        for child in children:
+            child.cancel()
 
     def is_cancelled(self) -> bool:
         with self._lock:
             return self._cancelled
 
-    def add_callback(self, callback: Callable[[], None]) -> None:
+    def add_callback(self, callback: Callable[[], None]) -> Callable[[], None]:
+        """Call ``callback`` when the token is cancelled, or now if it already is.
+
+        Returns:
+            Callable[[], None]: A function that removes the callback, for when the call it cancels is done.
+        """
         with self._lock:
-            if self._cancelled:
-                callback()
-            else:
-                self._callbacks.append(callback)
+            if not self._cancelled:
+                key = self._next_callback_key
+                self._next_callback_key += 1
+                self._callbacks[key] = callback
+                return lambda: self._remove_callback(key)
+        callback()
+        return _noop
 
     def link_future(self, future: Future[Any]) -> Future[Any]:
-        with self._lock:
-            if self._cancelled:
-                future.cancel()
-            else:
+        """Cancel ``future`` when the token is cancelled. The link is removed once the future is done."""
 
-                def _cancel() -> None:
-                    future.cancel()
+        def _cancel() -> None:
+            future.cancel()
 
-                self._callbacks.append(_cancel)
+        remove = self.add_callback(_cancel)
+        if remove is not _noop:
+            future.add_done_callback(lambda _: remove())
         return future
+
+    def _remove_callback(self, key: int) -> None:
+        with self._lock:
+            self._callbacks.pop(key, None)
+
+    def _add_child(self, child: "CancellationToken") -> None:
+        with self._lock:
+            if not self._cancelled:
+                self._children.add(child)
+                return
+        child.cancel()
+
+    def _remove_deadline(self) -> None:
+        loop = self._deadline_loop
+        if loop is None:
+            return
+        self._deadline_loop = None
+        timers = _deadline_timers.get(loop)
+        if timers is None:
+            return
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+        # The timer wheel belongs to its event loop, which may be running in another thread.
+        if running_loop is loop:
+            timers.remove(self)
+        elif not loop.is_closed():
+            loop.call_soon_threadsafe(timers.remove, self)
+
+
+def _noop() -> None:
+    pass
@@ -0,0 +1,94 @@
+import asyncio
+import math
+from typing import Callable, Dict, Hashable, List, Tuple
+
+
+class TimerWheel:
+    """Calls callbacks at deadlines, with a precision of ``resolution`` seconds.
+
+    Timers are kept in a ring of slots, one per tick, so adding and removing a timer takes constant time however
+    many timers are pending, and a tick only looks at the timers in its slot. A timer further away than one turn of
+    the wheel stays in its slot until the turn it is due in. The wheel only schedules an event loop callback while
+    it has timers. Meant for many timeouts that are usually removed before they expire, such as request deadlines.
+
+    Args:
+        resolution (float, optional): Length of a tick in seconds. Timers fire up to one tick late. Defaults to 0.1.
+        num_slots (int, optional): Number of slots in the ring. Defaults to 512.
+    """
+
+    def __init__(self, resolution: float = 0.1, num_slots: int = 512) -> None:
+        if resolution <= 0:
+            raise ValueError("resolution must be positive.")
+        if num_slots < 1:
+            raise ValueError("num_slots must be at least 1.")
+        self._resolution = resolution
+        self._slots: List[Dict[Hashable, Tuple[int, Callable[[], None]]]] = [{} for _ in range(num_slots)]
+        # Slot of each timer by key.
+        self._slot_of: Dict[Hashable, int] = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._start = 0.0
+        # The last tick that was processed.
+        self._tick = 0
+        self._handle: asyncio.TimerHandle | None = None
+
+    def __len__(self) -> int:
+        return len(self._slot_of)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._slot_of
+
+    def add(self, key: Hashable, deadline: float, callback: Callable[[], None]) -> None:
+        """Call ``callback`` once the event loop time reaches ``deadline``, unless the timer is removed first.
+        Replaces a pending timer with the same key."""
+        self.remove(key)
+        if self._loop is None:
+            self._loop = asyncio.get_running_loop()
+            self._start = self._loop.time()
+        tick = max(math.ceil((deadline - self._start) / self._resolution), self._tick + 1)
+        slot = tick % len(self._slots)
+        self._slots[slot][key] = (tick, callback)
+        self._slot_of[key] = slot
+        if self._handle is None:
+            self._schedule()
+
+    def remove(self, key: Hashable) -> None:
+        """Remove a pending timer. Does nothing if there is none with the key."""
+        slot = self._slot_of.pop(key, None)
+        if slot is not None:
+            del self._slots[slot][key]
+            if not self._slot_of and self._handle is not None:
+                self._handle.cancel()
+                self._handle = None
+
+    def close(self) -> None:
+        """Remove all pending timers without calling them."""
+        for slot in self._slots:
+            slot.clear()
+        self._slot_of.clear()
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+
+    def _schedule(self) -> None:
+        assert self._loop is not None
+        self._handle = self._loop.call_at(self._start + (self._tick + 1) * self._resolution, self._on_tick)
+
+    def _on_tick(self) -> None:
+        assert self._loop is not None
+        self._handle = None
+        now_tick = math.floor((self._loop.time() - self._start) / self._resolution)
+        # Visit each slot at most once, even if the loop was blocked for more than a turn.
+        first_tick = max(self._tick + 1, now_tick - len(self._slots) + 1)
+        expired: List[Callable[[], None]] = []
+        for tick in range(first_tick, now_tick + 1):
+            slot = self._slots[tick % len(self._slots)]
+            for key, (due_tick, callback) in list(slot.items()):
+                if due_tick <= now_tick:
+                    del slot[key]
+                    del self._slot_of[key]
+                    expired.append(callback)
+        self._tick = max(self._tick, now_tick)
+        for callback in expired:
+            callback()
+        if self._slot_of and self._handle is None:
+            self._schedule()
@@ -2,6 +2,7 @@
     "CantHandleException",
     "UndeliverableException",
     "MessageDroppedException",
+    "StateConflictException",
 ]
 
 
@@ -17,5 +18,9 @@ class MessageDroppedException(Exception):
     """Raised when a message is dropped."""
 
 
+class StateConflictException(Exception):
+    """Raised when a state cannot be saved because it was saved elsewhere since it was last read."""
+
+
 class NotAccessibleError(Exception):
     """Tried to access a value that is not accessible. For example if it is remote cannot be accessed locally."""
@@ -4,7 +4,7 @@
 import re
 from io import BytesIO
 from pathlib import Path
-from typing import Any, cast
+from typing import Any, Dict, Tuple, cast
 
 import aiohttp
 from openai.types.chat import ChatCompletionContentPartImageParam
@@ -13,22 +13,81 @@
 from pydantic_core import core_schema
 from typing_extensions import Literal
 
+ImageFormat = Literal["PNG", "JPEG", "WEBP"]
+
+_MIME_TYPES = {"PNG": "image/png", "JPEG": "image/jpeg", "GIF": "image/gif", "WEBP": "image/webp"}
+
 
 class Image:
+    """An image that can be sent in messages and to models.
+
+    Encoded forms of the image are cached per format, so an image that is sent, serialized or counted many times
+    is only encoded once. An image created from encoded data, e.g. with :meth:`from_base64` or :meth:`from_file`,
+    keeps that data and uses it as is unless a different format is asked for, and is only decoded when
+    :attr:`image` is accessed. Data in formats other than PNG, JPEG, GIF and WebP is encoded again as PNG.
+
+    Treat an image as immutable: changes made in place to the PIL image in :attr:`image` are not reflected in the
+    cached encodings. Assign a new PIL image to :attr:`image` instead.
+
+    Args:
+        image (PIL.Image.Image): The image. It is converted to RGB.
+    """
+
     def __init__(self, image: PILImage.Image):
-        self.image: PILImage.Image = image.convert("RGB")
+        self._reset(image, data=None)
+
+    def _reset(self, source: PILImage.Image, data: bytes | None) -> None:
+        # The image as given or as opened from data; converted to RGB when first accessed.
+        self._source: PILImage.Image | None = source
+        self._image: PILImage.Image | None = None
+        # The data the image was created from, and its format. Only kept for formats that can be sent as they
+        # are; images in other formats, such as BMP or TIFF, are encoded again as PNG.
+        if source.format not in _MIME_TYPES:
+            data = None
+        self._data = data
+        self._data_format = source.format if data is not None else None
+        self._encoded: Dict[Tuple[str, int | None], bytes] = {}
+        self._base64: Dict[Tuple[str, int | None], str] = {}
+
+    @property
+    def image(self) -> PILImage.Image:
+        """The image as an RGB PIL image."""
+        if self._image is None:
+            assert self._source is not None
+            self._image = self._source.convert("RGB")
+            self._source = None
+        return self._image
+
+    @image.setter
+    def image(self, image: PILImage.Image) -> None:
+        self._reset(image, data=None)
+
+    @property
+    def size(self) -> Tuple[int, int]:
+        """The width and height of the image, without decoding it."""
+        if self._source is not None:
+            return self._source.size
+        return self.image.size
 
     @classmethod
     def from_pil(cls, pil_image: PILImage.Image) -> Image:
         return cls(pil_image)
 
+    @classmethod
+    def from_bytes(cls, data: bytes) -> Image:
+        """Create an image from encoded image data, such as the contents of a PNG file."""
+        image = cls.__new__(cls)
+        # Opening only reads the header; the image data is decoded when it is needed.
+        image._reset(PILImage.open(BytesIO(data)), data=data)
+        return image
+
     @classmethod
     def from_uri(cls, uri: str) -> Image:
-        if not re.match(r"data:image/(?:png|jpeg);base64,", uri):
+        if not re.match(r"data:image/(?:png|jpeg|webp|gif);base64,", uri):
             raise ValueError("Invalid URI format. It should be a base64 encoded image URI.")
 
         # A URI. Remove the prefix and decode the base64 string.
-        base64_data = re.sub(r"data:image/(?:png|jpeg);base64,", "", uri)
+        base64_data = re.sub(r"data:image/(?:png|jpeg|webp|gif);base64,", "", uri)
         return cls.from_base64(base64_data)
 
     @classmethod
@@ -36,21 +95,62 @@ async def from_url(cls, url: str) -> Image:
         async with aiohttp.ClientSession() as session:
             async with session.get(url) as response:
                 content = await response.read()
-                return cls(PILImage.open(content))
+                return cls.from_bytes(content)
 
     @classmethod
     def from_base64(cls, base64_str: str) -> Image:
-        return cls(PILImage.open(BytesIO(base64.b64decode(base64_str))))
-
-    def to_base64(self) -> str:
-        buffered = BytesIO()
-        self.image.save(buffered, format="PNG")
-        content = buffered.getvalue()
-        return base64.b64encode(content).decode("utf-8")
+        image = cls.from_bytes(base64.b64decode(base64_str))
+        if image._data is not None:
+            image._base64[image._resolve(None, None)] = base64_str
+        return image
 
     @classmethod
     def from_file(cls, file_path: Path) -> Image:
-        return cls(PILImage.open(file_path))
+        return cls.from_bytes(Path(file_path).read_bytes())
+
+    def _resolve(self, format: ImageFormat | None, quality: int | None) -> Tuple[str, int | None]:
+        if format is None:
+            format = cast(ImageFormat, self._data_format or "PNG") if quality is None else "JPEG"
+        # PNG is lossless.
+        return format, None if format == "PNG" else quality
+
+    def to_bytes(self, format: ImageFormat | None = None, quality: int | None = None) -> bytes:
+        """Return the encoded image.
+
+        Args:
+            format (ImageFormat | None, optional): The format to encode the image in: ``"PNG"``, ``"JPEG"`` or
+                ``"WEBP"``. JPEG and WebP are much smaller than PNG for photos and screenshots. Defaults to the
+                format of the data the image was created from if it is PNG, JPEG, GIF or WebP, or PNG.
+            quality (int | None, optional): Quality of lossy formats, from 1 (smallest) to 95 (best). Defaults to
+                the Pillow default. If given without a format, the image is encoded as JPEG.
+        """
+        key = self._resolve(format, quality)
+        if self._data is not None and key == (self._data_format, None):
+            return self._data
+        encoded = self._encoded.get(key)
+        if encoded is None:
+            buffered = BytesIO()
+            if key[1] is None:
+                self.image.save(buffered, format=key[0])
+            else:
+                self.image.save(buffered, format=key[0], quality=key[1])
+            encoded = buffered.getvalue()
+            self._encoded[key] = encoded
+        return encoded
+
+    def to_base64(self, format: ImageFormat | None = None, quality: int | None = None) -> str:
+        """Return the encoded image as a base64 string. See :meth:`to_bytes` for the arguments."""
+        key = self._resolve(format, quality)
+        base64_str = self._base64.get(key)
+        if base64_str is None:
+            base64_str = base64.b64encode(self.to_bytes(format, quality)).decode("utf-8")
+            self._base64[key] = base64_str
+        return base64_str
+
+    def to_data_uri(self, format: ImageFormat | None = None, quality: int | None = None) -> str:
+        """Return the encoded image as a base64 data URI. See :meth:`to_bytes` for the arguments."""
+        mime_type = _MIME_TYPES[self._resolve(format, quality)[0]]
+        return f"data:{mime_type};base64,{self.to_base64(format, quality)}"
 
     def _repr_html_(self) -> str:
         # Show the image in Jupyter notebook
@@ -58,10 +158,16 @@ def _repr_html_(self) -> str:
 
     @property
     def data_uri(self) -> str:
-        return _convert_base64_to_data_uri(self.to_base64())
+        return self.to_data_uri()
 
-    def to_openai_format(self, detail: Literal["auto", "low", "high"] = "auto") -> ChatCompletionContentPartImageParam:
-        return {"type": "image_url", "image_url": {"url": self.data_uri, "detail": detail}}
+    def to_openai_format(
+        self,
+        detail: Literal["auto", "low", "high"] = "auto",
+        *,
+        format: ImageFormat | None = None,
+        quality: int | None = None,
+    ) -> ChatCompletionContentPartImageParam:
+        return {"type": "image_url", "image_url": {"url": self.to_data_uri(format, quality), "detail": detail}}
 
     @classmethod
     def __get_pydantic_core_schema__(cls, source_type: Any, handler: GetCoreSchemaHandler) -> core_schema.CoreSchema:
@@ -86,23 +192,3 @@ def serialize(value: Image) -> dict[str, Any]:
             core_schema.any_schema(),  # Accept any type; adjust if needed
             serialization=core_schema.plain_serializer_function_ser_schema(serialize),
         )
-
-
-def _convert_base64_to_data_uri(base64_image: str) -> str:
-    def _get_mime_type_from_data_uri(base64_image: str) -> str:
-        # Decode the base64 string
-        image_data = base64.b64decode(base64_image)
-        # Check the first few bytes for known signatures
-        if image_data.startswith(b"\xff\xd8\xff"):
-            return "image/jpeg"
-        elif image_data.startswith(b"\x89PNG\r\n\x1a\n"):
-            return "image/png"
-        elif image_data.startswith(b"GIF87a") or image_data.startswith(b"GIF89a"):
-            return "image/gif"
-        elif image_data.startswith(b"RIFF") and image_data[8:12] == b"WEBP":
-            return "image/webp"
-        return "image/jpeg"  # use jpeg for unknown formats, best guess.
-
-    mime_type = _get_mime_type_from_data_uri(base64_image)
-    data_uri = f"data:{mime_type};base64,{base64_image}"
-    return data_uri
@@ -5,9 +5,10 @@
     Any,
     Callable,
     Coroutine,
-    DefaultDict,
+    Dict,
     List,
     Literal,
+    Mapping,
     Protocol,
     Sequence,
     Tuple,
@@ -29,6 +30,14 @@
 ReceivesT = TypeVar("ReceivesT")
 ProducesT = TypeVar("ProducesT", covariant=True)
 
+
+def _is_target_type(value_type: Type[Any], target_types: Sequence[Any]) -> bool:
+    """Check whether a type is one of the target types or a subclass of one."""
+    if value_type in target_types:
+        return True
+    return any(isinstance(t, type) and issubclass(value_type, t) for t in target_types)
+
+
 # TODO: Generic typevar bound binding U to agent type
 # Can't do because python doesnt support it
 
@@ -139,7 +148,7 @@ def decorator(
 
         @wraps(func)
         async def wrapper(self: AgentT, message: ReceivesT, ctx: MessageContext) -> ProducesT:
-            if type(message) not in target_types:
+            if not _is_target_type(type(message), target_types):
                 if strict:
                     raise CantHandleException(f"Message type {type(message)} not in target types {target_types}")
                 else:
@@ -147,7 +156,7 @@ async def wrapper(self: AgentT, message: ReceivesT, ctx: MessageContext) -> Prod
 
             return_value = await func(self, message, ctx)
 
-            if AnyType not in return_types and type(return_value) not in return_types:
+            if AnyType not in return_types and not _is_target_type(type(return_value), return_types):
                 if strict:
                     raise ValueError(f"Return type {type(return_value)} not in return types {return_types}")
                 else:
@@ -258,7 +267,7 @@ def decorator(
 
         @wraps(func)
         async def wrapper(self: AgentT, message: ReceivesT, ctx: MessageContext) -> None:
-            if type(message) not in target_types:
+            if not _is_target_type(type(message), target_types):
                 if strict:
                     raise CantHandleException(f"Message type {type(message)} not in target types {target_types}")
                 else:
@@ -379,7 +388,7 @@ def decorator(
 
         @wraps(func)
         async def wrapper(self: AgentT, message: ReceivesT, ctx: MessageContext) -> ProducesT:
-            if type(message) not in target_types:
+            if not _is_target_type(type(message), target_types):
                 if strict:
                     raise CantHandleException(f"Message type {type(message)} not in target types {target_types}")
                 else:
@@ -387,7 +396,7 @@ async def wrapper(self: AgentT, message: ReceivesT, ctx: MessageContext) -> Prod
 
             return_value = await func(self, message, ctx)
 
-            if AnyType not in return_types and type(return_value) not in return_types:
+            if AnyType not in return_types and not _is_target_type(type(return_value), return_types):
                 if strict:
                     raise ValueError(f"Return type {type(return_value)} not in return types {return_types}")
                 else:
@@ -440,26 +449,25 @@ async def handle_special_rpc_message(self, message: MessageWithContent, ctx: Mes
                 return Response()
     """
 
-    def __init__(self, description: str) -> None:
-        # Self is already bound to the handlers
-        self._handlers: DefaultDict[
-            Type[Any],
-            List[MessageHandler[RoutedAgent, Any, Any]],
-        ] = DefaultDict(list)
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        # Handler tables are built on first use and are not shared between subclasses.
+        cls._handler_table = None
+        cls._handler_lookup_cache = {}
 
-        handlers = self._discover_handlers()
-        for message_handler in handlers:
-            for target_type in message_handler.target_types:
-                self._handlers[target_type].append(message_handler)
+    _handler_table: Dict[Type[Any], List[MessageHandler[Any, Any, Any]]] | None = None
+    _handler_lookup_cache: Dict[Type[Any], List[MessageHandler[Any, Any, Any]] | None] = {}
 
+    def __init__(self, description: str) -> None:
+        # The handler table is shared by all instances of the class.
+        self._handlers: Mapping[Type[Any], List[MessageHandler[Any, Any, Any]]] = self._get_handler_table()
         super().__init__(description)
 
     async def on_message(self, message: Any, ctx: MessageContext) -> Any | None:
         """Handle a message by routing it to the appropriate message handler.
         Do not override this method in subclasses. Instead, add message handlers as methods decorated with
         either the :func:`event` or :func:`rpc` decorator."""
-        key_type: Type[Any] = type(message)  # type: ignore
-        handlers = self._handlers.get(key_type)  # type: ignore
+        handlers = self._find_handlers(type(message))
         if handlers is not None:
             # Iterate over all handlers for this matching message type.
             # Call the first handler whose router returns True and then return the result.
@@ -484,6 +492,36 @@ def _discover_handlers(cls) -> Sequence[MessageHandler[Any, Any, Any]]:
                     handlers.append(cast(MessageHandler[Any, Any, Any], handler))
         return handlers
 
+    @classmethod
+    def _get_handler_table(cls) -> Dict[Type[Any], List[MessageHandler[Any, Any, Any]]]:
+        """Return the handlers of the class keyed by target type, discovering them on first use."""
+        table = cls.__dict__.get("_handler_table")
+        if table is None:
+            table = {}
+            for handler in cls._discover_handlers():
+                for target_type in handler.target_types:
+                    table.setdefault(target_type, []).append(handler)
+            cls._handler_table = table
+        return table
+
+    @classmethod
+    def _find_handlers(cls, message_type: Type[Any]) -> List[MessageHandler[Any, Any, Any]] | None:
+        """Return the handlers for a message type, falling back to the handlers of its closest
+        base class. Results are cached per class."""
+        cache = cls._handler_lookup_cache
+        try:
+            return cache[message_type]
+        except KeyError:
+            pass
+        table = cls._get_handler_table()
+        handlers: List[MessageHandler[Any, Any, Any]] | None = None
+        for base in message_type.__mro__:
+            handlers = table.get(base)
+            if handlers is not None:
+                break
+        cache[message_type] = handlers
+        return handlers
+
     @classmethod
     def _handles_types(cls) -> List[Tuple[Type[Any], List[MessageSerializer[Any]]]]:
         # TODO handle deduplication
@@ -225,7 +225,7 @@ def calculate_vision_tokens(image: Image, detail: str = "auto") -> int:
     if detail == "low":
         return BASE_TOKEN_COUNT
 
-    width, height = image.image.size
+    width, height = image.size
 
     # Scale down to fit within a MAX_LONG_EDGE x MAX_LONG_EDGE square if necessary
 
@@ -46,17 +46,10 @@ async def tool_agent_caller_loop(
     # Keep iterating until the model stops generating tool calls.
     while isinstance(response.content, list) and all(isinstance(item, FunctionCall) for item in response.content):
         # Execute functions called by the model by sending messages to tool agent.
-        results: List[FunctionExecutionResult | BaseException] = await asyncio.gather(
-            *[
-                caller.send_message(
-                    message=call,
-                    recipient=tool_agent_id,
-                    cancellation_token=cancellation_token,
-                )
-                for call in response.content
-            ],
-            return_exceptions=True,
+        futures = await caller.send_messages(
+            [(call, tool_agent_id) for call in response.content], cancellation_token=cancellation_token
         )
+        results: List[FunctionExecutionResult | BaseException] = await asyncio.gather(*futures, return_exceptions=True)
         # Combine the results into a single response and handle exceptions.
         function_results: List[FunctionExecutionResult] = []
         for result in results:
@@ -4,6 +4,7 @@
 import pytest
 from autogen_core.application import SingleThreadedAgentRuntime
 from autogen_core.base import AgentId, AgentInstantiationContext, CancellationToken, MessageContext
+from autogen_core.base._cancellation_token import _deadline_timers  # type: ignore[reportPrivateUsage]
 from autogen_core.components import RoutedAgent, message_handler
 
 
@@ -150,3 +151,58 @@ async def test_nested_cancellation_inner_called() -> None:
     long_running_agent = await runtime.try_get_underlying_agent_instance(long_running_id, type=LongRunningAgent)
     assert long_running_agent.called
     assert long_running_agent.cancelled
+
+
+@pytest.mark.asyncio
+async def test_link_future_removes_callback_when_done() -> None:
+    token = CancellationToken()
+    for _ in range(100):
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        token.link_future(future)
+        future.set_result(None)
+    await asyncio.sleep(0)
+    assert len(token._callbacks) == 0  # type: ignore[reportPrivateUsage]
+
+    pending: asyncio.Future[None] = token.link_future(asyncio.get_running_loop().create_future())
+    remove = token.add_callback(lambda: None)
+    assert len(token._callbacks) == 2  # type: ignore[reportPrivateUsage]
+    remove()
+    token.cancel()
+    assert pending.cancelled()
+
+
+@pytest.mark.asyncio
+async def test_child_tokens() -> None:
+    parent = CancellationToken()
+    child = parent.child()
+    grandchild = CancellationToken(parent=child)
+    sibling = parent.child()
+
+    sibling.cancel()
+    assert not parent.is_cancelled()
+    assert not child.is_cancelled()
+
+    parent.cancel()
+    assert child.is_cancelled()
+    assert grandchild.is_cancelled()
+    # A child of a cancelled token starts cancelled.
+    assert parent.child().is_cancelled()
+
+
+@pytest.mark.asyncio
+async def test_token_timeout() -> None:
+    token = CancellationToken(timeout=0.05)
+    child = token.child()
+    sleep = token.link_future(asyncio.ensure_future(asyncio.sleep(10)))
+    with pytest.raises(asyncio.CancelledError):
+        await sleep
+    assert token.is_cancelled()
+    assert child.is_cancelled()
+
+    # Cancelling a token removes its deadline.
+    token = CancellationToken(timeout=10)
+    token.cancel()
+    assert token not in _deadline_timers[asyncio.get_running_loop()]
+
+    with pytest.raises(ValueError):
+        CancellationToken(timeout=-1)
@@ -0,0 +1,32 @@
+from autogen_core.application._hash_ring import ConsistentHashRing
+
+
+def test_hash_ring_moves_few_keys() -> None:
+    ring = ConsistentHashRing[int]()
+    assert ring.get("key") is None
+    ring.add(1)
+    ring.add(2)
+    ring.add(3)
+    keys = [f"key{i}" for i in range(1000)]
+    before = {key: ring.get(key) for key in keys}
+    assert set(before.values()) == {1, 2, 3}
+
+    # Only the keys of the removed node move.
+    ring.remove(2)
+    after = {key: ring.get(key) for key in keys}
+    assert all(after[key] == node for key, node in before.items() if node != 2)
+    assert set(after.values()) == {1, 3}
+
+    # Adding a node back restores the original assignment.
+    ring.add(2)
+    assert {key: ring.get(key) for key in keys} == before
+
+
+def test_hash_ring_copy_is_independent() -> None:
+    ring = ConsistentHashRing[int]()
+    ring.add(1)
+    copy = ring.copy()
+    copy.add(2)
+    assert list(ring) == [1]
+    assert list(copy) == [1, 2]
+    assert all(ring.get(f"key{i}") == 1 for i in range(100))
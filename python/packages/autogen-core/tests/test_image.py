@@ -0,0 +1,77 @@
+import base64
+from io import BytesIO
+from pathlib import Path
+
+from autogen_core.components import Image
+from PIL import Image as PILImage
+from pydantic import BaseModel
+
+
+def encode(pil_image: PILImage.Image, format: str) -> bytes:
+    buffered = BytesIO()
+    pil_image.save(buffered, format=format)
+    return buffered.getvalue()
+
+
+def test_encodings_are_cached() -> None:
+    image = Image(PILImage.new("RGBA", (64, 32), (255, 0, 0, 128)))
+    assert image.size == (64, 32)
+    base64_str = image.to_base64()
+    assert image.to_base64() is base64_str
+    assert image.to_bytes("JPEG", quality=50) is image.to_bytes("JPEG", quality=50)
+    assert image.data_uri.startswith("data:image/png;base64,")
+    assert image.image.mode == "RGB"
+
+
+def test_original_data_is_kept() -> None:
+    data = encode(PILImage.new("RGB", (20, 10), (0, 128, 255)), "JPEG")
+    base64_str = base64.b64encode(data).decode("utf-8")
+    image = Image.from_base64(base64_str)
+    # Nothing is decoded or encoded again.
+    assert image.size == (20, 10)
+    assert image.to_base64() is base64_str
+    assert image.to_bytes() == data
+    assert image.data_uri == f"data:image/jpeg;base64,{base64_str}"
+    assert Image.from_uri(image.data_uri).to_bytes() == data
+    # Other formats are encoded from the decoded image.
+    assert image.to_bytes("PNG").startswith(b"\x89PNG")
+
+
+def test_from_file(tmp_path: Path) -> None:
+    data = encode(PILImage.new("RGB", (8, 8)), "PNG")
+    file_path = tmp_path / "image.png"
+    file_path.write_bytes(data)
+    image = Image.from_file(file_path)
+    assert image.to_bytes() == data
+    assert image.image.size == (8, 8)
+
+
+def test_other_formats_are_sent_as_png() -> None:
+    for format in ("BMP", "TIFF"):
+        data = encode(PILImage.new("RGB", (8, 8), (0, 128, 255)), format)
+        image = Image.from_base64(base64.b64encode(data).decode("utf-8"))
+        assert image.to_bytes().startswith(b"\x89PNG")
+        url = image.to_openai_format()["image_url"]["url"]
+        assert url.startswith("data:image/png;base64,")
+        assert base64.b64decode(url.split(",", 1)[1]).startswith(b"\x89PNG")
+
+
+def test_lossy_formats() -> None:
+    image = Image(PILImage.effect_noise((256, 256), 64).convert("RGB"))
+    png = image.to_bytes()
+    jpeg = image.to_bytes("JPEG", quality=30)
+    webp = image.to_bytes("WEBP", quality=30)
+    assert len(jpeg) < len(png)
+    assert len(webp) < len(png)
+    assert PILImage.open(BytesIO(webp)).format == "WEBP"
+    assert image.to_openai_format(format="WEBP", quality=30)["image_url"]["url"].startswith("data:image/webp;base64,")
+
+
+def test_pydantic_round_trip_keeps_data() -> None:
+    class ImageMessage(BaseModel):
+        image: Image
+
+    data = encode(PILImage.new("RGB", (16, 16)), "JPEG")
+    message = ImageMessage(image=Image.from_bytes(data))
+    deserialized = ImageMessage.model_validate_json(message.model_dump_json())
+    assert deserialized.image.to_bytes() == data
@@ -0,0 +1,65 @@
+import asyncio
+from typing import List
+
+import pytest
+from autogen_core.application import MessageBatchingConfig
+from autogen_core.application._message_batching import batch_messages, unbatch
+from autogen_core.application.protos import agent_worker_pb2
+
+
+def make_message(index: int, size: int = 0) -> agent_worker_pb2.Message:
+    return agent_worker_pb2.Message(
+        event=agent_worker_pb2.Event(
+            topic_type=str(index), payload=agent_worker_pb2.Payload(data=b"x" * size), topic_source="default"
+        )
+    )
+
+
+async def read_frames(
+    messages: List[agent_worker_pb2.Message], config: MessageBatchingConfig, enabled: bool = True
+) -> List[agent_worker_pb2.Message]:
+    queue: asyncio.Queue[agent_worker_pb2.Message] = asyncio.Queue()
+    for message in messages:
+        queue.put_nowait(message)
+    frames: List[agent_worker_pb2.Message] = []
+    received = 0
+    async for frame in batch_messages(queue, config, enabled=lambda: enabled):
+        frames.append(frame)
+        received += len(list(unbatch(frame)))
+        if received == len(messages):
+            break
+    return frames
+
+
+@pytest.mark.asyncio
+async def test_queued_messages_are_batched() -> None:
+    messages = [make_message(i) for i in range(10)]
+    frames = await read_frames(messages, MessageBatchingConfig(max_messages=4))
+    assert [len(frame.batch.messages) for frame in frames] == [4, 4, 2]
+    assert [message for frame in frames for message in unbatch(frame)] == messages
+
+
+@pytest.mark.asyncio
+async def test_batches_respect_max_bytes() -> None:
+    messages = [make_message(0, 100), make_message(1, 100), make_message(2, 1000), make_message(3, 10)]
+    frames = await read_frames(messages, MessageBatchingConfig(max_bytes=500))
+    # The large message does not fit with the others and is sent on its own, unbatched.
+    assert [frame.WhichOneof("message") for frame in frames] == ["batch", "event", "event"]
+    assert [message for frame in frames for message in unbatch(frame)] == messages
+
+
+@pytest.mark.asyncio
+async def test_messages_are_not_batched_until_enabled() -> None:
+    messages = [make_message(i) for i in range(3)]
+    frames = await read_frames(messages, MessageBatchingConfig(), enabled=False)
+    assert frames == messages
+
+
+@pytest.mark.asyncio
+async def test_linger_waits_for_more_messages() -> None:
+    queue: asyncio.Queue[agent_worker_pb2.Message] = asyncio.Queue()
+    frames = batch_messages(queue, MessageBatchingConfig(linger=0.5))
+    queue.put_nowait(make_message(0))
+    asyncio.get_running_loop().call_later(0.05, queue.put_nowait, make_message(1))
+    frame = await anext(frames)
+    assert len(frame.batch.messages) == 2
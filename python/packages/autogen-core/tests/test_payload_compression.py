@@ -0,0 +1,51 @@
+import os
+
+import pytest
+from autogen_core.application import PayloadCompressionConfig
+from autogen_core.application._payload_compression import compress_payload_data, decompress_payload_data
+from autogen_core.application.protos import agent_worker_pb2
+
+
+def round_trip(data: bytes, config: PayloadCompressionConfig | None) -> agent_worker_pb2.Payload:
+    compressed, encoding = compress_payload_data(data, config)
+    payload = agent_worker_pb2.Payload(data=compressed, data_content_encoding=encoding)
+    assert decompress_payload_data(payload) == data
+    return payload
+
+
+def test_gzip_above_threshold() -> None:
+    data = b'{"content": "' + b"hello world " * 1000 + b'"}'
+    payload = round_trip(data, PayloadCompressionConfig(threshold=1024))
+    assert payload.data_content_encoding == "gzip"
+    assert len(payload.data) < len(data)
+
+
+def test_small_payload_not_compressed() -> None:
+    data = b"hello world " * 10
+    payload = round_trip(data, PayloadCompressionConfig(threshold=1024))
+    assert payload.data_content_encoding == ""
+    assert payload.data == data
+
+
+def test_incompressible_payload_not_compressed() -> None:
+    data = os.urandom(4096)
+    payload = round_trip(data, PayloadCompressionConfig(threshold=1024))
+    assert payload.data_content_encoding == ""
+
+
+def test_no_compression() -> None:
+    data = b"hello world " * 10000
+    payload = round_trip(data, None)
+    assert payload.data_content_encoding == ""
+
+
+def test_unsupported_encoding() -> None:
+    with pytest.raises(ValueError):
+        decompress_payload_data(agent_worker_pb2.Payload(data=b"data", data_content_encoding="br"))
+
+
+def test_invalid_config() -> None:
+    with pytest.raises(ValueError):
+        PayloadCompressionConfig(threshold=-1)
+    with pytest.raises(ValueError):
+        PayloadCompressionConfig(algorithm="br")  # type: ignore[arg-type]
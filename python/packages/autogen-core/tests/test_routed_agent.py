@@ -207,3 +207,39 @@ async def test_rpc() -> None:
     agent = await runtime.try_get_underlying_agent_instance(agent_id, type=RPCAgent)
     assert agent.num_calls[0] == 1
     assert agent.num_calls[1] == 1
+
+
+@dataclass
+class DerivedTestMessage(TestMessage): ...
+
+
+class DerivedRPCAgent(RPCAgent):
+    pass
+
+
+@pytest.mark.asyncio
+async def test_handler_table_is_shared_per_class() -> None:
+    runtime = SingleThreadedAgentRuntime()
+    await runtime.register("counter", RPCAgent)
+    await runtime.register("derived", DerivedRPCAgent)
+
+    agent1 = await runtime.try_get_underlying_agent_instance(AgentId("counter", "1"), type=RPCAgent)
+    agent2 = await runtime.try_get_underlying_agent_instance(AgentId("counter", "2"), type=RPCAgent)
+    derived = await runtime.try_get_underlying_agent_instance(AgentId("derived", "1"), type=DerivedRPCAgent)
+    assert agent1._handlers is agent2._handlers  # type: ignore[reportPrivateUsage]
+    assert derived._handlers is not agent1._handlers  # type: ignore[reportPrivateUsage]
+    assert list(derived._handlers) == [TestMessage]  # type: ignore[reportPrivateUsage]
+
+
+@pytest.mark.asyncio
+async def test_subclass_message_routes_to_base_type_handler() -> None:
+    runtime = SingleThreadedAgentRuntime()
+    await runtime.register("counter", RPCAgent)
+    agent_id = AgentId(type="counter", key="default")
+
+    runtime.start()
+    response = await runtime.send_message(DerivedTestMessage("two"), recipient=agent_id)
+    await runtime.stop_when_idle()
+    assert response == DerivedTestMessage("two")
+    agent = await runtime.try_get_underlying_agent_instance(agent_id, type=RPCAgent)
+    assert agent.num_calls == [0, 1]
@@ -1,26 +1,38 @@
 import asyncio
 import logging
+from typing import List
 
 import pytest
 from autogen_core.application import SingleThreadedAgentRuntime
+from autogen_core.application._agent_mailbox import AgentMailboxes
+from autogen_core.application.logging import EVENT_LOGGER_NAME, set_event_sample_rate
+from autogen_core.application.logging.events import DeliveryStage, MessageEvent, MessageKind
+from autogen_core.application.telemetry import HistogramSnapshot
 from autogen_core.base import (
     AgentId,
     AgentInstantiationContext,
+    AgentRuntime,
     AgentType,
+    CancellationToken,
     Subscription,
     SubscriptionInstantiationContext,
     TopicId,
     try_get_known_serializers_for_type,
 )
+from autogen_core.base.exceptions import UndeliverableException
 from autogen_core.components import (
     DefaultTopicId,
     TypeSubscription,
     type_subscription,
 )
+from opentelemetry.sdk.metrics import MeterProvider
+from opentelemetry.sdk.metrics.export import InMemoryMetricReader
 from opentelemetry.sdk.trace import TracerProvider
 from test_utils import (
     CascadingAgent,
     CascadingMessageType,
+    ConcurrencyTrackingAgent,
+    ContentMessage,
     LoopbackAgent,
     LoopbackAgentWithDefaultSubscription,
     MessageType,
@@ -92,6 +104,32 @@ async def test_register_receives_publish(tracer_provider: TracerProvider) -> Non
     ]
 
 
+@pytest.mark.asyncio
+async def test_trace_sampling_follows_parent(tracer_provider: TracerProvider) -> None:
+    runtime = SingleThreadedAgentRuntime(tracer_provider=tracer_provider, trace_sampling_ratio=0.0)
+    runtime.add_message_serializer(try_get_known_serializers_for_type(MessageType))
+    await LoopbackAgentWithDefaultSubscription.register(runtime, "name", LoopbackAgentWithDefaultSubscription)
+    runtime.start()
+
+    # Traces started by the runtime are not sampled.
+    await runtime.publish_message(MessageType(), topic_id=DefaultTopicId())
+    await runtime.stop_when_idle()
+    assert test_exporter.get_exported_spans() == []
+
+    # Traces started by a sampled parent are.
+    runtime.start()
+    with tracer_provider.get_tracer("test").start_as_current_span("parent"):
+        await runtime.publish_message(MessageType(), topic_id=DefaultTopicId())
+    await runtime.stop_when_idle()
+    span_names = [span.name for span in test_exporter.get_exported_spans()]
+    assert span_names == [
+        "autogen create default.(default)-T",
+        "parent",
+        "autogen process name.(default)-A",
+        "autogen publish default.(default)-T",
+    ]
+
+
 @pytest.mark.asyncio
 async def test_register_receives_publish_with_exception(caplog: pytest.LogCaptureFixture) -> None:
     runtime = SingleThreadedAgentRuntime()
@@ -306,3 +344,332 @@ async def test_default_subscription_publish_to_other_source() -> None:
         AgentId("name", key="other"), type=LoopbackAgentWithDefaultSubscription
     )
     assert other_long_running_agent.num_calls == 1
+
+
+@pytest.mark.asyncio
+async def test_message_priority() -> None:
+    runtime = SingleThreadedAgentRuntime(
+        message_priority=lambda envelope: 0 if envelope.topic_id.type == "urgent" else 1  # type: ignore[union-attr]
+    )
+
+    await runtime.publish_message(MessageType(), topic_id=TopicId("normal", "1"))
+    await runtime.publish_message(MessageType(), topic_id=TopicId("urgent", "1"))
+    await runtime.publish_message(MessageType(), topic_id=TopicId("normal", "2"))
+    await runtime.publish_message(MessageType(), topic_id=TopicId("urgent", "2"))
+
+    queued = [envelope.topic_id for envelope in runtime.unprocessed_messages]  # type: ignore[union-attr]
+    assert queued == [TopicId("urgent", "1"), TopicId("urgent", "2"), TopicId("normal", "1"), TopicId("normal", "2")]
+
+    runtime.start()
+    await runtime.stop_when_idle()
+    assert len(runtime.unprocessed_messages) == 0
+
+
+@pytest.mark.asyncio
+async def test_fair_scheduling() -> None:
+    runtime = SingleThreadedAgentRuntime(fair_scheduling=True)
+
+    for i in range(3):
+        await runtime.publish_message(MessageType(), topic_id=TopicId("busy", str(i)))
+    await runtime.publish_message(MessageType(), topic_id=TopicId("quiet", "0"))
+
+    order: List[str] = []
+    while len(runtime.unprocessed_messages) > 0:
+        envelope = runtime._message_queue.get()  # type: ignore[reportPrivateUsage]
+        order.append(envelope.topic_id.type)  # type: ignore[union-attr]
+    assert order == ["busy", "quiet", "busy", "busy"]
+
+
+@pytest.mark.asyncio
+async def test_idle_runtime_does_not_poll() -> None:
+    runtime = SingleThreadedAgentRuntime()
+    await LoopbackAgentWithDefaultSubscription.register(runtime, "name", LoopbackAgentWithDefaultSubscription)
+
+    num_process_next_calls = 0
+    process_next = runtime.process_next
+
+    async def counting_process_next() -> None:
+        nonlocal num_process_next_calls
+        num_process_next_calls += 1
+        await process_next()
+
+    runtime.process_next = counting_process_next  # type: ignore[method-assign]
+    runtime.start()
+    await asyncio.sleep(0.1)
+    assert num_process_next_calls == 0
+
+    await runtime.publish_message(MessageType(), topic_id=DefaultTopicId())
+    await runtime.stop_when_idle()
+    assert num_process_next_calls == 1
+
+    agent = await runtime.try_get_underlying_agent_instance(
+        AgentId("name", "default"), type=LoopbackAgentWithDefaultSubscription
+    )
+    assert agent.num_calls == 1
+
+
+@pytest.mark.asyncio
+async def test_queue_full_fail_policy() -> None:
+    runtime = SingleThreadedAgentRuntime(max_queue_size=2, max_queue_size_per_agent_type=1, queue_full_policy="fail")
+
+    await runtime.publish_message(MessageType(), topic_id=TopicId("a", "default"))
+    await runtime.publish_message(MessageType(), topic_id=TopicId("b", "default"))
+    # Per agent type limit.
+    with pytest.raises(UndeliverableException):
+        await runtime.publish_message(MessageType(), topic_id=TopicId("a", "default"))
+    # Runtime limit.
+    with pytest.raises(UndeliverableException):
+        await runtime.publish_message(MessageType(), topic_id=TopicId("c", "default"))
+    assert runtime.rejected_messages == 2
+    assert len(runtime.unprocessed_messages) == 2
+
+    runtime.start()
+    await runtime.stop_when_idle()
+    await runtime.publish_message(MessageType(), topic_id=TopicId("a", "default"))
+    assert runtime.rejected_messages == 2
+
+
+@pytest.mark.asyncio
+async def test_queue_full_wait_policy() -> None:
+    runtime = SingleThreadedAgentRuntime(max_queue_size=1)
+    await LoopbackAgentWithDefaultSubscription.register(runtime, "name", LoopbackAgentWithDefaultSubscription)
+
+    await runtime.publish_message(MessageType(), topic_id=DefaultTopicId())
+    blocked = asyncio.create_task(runtime.publish_message(MessageType(), topic_id=DefaultTopicId()))
+    await asyncio.sleep(0.01)
+    assert not blocked.done()
+    assert runtime.delayed_messages == 1
+
+    runtime.start()
+    await blocked
+    await runtime.stop_when_idle()
+
+    agent = await runtime.try_get_underlying_agent_instance(
+        AgentId("name", "default"), type=LoopbackAgentWithDefaultSubscription
+    )
+    assert agent.num_calls == 2
+    assert runtime.rejected_messages == 0
+
+
+class _EventCollector(logging.Handler):
+    def __init__(self) -> None:
+        super().__init__()
+        self.events: List[MessageEvent] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if isinstance(record.msg, MessageEvent):
+            self.events.append(record.msg)
+
+
+@pytest.mark.asyncio
+async def test_message_events() -> None:
+    event_logger = logging.getLogger(EVENT_LOGGER_NAME)
+    previous_level = event_logger.level
+    collector = _EventCollector()
+    event_logger.addHandler(collector)
+    try:
+        runtime = SingleThreadedAgentRuntime()
+        await LoopbackAgent.register(runtime, "name", LoopbackAgent)
+        runtime.start()
+
+        # Events are not built when the logger is disabled.
+        event_logger.setLevel(logging.WARNING)
+        await runtime.send_message(MessageType(), AgentId("name", "default"))
+        assert collector.events == []
+
+        event_logger.setLevel(logging.INFO)
+        await runtime.send_message(MessageType(), AgentId("name", "default"))
+        stages = [(e.kwargs["kind"], e.kwargs["delivery_stage"]) for e in collector.events]
+        assert stages == [
+            (MessageKind.DIRECT, DeliveryStage.SEND),
+            (MessageKind.DIRECT, DeliveryStage.DELIVER),
+            (MessageKind.RESPOND, DeliveryStage.DELIVER),
+        ]
+        assert "MessageType" in str(collector.events[0])
+
+        # Sampling at 0 drops all per-message events.
+        collector.events.clear()
+        set_event_sample_rate(0.0)
+        await runtime.send_message(MessageType(), AgentId("name", "default"))
+        assert collector.events == []
+        await runtime.stop()
+    finally:
+        set_event_sample_rate(1.0)
+        event_logger.removeHandler(collector)
+        event_logger.setLevel(previous_level)
+
+
+@pytest.mark.asyncio
+async def test_runtime_metrics() -> None:
+    reader = InMemoryMetricReader()
+    runtime = SingleThreadedAgentRuntime(meter_provider=MeterProvider(metric_readers=[reader]))
+    await LoopbackAgentWithDefaultSubscription.register(runtime, "loopback", LoopbackAgentWithDefaultSubscription)
+    await NoopAgent.register(runtime, "noop", NoopAgent)
+    runtime.start()
+    await runtime.publish_message(MessageType(), topic_id=DefaultTopicId())
+    await runtime.send_message(MessageType(), AgentId("loopback", "other"))
+    with pytest.raises(NotImplementedError):
+        await runtime.send_message(MessageType(), AgentId("noop", "default"))
+    await runtime.stop_when_idle()
+
+    snapshot = runtime.metrics.snapshot()
+    assert snapshot.queue_depth == 0
+    assert snapshot.max_queue_depth >= 1
+    # The published message, the two sent messages and the one response.
+    assert snapshot.queue_delay.count == 4
+    assert snapshot.handlers[("loopback", "MessageType")].calls == 2
+    assert snapshot.handlers[("loopback", "MessageType")].errors == 0
+    assert snapshot.handlers[("noop", "MessageType")].error_rate == 1.0
+    assert snapshot.error_rate == pytest.approx(1 / 3)
+    assert snapshot.publish_fan_out.count == 1
+    assert snapshot.publish_fan_out.max == 1
+    assert snapshot.agent_activations == {"loopback": 2, "noop": 1}
+
+    metrics_data = reader.get_metrics_data()
+    assert metrics_data is not None
+    names = {
+        metric.name
+        for resource_metrics in metrics_data.resource_metrics
+        for scope_metrics in resource_metrics.scope_metrics
+        for metric in scope_metrics.metrics
+    }
+    assert names == {
+        "autogen.runtime.queue.depth",
+        "autogen.runtime.queue.delay",
+        "autogen.runtime.handler.duration",
+        "autogen.runtime.handler.errors",
+        "autogen.runtime.publish.fan_out",
+        "autogen.runtime.agent.activations",
+    }
+
+
+def test_histogram_snapshot_quantile() -> None:
+    snapshot = HistogramSnapshot(
+        count=4, sum=6.5, min=0.5, max=3.0, boundaries=(1.0, 2.0, 5.0), bucket_counts=(1, 2, 1, 0)
+    )
+    assert snapshot.mean == 1.625
+    assert snapshot.quantile(0.25) == 1.0
+    assert snapshot.quantile(0.5) == 2.0
+    # The upper bound of the bucket is capped by the largest value.
+    assert snapshot.quantile(1.0) == 3.0
+
+
+@pytest.mark.asyncio
+async def test_agent_max_concurrency() -> None:
+    runtime = SingleThreadedAgentRuntime()
+    await ConcurrencyTrackingAgent.register(runtime, "sequential", ConcurrencyTrackingAgent, max_concurrency=1)
+    await ConcurrencyTrackingAgent.register(runtime, "bounded", ConcurrencyTrackingAgent, max_concurrency=3)
+    await ConcurrencyTrackingAgent.register(runtime, "unbounded", ConcurrencyTrackingAgent)
+    with pytest.raises(ValueError):
+        await ConcurrencyTrackingAgent.register(runtime, "invalid", ConcurrencyTrackingAgent, max_concurrency=0)
+    for agent_type in ("sequential", "bounded", "unbounded"):
+        await runtime.add_subscription(TypeSubscription("tracking", agent_type))
+    runtime.start()
+
+    for i in range(20):
+        await runtime.publish_message(ContentMessage(f"{i}"), topic_id=TopicId("tracking", "default"))
+    await runtime.stop_when_idle()
+    runtime.start()
+    sequential_id = AgentId("sequential", "default")
+    responses = await asyncio.gather(
+        *(runtime.send_message(ContentMessage(f"{i}"), sequential_id) for i in range(20, 30))
+    )
+    await runtime.stop_when_idle()
+
+    assert [response.content for response in responses] == [f"{i}" for i in range(20, 30)]
+    sequential = await runtime.try_get_underlying_agent_instance(sequential_id, ConcurrencyTrackingAgent)
+    assert sequential.contents == [f"{i}" for i in range(30)]
+    assert sequential.max_running == 1
+    bounded = await runtime.try_get_underlying_agent_instance(AgentId("bounded", "default"), ConcurrencyTrackingAgent)
+    assert bounded.max_running == 3
+    unbounded = await runtime.try_get_underlying_agent_instance(
+        AgentId("unbounded", "default"), ConcurrencyTrackingAgent
+    )
+    assert unbounded.max_running > 3
+    # The mailboxes of agents with no messages are dropped.
+    assert runtime._mailboxes._mailboxes == {}  # type: ignore[reportPrivateUsage]
+
+
+@pytest.mark.asyncio
+async def test_agent_mailbox_skips_released_waiters() -> None:
+    mailboxes = AgentMailboxes()
+    mailboxes.set_max_concurrency("agent", 1)
+    agent_id = AgentId("agent", "default")
+    first = mailboxes.reserve(agent_id)
+    second = mailboxes.reserve(agent_id)
+    third = mailboxes.reserve(agent_id)
+    await first.wait()
+    waiting_second = asyncio.create_task(second.wait())
+    waiting_third = asyncio.create_task(third.wait())
+    await asyncio.sleep(0)
+    assert mailboxes.queued(agent_id) == 2
+
+    # A message that is cancelled while it waits gives up its place.
+    waiting_second.cancel()
+    second.release()
+    assert mailboxes.queued(agent_id) == 1
+    first.release()
+    first.release()
+    await asyncio.wait_for(waiting_third, timeout=1)
+    third.release()
+    assert mailboxes._mailboxes == {}  # type: ignore[reportPrivateUsage]
+
+
+@pytest.mark.asyncio
+async def test_send_and_publish_messages(tracer_provider: TracerProvider) -> None:
+    runtime = SingleThreadedAgentRuntime(tracer_provider=tracer_provider)
+    await ConcurrencyTrackingAgent.register(runtime, "tracking", ConcurrencyTrackingAgent, max_concurrency=1)
+    await runtime.add_subscription(TypeSubscription("tracking", "tracking"))
+    runtime.start()
+
+    futures = await runtime.send_messages(
+        [(ContentMessage(f"{i}"), AgentId("tracking", str(i % 2))) for i in range(6)]
+        + [(ContentMessage("lost"), AgentId("unknown", "default"))]
+    )
+    results = await asyncio.gather(*futures, return_exceptions=True)
+    assert [result.content for result in results[:6]] == [f"{i}" for i in range(6)]  # type: ignore[union-attr]
+    assert isinstance(results[6], Exception)
+    # The batch is traced as one span, with the messages as its children.
+    batch_spans = [span for span in test_exporter.get_exported_spans() if span.name == "autogen create"]
+    assert len(batch_spans) == 1
+    assert batch_spans[0].attributes["messaging.batch.message_count"] == 7  # type: ignore[index]
+
+    await runtime.publish_messages([(ContentMessage(f"{i}"), TopicId("tracking", "0")) for i in range(6, 9)])
+    await runtime.stop_when_idle()
+    agent = await runtime.try_get_underlying_agent_instance(AgentId("tracking", "0"), ConcurrencyTrackingAgent)
+    assert agent.contents == ["0", "2", "4", "6", "7", "8"]
+
+
+@pytest.mark.asyncio
+async def test_send_messages_cancellation() -> None:
+    runtime = SingleThreadedAgentRuntime()
+    await ConcurrencyTrackingAgent.register(runtime, "tracking", ConcurrencyTrackingAgent, max_concurrency=1)
+    runtime.start()
+    cancellation_token = CancellationToken()
+    futures = await runtime.send_messages(
+        [(ContentMessage(f"{i}"), AgentId("tracking", "default")) for i in range(3)],
+        cancellation_token=cancellation_token,
+    )
+    cancellation_token.cancel()
+    results = await asyncio.gather(*futures, return_exceptions=True)
+    assert all(isinstance(result, asyncio.CancelledError) for result in results)
+    await runtime.stop()
+
+
+@pytest.mark.asyncio
+async def test_default_send_and_publish_messages() -> None:
+    # Runtimes that don't implement the batch methods get the ones of the protocol, which send one by one.
+    runtime = SingleThreadedAgentRuntime()
+    await ConcurrencyTrackingAgent.register(runtime, "tracking", ConcurrencyTrackingAgent)
+    await runtime.add_subscription(TypeSubscription("topic", "tracking"))
+    runtime.start()
+    agent_id = AgentId("tracking", "default")
+    futures = await AgentRuntime.send_messages(runtime, [(ContentMessage(f"{i}"), agent_id) for i in range(3)])
+    results = await asyncio.gather(*futures)
+    assert [result.content for result in results] == ["0", "1", "2"]
+    await AgentRuntime.publish_messages(
+        runtime, [(ContentMessage(f"{i}"), TopicId("topic", "default")) for i in range(3, 5)]
+    )
+    await runtime.stop_when_idle()
+    agent = await runtime.try_get_underlying_agent_instance(agent_id, ConcurrencyTrackingAgent)
+    assert sorted(agent.contents) == ["0", "1", "2", "3", "4"]
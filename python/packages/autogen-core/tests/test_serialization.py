@@ -1,10 +1,13 @@
-from dataclasses import dataclass
-from typing import Union
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Union
 
 import pytest
+from autogen_core.application.protos import agent_worker_pb2
 from autogen_core.base import (
     JSON_DATA_CONTENT_TYPE,
+    PROTOBUF_DATA_CONTENT_TYPE,
     MessageSerializer,
+    OrjsonMessageSerializer,
     SerializationRegistry,
     try_get_known_serializers_for_type,
 )
@@ -159,3 +162,110 @@ class PydanticImageMessage(BaseModel):
     assert deserialized.image.image.size == (100, 100)
     assert deserialized.image.image.mode == "RGB"
     assert deserialized.image.image == image.image
+
+
+def test_protobuf() -> None:
+    serde = SerializationRegistry()
+    serde.add_serializer(try_get_known_serializers_for_type(agent_worker_pb2.AgentId))
+    message = agent_worker_pb2.AgentId(type="type", key="key")
+    name = serde.type_name(message)
+    assert serde.data_content_type(name) == PROTOBUF_DATA_CONTENT_TYPE
+    data = serde.serialize(message, type_name=name, data_content_type=PROTOBUF_DATA_CONTENT_TYPE)
+    assert data == message.SerializeToString()
+    deserialized = serde.deserialize(data, type_name=name, data_content_type=PROTOBUF_DATA_CONTENT_TYPE)
+    assert deserialized == message
+
+
+def test_preferred_content_type() -> None:
+    class BinaryDataclassMessageSerializer(MessageSerializer[DataclassMessage]):
+        @property
+        def data_content_type(self) -> str:
+            return "application/octet-stream"
+
+        @property
+        def type_name(self) -> str:
+            return "DataclassMessage"
+
+        def deserialize(self, payload: bytes) -> DataclassMessage:
+            return DataclassMessage(message=payload.decode("utf-8"))
+
+        def serialize(self, message: DataclassMessage) -> bytes:
+            return message.message.encode("utf-8")
+
+    serde = SerializationRegistry()
+    assert serde.data_content_type("DataclassMessage") == JSON_DATA_CONTENT_TYPE
+    serde.add_serializer(try_get_known_serializers_for_type(DataclassMessage))
+    assert serde.data_content_type("DataclassMessage") == JSON_DATA_CONTENT_TYPE
+    serde.add_serializer(BinaryDataclassMessageSerializer())
+    # The binary encoding is preferred over JSON, unless the receiver asks for JSON.
+    assert serde.data_content_type("DataclassMessage") == "application/octet-stream"
+    assert serde.data_content_type("DataclassMessage", accept=JSON_DATA_CONTENT_TYPE) == JSON_DATA_CONTENT_TYPE
+    assert serde.data_content_type("DataclassMessage", accept="text/plain") == "application/octet-stream"
+
+
+@dataclass
+class TreeDataclassMessage:
+    value: int
+    children: List["TreeDataclassMessage"] = field(default_factory=list)
+
+
+@dataclass
+class NestedFieldsDataclassMessage:
+    message: str
+    nested: DataclassMessage
+    items: List[DataclassMessage]
+    optional: Optional[DataclassMessage]
+    by_key: Dict[str, DataclassMessage]
+    model: PydanticMessage
+    tree: TreeDataclassMessage
+
+
+def test_orjson_dataclass() -> None:
+    serde = SerializationRegistry()
+    serde.add_serializer(OrjsonMessageSerializer(DataclassMessage))
+
+    message = DataclassMessage(message="hello")
+    name = serde.type_name(message)
+    data = serde.serialize(message, type_name=name, data_content_type=JSON_DATA_CONTENT_TYPE)
+    assert data == b'{"message":"hello"}'
+    deserialized = serde.deserialize(data, type_name=name, data_content_type=JSON_DATA_CONTENT_TYPE)
+    assert deserialized == message
+    # The payload is plain JSON that the default serializer reads too.
+    assert DataclassJsonMessageSerializer(DataclassMessage).deserialize(data) == message
+
+
+def test_orjson_nested_dataclass() -> None:
+    serializer = OrjsonMessageSerializer(NestedFieldsDataclassMessage)
+    message = NestedFieldsDataclassMessage(
+        message="hello",
+        nested=DataclassMessage(message="nested"),
+        items=[DataclassMessage(message="item")],
+        optional=None,
+        by_key={"key": DataclassMessage(message="value")},
+        model=PydanticMessage(message="model"),
+        tree=TreeDataclassMessage(value=1, children=[TreeDataclassMessage(value=2)]),
+    )
+    deserialized = serializer.deserialize(serializer.serialize(message))
+    assert deserialized == message
+    assert isinstance(deserialized.items[0], DataclassMessage)
+    assert isinstance(deserialized.model, PydanticMessage)
+
+
+def test_orjson_pydantic() -> None:
+    serializer = OrjsonMessageSerializer(NestingPydanticMessage)
+    message = NestingPydanticMessage(message="hello", nested=PydanticMessage(message="world"))
+    data = serializer.serialize(message)
+    assert data == PydanticJsonMessageSerializer(NestingPydanticMessage).serialize(message)
+    assert serializer.deserialize(data) == message
+
+
+def test_orjson_union_of_dataclasses() -> None:
+    @dataclass
+    class UnionOfDataclassesMessage:
+        value: DataclassMessage | PydanticMessage
+
+    with pytest.raises(ValueError):
+        OrjsonMessageSerializer(UnionOfDataclassesMessage)
+    # A failed attempt must not leave a broken decoder behind.
+    with pytest.raises(ValueError):
+        OrjsonMessageSerializer(UnionOfDataclassesMessage)
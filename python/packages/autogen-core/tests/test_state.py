@@ -1,7 +1,17 @@
+import asyncio
+from pathlib import Path
 from typing import Any, Mapping
 
 import pytest
-from autogen_core.application import SingleThreadedAgentRuntime
+from autogen_core.application import (
+    InMemoryAgentStateStore,
+    InMemoryVersionedStateStore,
+    SingleThreadedAgentRuntime,
+    SqliteAgentStateStore,
+    SqliteVersionedStateStore,
+    StateWrite,
+    VersionedStateStore,
+)
 from autogen_core.base import AgentId, BaseAgent, MessageContext
 
 
@@ -10,8 +20,9 @@ def __init__(self) -> None:
         super().__init__("A stateful agent")
         self.state = 0
 
-    async def on_message(self, message: Any, ctx: MessageContext) -> None:
-        raise NotImplementedError
+    async def on_message(self, message: Any, ctx: MessageContext) -> int:
+        self.state += 1
+        return self.state
 
     async def save_state(self) -> Mapping[str, Any]:
         return {"state": self.state}
@@ -60,3 +71,79 @@ async def test_runtime_can_save_state() -> None:
 
     await runtime2.load_state(runtime_state)
     assert agent2.state == 1
+
+
+@pytest.mark.asyncio
+async def test_agents_are_passivated_when_over_capacity() -> None:
+    store = InMemoryAgentStateStore()
+    runtime = SingleThreadedAgentRuntime(max_live_agents=2, agent_state_store=store)
+    await runtime.register("name1", StatefulAgent)
+    runtime.start()
+
+    for key in ["a", "b", "c"]:
+        assert await runtime.send_message("inc", AgentId("name1", key)) == 1
+
+    # The least recently used agent was passivated into the store.
+    assert len(runtime._instantiated_agents) == 2  # type: ignore[reportPrivateUsage]
+    assert await store.load(AgentId("name1", "a")) == {"state": 1}
+
+    # Reactivating it restores its state.
+    assert await runtime.send_message("inc", AgentId("name1", "a")) == 2
+    assert await store.load(AgentId("name1", "a")) is None
+    assert await store.load(AgentId("name1", "b")) == {"state": 1}
+
+    # Passivated agents are still part of the runtime state.
+    state = await runtime.save_state()
+    assert state == {"name1/a": {"state": 2}, "name1/b": {"state": 1}, "name1/c": {"state": 1}}
+    await runtime.stop()
+
+
+@pytest.mark.asyncio
+async def test_agents_are_passivated_when_idle(tmp_path: Path) -> None:
+    store = SqliteAgentStateStore(tmp_path / "state.db")
+    runtime = SingleThreadedAgentRuntime(agent_idle_timeout=0.05, agent_state_store=store)
+    await runtime.register("name1", StatefulAgent)
+    runtime.start()
+
+    assert await runtime.send_message("inc", AgentId("name1", "a")) == 1
+    await asyncio.sleep(0.1)
+    # Activating another agent passivates the idle one.
+    assert await runtime.send_message("inc", AgentId("name1", "b")) == 1
+    assert AgentId("name1", "a") not in runtime._instantiated_agents  # type: ignore[reportPrivateUsage]
+    assert await store.load(AgentId("name1", "a")) == {"state": 1}
+
+    assert await runtime.send_message("inc", AgentId("name1", "a")) == 2
+    await runtime.stop()
+    store.close()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("store_type", ["memory", "sqlite"])
+async def test_versioned_state_store_checks_etags(store_type: str, tmp_path: Path) -> None:
+    store: VersionedStateStore = (
+        InMemoryVersionedStateStore() if store_type == "memory" else SqliteVersionedStateStore(tmp_path / "state.db")
+    )
+    agent1 = AgentId("name1", "default")
+    agent2 = AgentId("name2", "default")
+    assert await store.get([agent1, agent2]) == [None, None]
+
+    # A write with an ETag fails while there is no state.
+    assert await store.write([StateWrite(agent1, b"\x00", "missing")]) == [None]
+    etag1, etag2 = await store.write([StateWrite(agent1, b"\x00\x01"), StateWrite(agent2, b"two")])
+    assert etag1 and etag2
+    state1, state2 = await store.get([agent1, agent2])
+    assert state1 is not None and state1.data == b"\x00\x01" and state1.etag == etag1
+    assert state2 is not None and state2.data == b"two"
+
+    # Writes in one call are applied in order, so the second one no longer matches.
+    new_etag1, stale = await store.write([StateWrite(agent1, b"new", etag1), StateWrite(agent1, b"newer", etag1)])
+    assert new_etag1 is not None and new_etag1 != etag1
+    assert stale is None
+    state1 = (await store.get([agent1]))[0]
+    assert state1 is not None and state1.data == b"new"
+
+    # Deleting returns an empty ETag.
+    assert await store.write([StateWrite(agent1, None, etag1), StateWrite(agent2, None, etag2)]) == [None, ""]
+    assert await store.get([agent1, agent2]) == [state1, None]
+    if isinstance(store, SqliteVersionedStateStore):
+        store.close()
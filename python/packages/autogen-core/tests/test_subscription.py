@@ -1,6 +1,7 @@
 import pytest
 from autogen_core.application import SingleThreadedAgentRuntime
-from autogen_core.base import AgentId, TopicId
+from autogen_core.application._helpers import SubscriptionManager
+from autogen_core.base import AgentId, Subscription, TopicId
 from autogen_core.base.exceptions import CantHandleException
 from autogen_core.components import DefaultSubscription, DefaultTopicId, TypeSubscription
 from test_utils import LoopbackAgent, MessageType
@@ -115,3 +116,80 @@ async def test_subscription_deduplication() -> None:
     default_subscription = DefaultSubscription(agent_type=agent_type)
     with pytest.raises(ValueError, match="Subscription already exists"):
         await runtime.add_subscription(default_subscription)
+
+
+class SourcePrefixSubscription(Subscription):
+    """A subscription that is not a TypeSubscription, so it cannot be indexed by topic type."""
+
+    def __init__(self, prefix: str, agent_type: str) -> None:
+        self._prefix = prefix
+        self._agent_type = agent_type
+
+    @property
+    def id(self) -> str:
+        return f"prefix-{self._prefix}-{self._agent_type}"
+
+    def is_match(self, topic_id: TopicId) -> bool:
+        return topic_id.source.startswith(self._prefix)
+
+    def map_to_agent(self, topic_id: TopicId) -> AgentId:
+        return AgentId(self._agent_type, topic_id.source)
+
+
+@pytest.mark.asyncio
+async def test_subscription_manager_incremental_updates() -> None:
+    manager = SubscriptionManager()
+    t1_s1 = TopicId("t1", "s1")
+    t2_s1 = TopicId("t2", "s1")
+    assert await manager.get_subscribed_recipients(t1_s1) == []
+    assert await manager.get_subscribed_recipients(t2_s1) == []
+
+    sub_a = TypeSubscription("t1", "a")
+    await manager.add_subscription(sub_a)
+    sub_b = TypeSubscription("t1", "b")
+    await manager.add_subscription(sub_b)
+    prefix_sub = SourcePrefixSubscription("s", "c")
+    await manager.add_subscription(prefix_sub)
+
+    assert await manager.get_subscribed_recipients(t1_s1) == [
+        AgentId("a", "s1"),
+        AgentId("b", "s1"),
+        AgentId("c", "s1"),
+    ]
+    assert await manager.get_subscribed_recipients(t2_s1) == [AgentId("c", "s1")]
+    assert await manager.get_subscribed_recipients(TopicId("t1", "x")) == [AgentId("a", "x"), AgentId("b", "x")]
+
+    # Returned recipients are not changed by later subscriptions, and cached topics resolve in the same order.
+    recipients = await manager.get_subscribed_recipients(t2_s1)
+    sub_d = TypeSubscription("t2", "d")
+    await manager.add_subscription(sub_d)
+    assert recipients == [AgentId("c", "s1")]
+    assert await manager.get_subscribed_recipients(t2_s1) == [AgentId("d", "s1"), AgentId("c", "s1")]
+    await manager.remove_subscription(sub_d.id)
+
+    with pytest.raises(ValueError):
+        await manager.add_subscription(TypeSubscription("t1", "a"))
+
+    await manager.remove_subscription(sub_a.id)
+    assert await manager.get_subscribed_recipients(t1_s1) == [AgentId("b", "s1"), AgentId("c", "s1")]
+    await manager.remove_subscription(prefix_sub.id)
+    assert await manager.get_subscribed_recipients(t1_s1) == [AgentId("b", "s1")]
+    assert await manager.get_subscribed_recipients(t2_s1) == []
+
+    with pytest.raises(ValueError):
+        await manager.remove_subscription(sub_a.id)
+    # The removed subscription can be added again.
+    await manager.add_subscription(TypeSubscription("t1", "a"))
+
+
+@pytest.mark.asyncio
+async def test_subscription_manager_topic_cache_is_bounded() -> None:
+    manager = SubscriptionManager(max_cached_topics=2)
+    await manager.add_subscription(TypeSubscription("t", "a"))
+    for i in range(10):
+        assert await manager.get_subscribed_recipients(TopicId("t", str(i))) == [AgentId("a", str(i))]
+    assert len(manager._subscribed_recipients) == 2  # type: ignore[reportPrivateUsage]
+
+    # Evicted topics are resolved again on demand, including subscriptions added after eviction.
+    await manager.add_subscription(TypeSubscription("t", "b"))
+    assert await manager.get_subscribed_recipients(TopicId("t", "0")) == [AgentId("a", "0"), AgentId("b", "0")]
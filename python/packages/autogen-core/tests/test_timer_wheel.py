@@ -0,0 +1,64 @@
+import asyncio
+import functools
+from typing import Dict, List
+
+import pytest
+from autogen_core.base._timer_wheel import TimerWheel
+
+
+@pytest.mark.asyncio
+async def test_timer_fires_after_deadline() -> None:
+    wheel = TimerWheel(resolution=0.01, num_slots=8)
+    loop = asyncio.get_running_loop()
+    fired: List[float] = []
+    start = loop.time()
+    wheel.add("a", start + 0.05, lambda: fired.append(loop.time()))
+    assert "a" in wheel
+    await asyncio.sleep(0.2)
+    assert len(fired) == 1
+    assert fired[0] >= start + 0.05
+    assert len(wheel) == 0
+
+
+@pytest.mark.asyncio
+async def test_removed_timer_does_not_fire() -> None:
+    wheel = TimerWheel(resolution=0.01)
+    loop = asyncio.get_running_loop()
+    fired: List[str] = []
+    wheel.add("a", loop.time() + 0.02, lambda: fired.append("a"))
+    wheel.add("b", loop.time() + 0.02, lambda: fired.append("b"))
+    wheel.remove("a")
+    # Adding a timer with the same key replaces it.
+    wheel.add("b", loop.time() + 0.03, lambda: fired.append("b2"))
+    await asyncio.sleep(0.1)
+    assert fired == ["b2"]
+
+
+@pytest.mark.asyncio
+async def test_timers_beyond_one_turn() -> None:
+    # The wheel turns every 0.04 seconds, so most of these timers wait for several turns.
+    wheel = TimerWheel(resolution=0.01, num_slots=4)
+    loop = asyncio.get_running_loop()
+    fired: Dict[int, float] = {}
+    start = loop.time()
+    deadlines = {i: start + 0.03 * (i + 1) for i in range(10)}
+
+    def record(i: int) -> None:
+        fired[i] = loop.time()
+
+    for i, deadline in deadlines.items():
+        wheel.add(i, deadline, functools.partial(record, i))
+    await asyncio.sleep(0.5)
+    assert list(fired) == list(range(10))
+    assert all(fired[i] >= deadlines[i] for i in range(10))
+
+
+@pytest.mark.asyncio
+async def test_close() -> None:
+    wheel = TimerWheel(resolution=0.01)
+    fired: List[str] = []
+    wheel.add("a", asyncio.get_running_loop().time() + 0.02, lambda: fired.append("a"))
+    wheel.close()
+    await asyncio.sleep(0.05)
+    assert fired == []
+    assert len(wheel) == 0
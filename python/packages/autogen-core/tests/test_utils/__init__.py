@@ -1,5 +1,6 @@
+import asyncio
 from dataclasses import dataclass
-from typing import Any
+from typing import Any, List
 
 from autogen_core.base import BaseAgent, MessageContext
 from autogen_core.components import DefaultTopicId, RoutedAgent, default_subscription, message_handler
@@ -51,6 +52,28 @@ async def on_new_message(self, message: CascadingMessageType, ctx: MessageContex
         await self.publish_message(CascadingMessageType(round=message.round + 1), topic_id=DefaultTopicId())
 
 
+class ConcurrencyTrackingAgent(RoutedAgent):
+    """Records the messages it handles, in order, and how many it handled at once."""
+
+    def __init__(self) -> None:
+        super().__init__("A concurrency tracking agent.")
+        self.contents: List[str] = []
+        self.running = 0
+        self.max_running = 0
+
+    @message_handler
+    async def on_new_message(self, message: ContentMessage, ctx: MessageContext) -> ContentMessage:
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            # Let the other messages to the agent start if they may.
+            await asyncio.sleep(0.001)
+            self.contents.append(message.content)
+            return message
+        finally:
+            self.running -= 1
+
+
 class NoopAgent(BaseAgent):
     def __init__(self) -> None:
         super().__init__("A no op agent")
@@ -1,25 +1,42 @@
 import asyncio
 import logging
 import os
-from typing import List
+from pathlib import Path
+from typing import Any, List, Mapping, Sequence
 
 import pytest
-from autogen_core.application import WorkerAgentRuntime, WorkerAgentRuntimeHost
+from autogen_core.application import (
+    HostAgentStateStore,
+    InMemoryVersionedStateStore,
+    MessageBatchingConfig,
+    PayloadCompressionConfig,
+    ReconnectConfig,
+    StateWrite,
+    WorkerAgentRuntime,
+    WorkerAgentRuntimeHost,
+)
+from autogen_core.application.protos import agent_worker_pb2
 from autogen_core.base import (
     AgentId,
     AgentType,
+    CancellationToken,
+    MessageContext,
     TopicId,
     try_get_known_serializers_for_type,
 )
 from autogen_core.base._subscription import Subscription
+from autogen_core.base.exceptions import StateConflictException
 from autogen_core.components import (
     DefaultTopicId,
+    RoutedAgent,
     TypeSubscription,
+    message_handler,
     type_subscription,
 )
 from test_utils import (
     CascadingAgent,
     CascadingMessageType,
+    ConcurrencyTrackingAgent,
     ContentMessage,
     LoopbackAgent,
     LoopbackAgentWithDefaultSubscription,
@@ -466,3 +483,619 @@ async def test_grpc_max_message_size() -> None:
 
     asyncio.run(test_disconnected_agent())
     asyncio.run(test_grpc_max_message_size())
+
+
+@pytest.mark.asyncio
+async def test_shared_agent_type_multiple_workers() -> None:
+    host_address = "localhost:50062"
+    host = WorkerAgentRuntimeHost(address=host_address, allow_shared_agent_types=True)
+    host.start()
+
+    workers: List[WorkerAgentRuntime] = []
+    for _ in range(2):
+        worker = WorkerAgentRuntime(host_address=host_address)
+        worker.start()
+        worker.add_message_serializer(try_get_known_serializers_for_type(MessageType))
+        await worker.register_factory(
+            type=AgentType("shared"), agent_factory=lambda: LoopbackAgent(), expected_class=LoopbackAgent
+        )
+        await worker.add_subscription(TypeSubscription("default", "shared"))
+        workers.append(worker)
+    worker1, worker2 = workers
+
+    client = WorkerAgentRuntime(host_address=host_address)
+    client.start()
+    client.add_message_serializer(try_get_known_serializers_for_type(MessageType))
+
+    keys = [f"key{i}" for i in range(20)]
+    for key in keys:
+        await client.send_message(MessageType(), AgentId("shared", key))
+        await client.publish_message(MessageType(), topic_id=TopicId("default", key))
+    await asyncio.sleep(1)
+
+    # Each key lives on exactly one worker, which got both the request and the event.
+    keys_on_worker1 = {key for key in keys if AgentId("shared", key) in worker1._instantiated_agents}  # type: ignore[reportPrivateUsage]
+    keys_on_worker2 = {key for key in keys if AgentId("shared", key) in worker2._instantiated_agents}  # type: ignore[reportPrivateUsage]
+    assert keys_on_worker1 and keys_on_worker2
+    assert keys_on_worker1 | keys_on_worker2 == set(keys)
+    assert not keys_on_worker1 & keys_on_worker2
+    for worker, worker_keys in [(worker1, keys_on_worker1), (worker2, keys_on_worker2)]:
+        for key in worker_keys:
+            agent = await worker.try_get_underlying_agent_instance(AgentId("shared", key), LoopbackAgent)
+            assert agent.num_calls == 2
+
+    # When a worker leaves, its keys move to the remaining worker.
+    await worker2.stop()
+    await asyncio.sleep(1)
+    for key in keys:
+        await client.send_message(MessageType(), AgentId("shared", key))
+    for key in keys:
+        assert AgentId("shared", key) in worker1._instantiated_agents  # type: ignore[reportPrivateUsage]
+    for key in keys_on_worker1:
+        agent = await worker1.try_get_underlying_agent_instance(AgentId("shared", key), LoopbackAgent)
+        assert agent.num_calls == 3
+
+    await worker1.stop()
+    await client.stop()
+    await host.stop()
+
+
+@pytest.mark.asyncio
+async def test_message_batching_with_mixed_workers() -> None:
+    host_address = "localhost:50063"
+    host = WorkerAgentRuntimeHost(address=host_address, message_batching=MessageBatchingConfig())
+    host.start()
+
+    batching_worker = WorkerAgentRuntime(host_address=host_address, message_batching=MessageBatchingConfig())
+    plain_worker = WorkerAgentRuntime(host_address=host_address)
+    for i, worker in enumerate([batching_worker, plain_worker]):
+        worker.start()
+        worker.add_message_serializer(try_get_known_serializers_for_type(MessageType))
+        await worker.register_factory(
+            type=AgentType(f"name{i}"), agent_factory=lambda: LoopbackAgent(), expected_class=LoopbackAgent
+        )
+        await worker.add_subscription(TypeSubscription("default", f"name{i}"))
+
+    # Enough concurrent messages for the queues to build up and be sent in batches.
+    await asyncio.gather(
+        *(batching_worker.publish_message(MessageType(), topic_id=TopicId("default", "default")) for _ in range(50)),
+        *(batching_worker.send_message(MessageType(), AgentId("name1", "default")) for _ in range(50)),
+        *(plain_worker.send_message(MessageType(), AgentId("name0", "default")) for _ in range(50)),
+    )
+    await asyncio.sleep(1)
+
+    agent0 = await batching_worker.try_get_underlying_agent_instance(AgentId("name0", "default"), LoopbackAgent)
+    agent1 = await plain_worker.try_get_underlying_agent_instance(AgentId("name1", "default"), LoopbackAgent)
+    assert agent0.num_calls == 100
+    assert agent1.num_calls == 100
+
+    await batching_worker.stop()
+    await plain_worker.stop()
+    await host.stop()
+
+
+@pytest.mark.asyncio
+async def test_message_batching_worker_with_plain_host() -> None:
+    host_address = "localhost:50064"
+    host = WorkerAgentRuntimeHost(address=host_address)
+    host.start()
+
+    worker = WorkerAgentRuntime(host_address=host_address, message_batching=MessageBatchingConfig())
+    worker.start()
+    worker.add_message_serializer(try_get_known_serializers_for_type(MessageType))
+    await worker.register_factory(
+        type=AgentType("name"), agent_factory=lambda: LoopbackAgent(), expected_class=LoopbackAgent
+    )
+    await asyncio.gather(*(worker.send_message(MessageType(), AgentId("name", "default")) for _ in range(20)))
+    agent = await worker.try_get_underlying_agent_instance(AgentId("name", "default"), LoopbackAgent)
+    assert agent.num_calls == 20
+
+    await worker.stop()
+    await host.stop()
+
+
+@pytest.mark.asyncio
+async def test_local_delivery_send_message() -> None:
+    host_address = "localhost:50065"
+    host = WorkerAgentRuntimeHost(address=host_address)
+    host.start()
+
+    # No serializers are added: messages between agents on the same worker are not serialized.
+    worker = WorkerAgentRuntime(host_address=host_address)
+    worker.start()
+    await worker.register_factory(
+        type=AgentType("loopback"), agent_factory=lambda: LoopbackAgent(), expected_class=LoopbackAgent
+    )
+    await worker.register_factory(type=AgentType("noop"), agent_factory=lambda: NoopAgent(), expected_class=NoopAgent)
+
+    message = MessageType()
+    response = await worker.send_message(message, AgentId("loopback", "default"))
+    assert response is message
+    agent = await worker.try_get_underlying_agent_instance(AgentId("loopback", "default"), LoopbackAgent)
+    assert agent.num_calls == 1
+
+    # The exception raised by the recipient reaches the sender unchanged.
+    with pytest.raises(NotImplementedError):
+        await worker.send_message(MessageType(), AgentId("noop", "default"))
+
+    await worker.stop()
+    await host.stop()
+
+
+@pytest.mark.asyncio
+async def test_local_delivery_publish_reaches_local_and_remote_subscribers_once() -> None:
+    host_address = "localhost:50066"
+    host = WorkerAgentRuntimeHost(address=host_address)
+    host.start()
+
+    worker1 = WorkerAgentRuntime(host_address=host_address)
+    worker2 = WorkerAgentRuntime(host_address=host_address)
+    for i, worker in enumerate([worker1, worker2]):
+        worker.start()
+        worker.add_message_serializer(try_get_known_serializers_for_type(MessageType))
+        await worker.register_factory(
+            type=AgentType(f"name{i}"), agent_factory=lambda: LoopbackAgent(), expected_class=LoopbackAgent
+        )
+        await worker.add_subscription(TypeSubscription("default", f"name{i}"))
+
+    await worker1.publish_message(MessageType(), topic_id=TopicId("default", "default"))
+    await asyncio.sleep(1)
+
+    agent0 = await worker1.try_get_underlying_agent_instance(AgentId("name0", "default"), LoopbackAgent)
+    agent1 = await worker2.try_get_underlying_agent_instance(AgentId("name1", "default"), LoopbackAgent)
+    assert agent0.num_calls == 1
+    assert agent1.num_calls == 1
+
+    await worker1.stop()
+    await worker2.stop()
+    await host.stop()
+
+
+@pytest.mark.asyncio
+async def test_local_delivery_disabled() -> None:
+    host_address = "localhost:50067"
+    host = WorkerAgentRuntimeHost(address=host_address)
+    host.start()
+
+    worker = WorkerAgentRuntime(host_address=host_address, local_delivery=False)
+    worker.start()
+    worker.add_message_serializer(try_get_known_serializers_for_type(MessageType))
+    await worker.register_factory(
+        type=AgentType("loopback"), agent_factory=lambda: LoopbackAgent(), expected_class=LoopbackAgent
+    )
+    await worker.add_subscription(TypeSubscription("default", "loopback"))
+
+    # The message goes through the host, so the response is a deserialized copy.
+    message = MessageType()
+    response = await worker.send_message(message, AgentId("loopback", "default"))
+    assert response == message
+    assert response is not message
+
+    await worker.publish_message(MessageType(), topic_id=TopicId("default", "default"))
+    await asyncio.sleep(1)
+    agent = await worker.try_get_underlying_agent_instance(AgentId("loopback", "default"), LoopbackAgent)
+    assert agent.num_calls == 2
+
+    await worker.stop()
+    await host.stop()
+
+
+class ProtobufEchoAgent(RoutedAgent):
+    def __init__(self) -> None:
+        super().__init__("Echoes protobuf messages.")
+
+    @message_handler
+    async def on_agent_id(self, message: agent_worker_pb2.AgentId, ctx: MessageContext) -> agent_worker_pb2.AgentId:
+        return agent_worker_pb2.AgentId(type=message.type, key=message.key + "-echo")
+
+
+@pytest.mark.asyncio
+async def test_protobuf_messages_between_workers() -> None:
+    host_address = "localhost:50068"
+    host = WorkerAgentRuntimeHost(address=host_address)
+    host.start()
+
+    worker1 = WorkerAgentRuntime(host_address=host_address)
+    worker2 = WorkerAgentRuntime(host_address=host_address)
+    for worker in [worker1, worker2]:
+        worker.start()
+        worker.add_message_serializer(try_get_known_serializers_for_type(agent_worker_pb2.AgentId))
+    await worker2.register_factory(
+        type=AgentType("echo"), agent_factory=lambda: ProtobufEchoAgent(), expected_class=ProtobufEchoAgent
+    )
+
+    response = await worker1.send_message(agent_worker_pb2.AgentId(type="a", key="b"), AgentId("echo", "default"))
+    assert response == agent_worker_pb2.AgentId(type="a", key="b-echo")
+
+    await worker1.stop()
+    await worker2.stop()
+    await host.stop()
+
+
+@pytest.mark.asyncio
+async def test_payload_compression_between_workers() -> None:
+    host_address = "localhost:50069"
+    host = WorkerAgentRuntimeHost(address=host_address)
+    host.start()
+
+    compressing_worker = WorkerAgentRuntime(
+        host_address=host_address, payload_compression=PayloadCompressionConfig(threshold=1024)
+    )
+    plain_worker = WorkerAgentRuntime(host_address=host_address)
+    for i, worker in enumerate([compressing_worker, plain_worker]):
+        worker.start()
+        worker.add_message_serializer(try_get_known_serializers_for_type(ContentMessage))
+        await worker.register_factory(
+            type=AgentType(f"name{i}"), agent_factory=lambda: LoopbackAgent(), expected_class=LoopbackAgent
+        )
+
+    # The request from the compressing worker is compressed, the response from the other worker is not.
+    message = ContentMessage(content="hello world " * 1000)
+    assert await compressing_worker.send_message(message, AgentId("name1", "default")) == message
+    assert await plain_worker.send_message(message, AgentId("name0", "default")) == message
+
+    await compressing_worker.stop()
+    await plain_worker.stop()
+    await host.stop()
+
+
+class SlowAgent(RoutedAgent):
+    def __init__(self) -> None:
+        super().__init__("Responds after a long time unless cancelled.")
+        self.cancelled = False
+
+    @message_handler
+    async def on_slow_message(self, message: MessageType, ctx: MessageContext) -> MessageType:
+        try:
+            await ctx.cancellation_token.link_future(asyncio.ensure_future(asyncio.sleep(10)))
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        return message
+
+
+@pytest.mark.asyncio
+async def test_send_message_timeout() -> None:
+    host_address = "localhost:50070"
+    host = WorkerAgentRuntimeHost(address=host_address)
+    host.start()
+
+    worker1 = WorkerAgentRuntime(host_address=host_address, request_timeout=0.5)
+    worker2 = WorkerAgentRuntime(host_address=host_address)
+    for worker in [worker1, worker2]:
+        worker.start()
+        worker.add_message_serializer(try_get_known_serializers_for_type(MessageType))
+    await worker2.register_factory(type=AgentType("slow"), agent_factory=lambda: SlowAgent(), expected_class=SlowAgent)
+
+    with pytest.raises(TimeoutError):
+        await worker1.send_message(MessageType(), AgentId("slow", "default"))
+    assert len(worker1._pending_requests) == 0  # type: ignore[reportPrivateUsage]
+    # A per-call timeout overrides the default.
+    with pytest.raises(TimeoutError):
+        await worker1.send_message(MessageType(), AgentId("slow", "other"), timeout=0.2)
+
+    # The handler is cancelled, and the host stops waiting for the response.
+    await asyncio.sleep(0.5)
+    agent = await worker2.try_get_underlying_agent_instance(AgentId("slow", "default"), SlowAgent)
+    assert agent.cancelled
+    pending_responses = host._servicer._pending_responses  # type: ignore[reportPrivateUsage]
+    assert all(len(futures) == 0 for futures in pending_responses.values())
+
+    await worker1.stop()
+    await worker2.stop()
+    await host.stop()
+
+
+class SleepingAgent(RoutedAgent):
+    def __init__(self) -> None:
+        super().__init__("Responds after a second, ignoring its cancellation token.")
+
+    @message_handler
+    async def on_sleeping_message(self, message: MessageType, ctx: MessageContext) -> MessageType:
+        await asyncio.sleep(1)
+        return message
+
+
+@pytest.mark.asyncio
+async def test_local_send_cancellation() -> None:
+    host_address = "localhost:50075"
+    host = WorkerAgentRuntimeHost(address=host_address)
+    host.start()
+    worker = WorkerAgentRuntime(host_address=host_address)
+    worker.start()
+    await worker.register_factory(
+        type=AgentType("sleeping"), agent_factory=lambda: SleepingAgent(), expected_class=SleepingAgent
+    )
+
+    # The request is handled in this worker. Cancelling the token cancels the send, like a request to the host,
+    # even if the handler does not check the token.
+    cancellation_token = CancellationToken()
+    send = asyncio.create_task(
+        worker.send_message(MessageType(), AgentId("sleeping", "default"), cancellation_token=cancellation_token)
+    )
+    await asyncio.sleep(0.1)
+    cancellation_token.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await asyncio.wait_for(send, 0.5)
+
+    # A timeout cancels the handler, but not the token of the caller.
+    cancellation_token = CancellationToken()
+    with pytest.raises(TimeoutError):
+        await worker.send_message(
+            MessageType(), AgentId("sleeping", "default"), cancellation_token=cancellation_token, timeout=0.1
+        )
+    assert not cancellation_token.is_cancelled()
+
+    await worker.stop()
+    await host.stop()
+
+
+@pytest.mark.asyncio
+async def test_send_message_target_disconnected() -> None:
+    host_address = "localhost:50076"
+    host = WorkerAgentRuntimeHost(address=host_address)
+    host.start()
+    worker1 = WorkerAgentRuntime(host_address=host_address)
+    worker2 = WorkerAgentRuntime(host_address=host_address)
+    for worker in [worker1, worker2]:
+        worker.start()
+        worker.add_message_serializer(try_get_known_serializers_for_type(MessageType))
+    await worker2.register_factory(
+        type=AgentType("sleeping"), agent_factory=lambda: SleepingAgent(), expected_class=SleepingAgent
+    )
+
+    # The host fails the request when the worker handling it goes away, so the sender does not wait forever.
+    send = asyncio.create_task(worker1.send_message(MessageType(), AgentId("sleeping", "default")))
+    await asyncio.sleep(0.2)
+    # Drop the connection of the worker without waiting for its handlers, as if it crashed.
+    with pytest.raises(asyncio.CancelledError):
+        await worker2._host_connection.close()  # type: ignore[reportPrivateUsage, union-attr]
+    with pytest.raises(Exception, match="target disconnected"):
+        await asyncio.wait_for(send, 0.5)
+
+    await worker1.stop()
+    await worker2.stop()
+    await host.stop()
+
+
+@pytest.mark.asyncio
+async def test_reconnect_after_host_restart() -> None:
+    host_address = "localhost:50071"
+    host = WorkerAgentRuntimeHost(address=host_address)
+    host.start()
+
+    worker1 = WorkerAgentRuntime(
+        host_address=host_address, reconnect=ReconnectConfig(initial_backoff=0.05, max_backoff=0.1)
+    )
+    # The host drops requests for agent types it does not know, so the sender reconnects after worker1 has
+    # registered its agent type again.
+    worker2 = WorkerAgentRuntime(
+        host_address=host_address, reconnect=ReconnectConfig(initial_backoff=0.5, max_backoff=0.5)
+    )
+    for worker in [worker1, worker2]:
+        worker.start()
+        worker.add_message_serializer(try_get_known_serializers_for_type(ContentMessage))
+    await LoopbackAgentWithDefaultSubscription.register(
+        worker1, "worker1", lambda: LoopbackAgentWithDefaultSubscription()
+    )
+    agent_id = AgentId("worker1", "default")
+    assert await worker2.send_message(ContentMessage(content="before"), agent_id) == ContentMessage(content="before")
+
+    await host.stop(grace=0)
+    # A request sent while the host is down is sent once the worker has reconnected.
+    response = asyncio.create_task(worker2.send_message(ContentMessage(content="during"), agent_id))
+    await asyncio.sleep(0.3)
+    host = WorkerAgentRuntimeHost(address=host_address)
+    host.start()
+
+    assert await asyncio.wait_for(response, 5) == ContentMessage(content="during")
+    # The agent type and its subscription were registered with the new host.
+    await worker2.publish_message(ContentMessage(content="after"), DefaultTopicId())
+    agent = await worker1.try_get_underlying_agent_instance(agent_id, LoopbackAgentWithDefaultSubscription)
+    for _ in range(50):
+        if agent.num_calls == 3:
+            break
+        await asyncio.sleep(0.1)
+    assert agent.num_calls == 3
+    assert len(worker2._host_connection._unacknowledged) == 0  # type: ignore[reportPrivateUsage,union-attr]
+
+    await worker1.stop()
+    await worker2.stop()
+    await host.stop()
+
+
+class CounterAgent(RoutedAgent):
+    def __init__(self) -> None:
+        super().__init__("A counter agent.")
+        self.count = 0
+
+    async def save_state(self) -> Mapping[str, Any]:
+        return {"count": self.count}
+
+    async def load_state(self, state: Mapping[str, Any]) -> None:
+        self.count = state["count"]
+
+
+class CountingStateStore(InMemoryVersionedStateStore):
+    def __init__(self) -> None:
+        super().__init__()
+        self.writes: List[int] = []
+
+    async def write(self, writes: Sequence[StateWrite]) -> List[str | None]:
+        self.writes.append(len(writes))
+        return await super().write(writes)
+
+
+@pytest.mark.asyncio
+async def test_host_agent_state_store() -> None:
+    host_address = "localhost:50072"
+    state_store = CountingStateStore()
+    host = WorkerAgentRuntimeHost(address=host_address, state_store=state_store)
+    host.start()
+    store = HostAgentStateStore(host_address)
+    other_store = HostAgentStateStore(host_address)
+    worker = WorkerAgentRuntime(host_address=host_address)
+    worker.start()
+    await worker.register_factory(
+        type=AgentType("name1"), agent_factory=lambda: CounterAgent(), expected_class=CounterAgent
+    )
+
+    # Concurrent saves are sent to the host together.
+    agent_ids = [AgentId("name1", str(i)) for i in range(10)]
+    await asyncio.gather(*(store.save(agent_id, {"count": i}) for i, agent_id in enumerate(agent_ids)))
+    assert sum(state_store.writes) == 10
+    assert len(state_store.writes) < 10
+    assert await asyncio.gather(*(store.load(agent_id) for agent_id in agent_ids)) == [{"count": i} for i in range(10)]
+    assert await store.load(AgentId("name1", "missing")) is None
+
+    # Concurrent saves of an agent do not conflict with each other, and the last one wins.
+    await asyncio.gather(*(store.save(agent_ids[1], {"count": i}) for i in range(3)))
+    assert await store.load(agent_ids[1]) == {"count": 2}
+    # Also when one is in flight while the next is made, and they go to the host separately.
+    writes = len(state_store.writes)
+    first = asyncio.create_task(store.save(agent_ids[1], {"count": 3}))
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+    await asyncio.gather(first, store.save(agent_ids[1], {"count": 4}))
+    assert state_store.writes[writes:] == [1, 1]
+    assert await store.load(agent_ids[1]) == {"count": 4}
+
+    # A save fails if the state was saved elsewhere since this store last saw it.
+    assert await other_store.load(agent_ids[0]) == {"count": 0}
+    await other_store.save(agent_ids[0], {"count": 100})
+    with pytest.raises(StateConflictException):
+        await store.save(agent_ids[0], {"count": 1})
+    assert await store.load(agent_ids[0]) == {"count": 100}
+    await store.delete(agent_ids[0])
+    with pytest.raises(StateConflictException):
+        await other_store.delete(agent_ids[0])
+
+    # Workers save and load the states of their agents, which can be checkpointed in the host.
+    agent_id = AgentId("name1", "default")
+    agent = await worker.try_get_underlying_agent_instance(agent_id, CounterAgent)
+    agent.count = 5
+    await store.save(agent_id, await worker.agent_save_state(agent_id))
+    agent.count = 0
+    state = await store.load(agent_id)
+    assert state is not None
+    await worker.agent_load_state(agent_id, state)
+    assert agent.count == 5
+    assert await worker.save_state() == {"name1/default": {"count": 5}}
+
+    await store.close()
+    await other_store.close()
+    await worker.stop()
+    await host.stop()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("transport", ["inproc", "unix"])
+async def test_transports(transport: str, tmp_path: Path) -> None:
+    host_address = "inproc://test-transports" if transport == "inproc" else f"unix://{tmp_path}/host.sock"
+    host = WorkerAgentRuntimeHost(address=host_address)
+    host.start()
+    worker1 = WorkerAgentRuntime(host_address=host_address)
+    worker2 = WorkerAgentRuntime(host_address=host_address)
+    for worker in [worker1, worker2]:
+        worker.start()
+        worker.add_message_serializer(try_get_known_serializers_for_type(ContentMessage))
+    await LoopbackAgentWithDefaultSubscription.register(
+        worker1, "worker1", lambda: LoopbackAgentWithDefaultSubscription()
+    )
+    agent_id = AgentId("worker1", "default")
+
+    assert await worker2.send_message(ContentMessage(content="hi"), agent_id) == ContentMessage(content="hi")
+    await worker2.publish_message(ContentMessage(content="event"), DefaultTopicId())
+    agent = await worker1.try_get_underlying_agent_instance(agent_id, LoopbackAgentWithDefaultSubscription)
+    for _ in range(50):
+        if agent.num_calls == 2:
+            break
+        await asyncio.sleep(0.1)
+    assert agent.num_calls == 2
+    metrics = worker1.metrics.snapshot()
+    assert metrics.handlers[("worker1", "ContentMessage")].calls == 2
+    assert metrics.agent_activations == {"worker1": 1}
+    assert metrics.publish_fan_out.count == 1
+    assert metrics.queue_delay.count >= 2
+
+    store = HostAgentStateStore(host_address)
+    await store.save(agent_id, {"count": 1})
+    assert await store.load(agent_id) == {"count": 1}
+
+    await store.close()
+    await worker1.stop()
+    await worker2.stop()
+    await host.stop()
+
+
+@pytest.mark.asyncio
+async def test_agent_max_concurrency() -> None:
+    host_address = "localhost:50073"
+    host = WorkerAgentRuntimeHost(address=host_address)
+    host.start()
+    worker = WorkerAgentRuntime(host_address=host_address)
+    worker.start()
+    sender = WorkerAgentRuntime(host_address=host_address)
+    sender.start()
+    for runtime in (worker, sender):
+        runtime.add_message_serializer(try_get_known_serializers_for_type(ContentMessage))
+    await ConcurrencyTrackingAgent.register(worker, "sequential", ConcurrencyTrackingAgent, max_concurrency=1)
+    await ConcurrencyTrackingAgent.register(worker, "bounded", ConcurrencyTrackingAgent, max_concurrency=2)
+    await worker.add_subscription(TypeSubscription("tracking", "sequential"))
+
+    for i in range(10):
+        await sender.publish_message(ContentMessage(f"{i}"), topic_id=TopicId("tracking", "default"))
+    sequential_id = AgentId("sequential", "default")
+    responses = await asyncio.gather(
+        *(sender.send_message(ContentMessage(f"{i}"), sequential_id) for i in range(10, 20))
+    )
+    assert [response.content for response in responses] == [f"{i}" for i in range(10, 20)]
+
+    sequential = await worker.try_get_underlying_agent_instance(sequential_id, ConcurrencyTrackingAgent)
+    assert sequential.contents == [f"{i}" for i in range(20)]
+    assert sequential.max_running == 1
+    bounded_id = AgentId("bounded", "default")
+    await asyncio.gather(*(sender.send_message(ContentMessage(f"{i}"), bounded_id) for i in range(10)))
+    bounded = await worker.try_get_underlying_agent_instance(bounded_id, ConcurrencyTrackingAgent)
+    assert bounded.max_running == 2
+
+    await sender.stop()
+    await worker.stop()
+    await host.stop()
+
+
+@pytest.mark.asyncio
+async def test_send_and_publish_messages() -> None:
+    host_address = "localhost:50074"
+    host = WorkerAgentRuntimeHost(address=host_address, message_batching=MessageBatchingConfig())
+    host.start()
+    worker = WorkerAgentRuntime(host_address=host_address, message_batching=MessageBatchingConfig())
+    worker.start()
+    sender = WorkerAgentRuntime(host_address=host_address, message_batching=MessageBatchingConfig())
+    sender.start()
+    for runtime in (worker, sender):
+        runtime.add_message_serializer(try_get_known_serializers_for_type(ContentMessage))
+    await ConcurrencyTrackingAgent.register(worker, "remote", ConcurrencyTrackingAgent, max_concurrency=1)
+    await ConcurrencyTrackingAgent.register(sender, "local", ConcurrencyTrackingAgent, max_concurrency=1)
+    await worker.add_subscription(TypeSubscription("tracking", "remote"))
+    await sender.add_subscription(TypeSubscription("tracking", "local"))
+
+    futures = await sender.send_messages(
+        [(ContentMessage(f"{i}"), AgentId("remote" if i % 2 else "local", "default")) for i in range(10)]
+    )
+    responses = [await future for future in asyncio.as_completed(futures)]
+    assert sorted(response.content for response in responses) == sorted(f"{i}" for i in range(10))
+
+    await sender.publish_messages([(ContentMessage(f"{i}"), TopicId("tracking", "default")) for i in range(10, 13)])
+    # A request sent after the events is handled after them, since the agents handle one message at a time.
+    await sender.send_message(ContentMessage("last"), AgentId("remote", "default"))
+    await sender.send_message(ContentMessage("last"), AgentId("local", "default"))
+
+    remote = await worker.try_get_underlying_agent_instance(AgentId("remote", "default"), ConcurrencyTrackingAgent)
+    assert remote.contents == ["1", "3", "5", "7", "9", "10", "11", "12", "last"]
+    local = await sender.try_get_underlying_agent_instance(AgentId("local", "default"), ConcurrencyTrackingAgent)
+    assert local.contents == ["0", "2", "4", "6", "8", "10", "11", "12", "last"]
+
+    await sender.stop()
+    await worker.stop()
+    await host.stop()